@@ -7,9 +7,12 @@ import os
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import customtkinter as ctk
-from PIL import Image, ImageTk
+import math
 import threading
 import json
+from scene_model import SceneModel
+from encoder_calibration import QUALITY_TIERS
+
 
 # Set appearance mode and default color theme
 ctk.set_appearance_mode("System")  # Modes: "System" (standard), "Dark", "Light"
@@ -42,9 +45,13 @@ class ScrollableTextFrame(ctk.CTkFrame):
 class SceneFrame(ctk.CTkFrame):
     """Frame for displaying and editing a single scene"""
     
-    def __init__(self, master, scene_id=0, **kwargs):
+    def __init__(self, master, scene_id=0, model=None, thumbnail_service=None, **kwargs):
         super().__init__(master, **kwargs)
         self.scene_id = scene_id
+        self.thumbnail_service = thumbnail_service
+        
+        # Scene data lives in the model; widgets only display and edit it
+        self.model = model or SceneModel(scene_id)
         
         # Scene header
         self.header_label = ctk.CTkLabel(self, text=f"ฉากที่ {scene_id + 1}", font=ctk.CTkFont(size=16, weight="bold"))
@@ -87,7 +94,7 @@ class SceneFrame(ctk.CTkFrame):
                                           command=self.generate_audio)
         self.gen_audio_btn.pack(side="left", padx=5, pady=5)
         
-        # Image preview (placeholder)
+        # Image preview, filled in by the thumbnail service
         self.image_frame = ctk.CTkFrame(self, width=200, height=200)
         self.image_frame.grid(row=5, column=0, columnspan=2, sticky="ew", padx=10, pady=10)
         self.image_label = ctk.CTkLabel(self.image_frame, text="[ตัวอย่างรูปภาพจะแสดงที่นี่]")
@@ -103,8 +110,66 @@ class SceneFrame(ctk.CTkFrame):
         self.audio_status = ctk.CTkLabel(self.status_frame, text="เสียง: ยังไม่สร้าง", text_color="gray")
         self.audio_status.pack(side="left", padx=10)
         
+        self.progress_bar = ctk.CTkProgressBar(self.status_frame, width=150)
+        self.progress_bar.pack(side="right", padx=10)
+        self.progress_bar.set(0)
+        
         # Configure grid column weights
         self.grid_columnconfigure(1, weight=1)
+        
+        if model is not None:
+            self.bind_model(model)
+    
+    def bind_model(self, model):
+        """Show a scene model in this frame (used when recycling rows)"""
+        self.model = model
+        self.scene_id = model.scene_id
+        self.header_label.configure(text=f"ฉากที่ {model.scene_id + 1}")
+        
+        for textbox, value in ((self.speech_text, model.speech),
+                               (self.desc_text, model.description),
+                               (self.prompt_text, model.image_prompt)):
+            textbox.delete("1.0", "end")
+            textbox.insert("1.0", value)
+        
+        self.update_status()
+        self.show_preview()
+    
+    def update_status(self):
+        """Refresh the status labels and progress bar from the model"""
+        model = self.model
+        if model.image_path:
+            self.image_status.configure(text="รูปภาพ: สร้างแล้ว ✓", text_color="green")
+        else:
+            self.image_status.configure(text="รูปภาพ: ยังไม่สร้าง", text_color="gray")
+        
+        if model.audio_path:
+            self.audio_status.configure(text="เสียง: สร้างแล้ว ✓", text_color="green")
+        else:
+            self.audio_status.configure(text="เสียง: ยังไม่สร้าง", text_color="gray")
+        
+        self.progress_bar.set(model.progress)
+    
+    def show_preview(self):
+        """Show the scene image thumbnail, loading it in the background"""
+        self.image_label.configure(image=None, text="[ตัวอย่างรูปภาพจะแสดงที่นี่]")
+        if not self.model.image_path or self.thumbnail_service is None:
+            return
+        
+        model = self.model
+        
+        def on_thumbnail(image):
+            # The row may have been recycled for another scene meanwhile
+            if self.model is model and image is not None:
+                self.image_label.configure(image=image, text="")
+        
+        self.thumbnail_service.request(model.image_path, on_thumbnail)
+    
+    def sync_to_model(self):
+        """Copy edited widget text back into the model"""
+        self.model.speech = self.speech_text.get("1.0", "end-1c")
+        self.model.description = self.desc_text.get("1.0", "end-1c")
+        self.model.image_prompt = self.prompt_text.get("1.0", "end-1c")
     
     def generate_image_prompt(self):
         """Generate image prompt for the scene"""
@@ -133,28 +198,139 @@ class SceneFrame(ctk.CTkFrame):
     
     def get_scene_data(self):
         """Get all data for this scene"""
-        return {
-            "scene_id": self.scene_id,
-            "speech": self.speech_text.get("1.0", "end-1c"),
-            "description": self.desc_text.get("1.0", "end-1c"),
-            "image_prompt": self.prompt_text.get("1.0", "end-1c"),
-            "image_path": "",  # Would be populated in actual implementation
-            "audio_path": "",  # Would be populated in actual implementation
-        }
+        self.sync_to_model()
+        return self.model.to_dict()
     
     def set_scene_data(self, data):
         """Set scene data from dictionary"""
-        if "speech" in data:
-            self.speech_text.delete("1.0", "end")
-            self.speech_text.insert("1.0", data["speech"])
+        self.sync_to_model()
+        self.model.update(data)
+        self.bind_model(self.model)
+
+
+class VirtualSceneList(ctk.CTkFrame):
+    """Scrollable list of scenes that only builds widgets for visible rows
+    
+    A small pool of SceneFrame widgets is placed on a canvas and rebound to
+    different SceneModel objects as the user scrolls, so the widget count
+    stays constant no matter how many scenes the script has.
+    """
+    
+    def __init__(self, master, row_height=640, label_text=None, thumbnail_service=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.row_height = row_height
+        self.thumbnail_service = thumbnail_service
+        self.models = []
+        self.pool = []  # (SceneFrame, canvas window id)
         
-        if "description" in data:
-            self.desc_text.delete("1.0", "end")
-            self.desc_text.insert("1.0", data["description"])
+        if label_text:
+            self.label = ctk.CTkLabel(self, text=label_text)
+            self.label.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(5, 0))
         
-        if "image_prompt" in data:
-            self.prompt_text.delete("1.0", "end")
-            self.prompt_text.insert("1.0", data["image_prompt"])
+        bg_color = self._apply_appearance_mode(ctk.ThemeManager.theme["CTkFrame"]["fg_color"])
+        self.canvas = tk.Canvas(self, highlightthickness=0, bd=0, bg=bg_color, yscrollincrement=40)
+        self.canvas.grid(row=1, column=0, sticky="nsew")
+        
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        
+        self.canvas.bind("<Configure>", lambda event: self._refresh())
+        self.canvas.bind("<Enter>", self._bind_mousewheel)
+        self.canvas.bind("<Leave>", self._unbind_mousewheel)
+    
+    def _set_appearance_mode(self, mode_string):
+        super()._set_appearance_mode(mode_string)
+        self.canvas.configure(bg=self._apply_appearance_mode(ctk.ThemeManager.theme["CTkFrame"]["fg_color"]))
+    
+    def set_scenes(self, models):
+        """Show a new list of SceneModel objects"""
+        self.sync_visible()
+        self.models = list(models)
+        self.canvas.configure(scrollregion=(0, 0, 0, len(self.models) * self.row_height))
+        self.canvas.yview_moveto(0)
+        self._refresh()
+    
+    def get_models(self):
+        """Get all scene models, including edits in the visible rows"""
+        self.sync_visible()
+        return self.models
+    
+    def refresh_scene(self, model):
+        """Update the status of model's row if it is on screen
+        
+        Only status and progress are redrawn, so text being edited in the
+        row is left alone.
+        """
+        for frame, window in self.pool:
+            if frame.model is model and self.canvas.itemcget(window, "state") != "hidden":
+                frame.update_status()
+    
+    def sync_visible(self):
+        """Copy edits from the visible rows into their models"""
+        for frame, window in self.pool:
+            if self.canvas.itemcget(window, "state") != "hidden":
+                frame.sync_to_model()
+    
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self._refresh()
+    
+    def _bind_mousewheel(self, event):
+        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind_all("<Button-4>", self._on_mousewheel)
+        self.canvas.bind_all("<Button-5>", self._on_mousewheel)
+    
+    def _unbind_mousewheel(self, event):
+        self.canvas.unbind_all("<MouseWheel>")
+        self.canvas.unbind_all("<Button-4>")
+        self.canvas.unbind_all("<Button-5>")
+    
+    def _on_mousewheel(self, event):
+        if event.num == 4:
+            units = -1
+        elif event.num == 5:
+            units = 1
+        else:
+            # Windows reports multiples of 120, macOS small deltas
+            units = -int(event.delta / 120) if abs(event.delta) >= 120 else -event.delta
+        self.canvas.yview_scroll(units, "units")
+        self._refresh()
+    
+    def _refresh(self):
+        """Bind the pooled frames to the rows currently in view"""
+        view_height = max(self.canvas.winfo_height(), 1)
+        view_width = max(self.canvas.winfo_width(), 1)
+        top = self.canvas.canvasy(0)
+        first = max(int(top // self.row_height), 0)
+        needed = min(math.ceil(view_height / self.row_height) + 1, len(self.models))
+        
+        # Grow the pool only up to the number of rows that fit on screen
+        while len(self.pool) < needed:
+            frame = SceneFrame(self.canvas, thumbnail_service=self.thumbnail_service)
+            window = self.canvas.create_window(0, 0, anchor="nw", window=frame, state="hidden")
+            self.pool.append((frame, window))
+        
+        for slot, (frame, window) in enumerate(self.pool):
+            index = first + slot
+            if index >= len(self.models):
+                if self.canvas.itemcget(window, "state") != "hidden":
+                    frame.sync_to_model()
+                    self.canvas.itemconfigure(window, state="hidden")
+                continue
+            
+            model = self.models[index]
+            if frame.model is not model:
+                if self.canvas.itemcget(window, "state") != "hidden":
+                    frame.sync_to_model()
+                frame.bind_model(model)
+            
+            self.canvas.coords(window, 0, index * self.row_height)
+            self.canvas.itemconfigure(window, state="normal", width=view_width,
+                                      height=self.row_height - 10)
 
 
 class SettingsFrame(ctk.CTkFrame):
@@ -228,9 +404,18 @@ class SettingsFrame(ctk.CTkFrame):
         self.style_text = ctk.CTkTextbox(self, height=60, width=300)
         self.style_text.grid(row=7, column=1, sticky="ew", padx=10, pady=5)
         
+        # Encoder quality tier (profiles come from encoder_calibration.py)
+        self.quality_label = ctk.CTkLabel(self, text="Encoder Quality:")
+        self.quality_label.grid(row=8, column=0, sticky="w", padx=10, pady=5)
+        
+        self.quality_var = ctk.StringVar(value="standard")
+        self.quality_combobox = ctk.CTkComboBox(self, values=list(QUALITY_TIERS), 
+                                               variable=self.quality_var, width=300)
+        self.quality_combobox.grid(row=8, column=1, sticky="w", padx=10, pady=5)
+        
         # Save button
         self.save_button = ctk.CTkButton(self, text="บันทึกการตั้งค่า", command=self.save_settings)
-        self.save_button.grid(row=8, column=0, columnspan=2, pady=20)
+        self.save_button.grid(row=9, column=0, columnspan=2, pady=20)
         
         # Configure grid column weights
         self.grid_columnconfigure(1, weight=1)
@@ -271,6 +456,7 @@ class SettingsFrame(ctk.CTkFrame):
         self.fps_entry.insert(0, str(config.get("video_fps", 30)))
         
         self.voice_var.set(config.get("default_tts_voice", "th-TH-Neural2-C"))
+        self.quality_var.set(config.get("encoder_quality", "standard"))
         
         self.style_text.delete("1.0", "end")
         self.style_text.insert("1.0", config.get("default_image_style_prompt", 
@@ -279,14 +465,17 @@ class SettingsFrame(ctk.CTkFrame):
     def save_settings(self):
         """Save settings to config manager"""
         try:
-            self.config_manager.update_config("service_account_key_path", self.key_entry.get())
-            self.config_manager.update_config("project_id", self.project_entry.get())
-            self.config_manager.update_config("location", self.location_entry.get())
-            self.config_manager.update_config("image_width", int(self.width_entry.get()))
-            self.config_manager.update_config("image_height", int(self.height_entry.get()))
-            self.config_manager.update_config("video_fps", int(self.fps_entry.get()))
-            self.config_manager.update_config("default_tts_voice", self.voice_var.get())
-            self.config_manager.update_config("default_image_style_prompt", self.style_text.get("1.0", "end-1c"))
+            # One validated, atomic write instead of one per field
+            with self.config_manager.batch_update() as batch:
+                batch["service_account_key_path"] = self.key_entry.get()
+                batch["project_id"] = self.project_entry.get()
+                batch["location"] = self.location_entry.get()
+                batch["image_width"] = int(self.width_entry.get())
+                batch["image_height"] = int(self.height_entry.get())
+                batch["video_fps"] = int(self.fps_entry.get())
+                batch["default_tts_voice"] = self.voice_var.get()
+                batch["encoder_quality"] = self.quality_var.get()
+                batch["default_image_style_prompt"] = self.style_text.get("1.0", "end-1c")
             
             messagebox.showinfo("บันทึกการตั้งค่า", "บันทึกการตั้งค่าเรียบร้อยแล้ว")
         except Exception as e:
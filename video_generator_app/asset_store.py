@@ -0,0 +1,433 @@
+"""
+Asset Store Module for Video Generator App
+Stores generated images, audio and videos once by content hash and tracks
+which projects use them
+"""
+
+import os
+import json
+import stat
+import time
+import errno
+import shutil
+import hashlib
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path):
+    """Get the sha256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class StoreLock:
+    """Reentrant lock shared by this process's threads and, through a lock
+    file, by every other process using the same store
+
+    The GUI, a command-line render and pipeline worker processes can all
+    open one store, so a thread lock alone would let gc() in one process
+    sweep a blob that another is about to add to a manifest.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._reset()
+
+    def _reset(self):
+        # A forked child gets a copy of the parent's lock state but not
+        # its threads; start over with a fresh lock
+        self._pid = os.getpid()
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        if self._pid != os.getpid():
+            self._reset()
+        self._lock.acquire()
+        try:
+            if self._depth == 0:
+                lock_file = open(self.path, "a+b")
+                try:
+                    _lock_file(lock_file)
+                except Exception:
+                    lock_file.close()
+                    raise
+                self._file = lock_file
+            self._depth += 1
+        except Exception:
+            self._lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                _unlock_file(self._file)
+            finally:
+                self._file.close()
+                self._file = None
+        self._lock.release()
+        return False
+
+
+def _lock_file(lock_file):
+    """Block until this process holds the exclusive lock on lock_file"""
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        return
+    lock_file.seek(0)
+    while True:
+        try:
+            # LK_LOCK gives up after about 10 seconds; keep waiting
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            time.sleep(0.05)
+
+
+def _unlock_file(lock_file):
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class AssetStore:
+    """Content-addressed blob store with per-project manifests
+
+    Layout under root_dir:
+        objects/ab/cd/abcd...ef.png   one read-only blob per distinct content
+        manifests/<project>.json      {asset name: blob key} per project
+        tmp/                          staging area for atomic writes
+
+    Identical files are stored once. Projects get their files as hard links
+    to the blobs (copies where links are not possible), and gc() deletes
+    blobs no manifest references any more.
+
+    Several processes may use one store: adding blobs, manifest updates
+    and gc() are serialized through a lock file in root_dir.
+    """
+
+    def __init__(self, root_dir, quota_bytes=None, gc_grace_seconds=3600):
+        """Open (or create) the store
+
+        Args:
+            root_dir: Directory holding objects, manifests and tmp
+            quota_bytes: Disk budget for blobs enforced by gc() (None for no limit)
+            gc_grace_seconds: Unreferenced blobs younger than this survive
+                gc(), so assets being added by a running job are kept
+        """
+        self.root_dir = root_dir
+        self.quota_bytes = quota_bytes
+        self.gc_grace_seconds = gc_grace_seconds
+
+        self.objects_dir = os.path.join(root_dir, "objects")
+        self.manifests_dir = os.path.join(root_dir, "manifests")
+        self.tmp_dir = os.path.join(root_dir, "tmp")
+        for directory in (self.objects_dir, self.manifests_dir, self.tmp_dir):
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = StoreLock(os.path.join(root_dir, "lock"))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = StoreLock(os.path.join(self.root_dir, "lock"))
+
+    # Blobs
+
+    def blob_path(self, key):
+        """Get the path of a blob; keys are "<sha256><extension>"."""
+        return os.path.join(self.objects_dir, key[:2], key[2:4], key)
+
+    def has(self, key):
+        """Check whether a blob is stored"""
+        return os.path.exists(self.blob_path(key))
+
+    def put_file(self, path, move=False):
+        """Add a file to the store
+
+        Args:
+            path: File to add
+            move: Move the file into the store instead of copying it
+
+        Returns:
+            The blob key
+        """
+        try:
+            key = hash_file(path) + os.path.splitext(path)[1].lower()
+            blob_path = self.blob_path(key)
+
+            with self._lock:
+                if os.path.exists(blob_path):
+                    # Already stored; keep the existing blob, but restart its
+                    # grace period since no manifest may reference it yet
+                    os.utime(blob_path)
+                    if move:
+                        os.remove(path)
+                    return key
+
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.tmp_dir)
+            os.close(fd)
+            try:
+                if move:
+                    try:
+                        os.replace(path, temp_path)
+                    except OSError as e:
+                        if e.errno != errno.EXDEV:
+                            raise
+                        shutil.copyfile(path, temp_path)
+                        os.remove(path)
+                else:
+                    shutil.copyfile(path, temp_path)
+
+                # GC ages blobs by mtime, so stamp the time the blob was
+                # stored (a moved file keeps its original mtime)
+                os.utime(temp_path)
+                # Read-only, because every hard link shares this inode
+                os.chmod(temp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+                with self._lock:
+                    os.replace(temp_path, blob_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+            return key
+
+        except Exception as e:
+            print(f"Error adding {path} to asset store: {str(e)}")
+            raise
+
+    def materialize(self, key, dest_path):
+        """Make a blob available at dest_path
+
+        Uses a hard link when possible and falls back to a copy across
+        file systems. An existing file at dest_path is replaced.
+
+        Returns:
+            dest_path
+        """
+        blob_path = self.blob_path(key)
+        try:
+            if os.path.exists(dest_path) and os.path.samefile(blob_path, dest_path):
+                return dest_path
+
+            os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+            temp_path = f"{dest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                os.link(blob_path, temp_path)
+            except OSError:
+                shutil.copyfile(blob_path, temp_path)
+            os.replace(temp_path, dest_path)
+            return dest_path
+
+        except Exception as e:
+            print(f"Error materializing asset {key}: {str(e)}")
+            raise
+
+    def ingest(self, path, project, name):
+        """Move a freshly generated file into the store and link it back
+
+        The file stays readable at path but now shares storage with any
+        identical asset, and the project's manifest records it under name.
+
+        Returns:
+            The blob key
+        """
+        key = self.put_file(path, move=True)
+        # Held until the manifest names the blob, so a concurrent gc() in
+        # any process cannot collect it in between
+        with self._lock:
+            self.materialize(key, path)
+            self.add_to_manifest(project, {name: key})
+        return key
+
+    # Manifests
+
+    def _manifest_path(self, project):
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in project)
+        return os.path.join(self.manifests_dir, f"{safe_name}.json")
+
+    def get_manifest(self, project):
+        """Get a project's assets as {name: blob key} (empty if unknown)"""
+        try:
+            with open(self._manifest_path(project), "r", encoding="utf-8") as f:
+                return json.load(f)["assets"]
+        except FileNotFoundError:
+            return {}
+
+    def add_to_manifest(self, project, assets):
+        """Record {name: blob key} entries for a project
+
+        Writes are atomic and serialized across processes.
+        """
+        with self._lock:
+            manifest = self.get_manifest(project)
+            manifest.update(assets)
+            self._write_manifest(project, manifest)
+
+    def set_manifest(self, project, assets):
+        """Replace a project's manifest with exactly {name: blob key} entries"""
+        with self._lock:
+            self._write_manifest(project, dict(assets))
+
+    def remove_from_manifest(self, project, names):
+        """Drop entries from a project's manifest"""
+        with self._lock:
+            manifest = self.get_manifest(project)
+            for name in names:
+                manifest.pop(name, None)
+            self._write_manifest(project, manifest)
+
+    def delete_manifest(self, project):
+        """Forget a project; its blobs become garbage unless shared"""
+        with self._lock:
+            path = self._manifest_path(project)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def list_projects(self):
+        """Get the names of all projects with a manifest"""
+        projects = []
+        for filename in os.listdir(self.manifests_dir):
+            if filename.endswith(".json"):
+                try:
+                    with open(os.path.join(self.manifests_dir, filename), "r", encoding="utf-8") as f:
+                        projects.append(json.load(f)["project"])
+                except (OSError, ValueError, KeyError):
+                    continue
+        return projects
+
+    def _write_manifest(self, project, assets):
+        fd, temp_path = tempfile.mkstemp(dir=self.tmp_dir, suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"project": project, "updated_at": time.time(), "assets": assets},
+                          f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, self._manifest_path(project))
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    # Garbage collection
+
+    def _iter_blobs(self):
+        """Yield (key, path, size, mtime) for every stored blob"""
+        for first in os.scandir(self.objects_dir):
+            if not first.is_dir():
+                continue
+            for second in os.scandir(first.path):
+                if not second.is_dir():
+                    continue
+                for entry in os.scandir(second.path):
+                    stat_result = entry.stat()
+                    yield entry.name, entry.path, stat_result.st_size, stat_result.st_mtime
+
+    def get_usage(self):
+        """Get blob count and total bytes"""
+        count = total = 0
+        for _, _, size, _ in self._iter_blobs():
+            count += 1
+            total += size
+        return {"blobs": count, "bytes": total}
+
+    def gc(self, quota_bytes=None, dry_run=False):
+        """Mark-and-sweep unreferenced blobs
+
+        Every blob named in a manifest is marked live. Unmarked blobs
+        stored (or stored again) longer ago than the grace period are
+        deleted. If the store is still over its quota, younger unmarked
+        blobs are deleted too, oldest first; referenced blobs are never
+        deleted.
+
+        Args:
+            quota_bytes: Override the store's quota for this run
+            dry_run: Only report what would be deleted
+
+        Returns:
+            Dictionary with deleted_blobs, freed_bytes, remaining_bytes and
+            over_quota
+        """
+        quota_bytes = self.quota_bytes if quota_bytes is None else quota_bytes
+
+        with self._lock:
+            # Mark
+            live = set()
+            for filename in os.listdir(self.manifests_dir):
+                if not filename.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(self.manifests_dir, filename), "r", encoding="utf-8") as f:
+                        live.update(json.load(f)["assets"].values())
+                except (OSError, ValueError, KeyError) as e:
+                    # An unreadable manifest could hide live blobs; keep everything
+                    print(f"Error reading manifest {filename}, skipping garbage collection: {str(e)}")
+                    return {"deleted_blobs": 0, "freed_bytes": 0,
+                            "remaining_bytes": self.get_usage()["bytes"], "over_quota": False}
+
+            # Sweep
+            now = time.time()
+            total = 0
+            candidates = []
+            for key, path, size, mtime in self._iter_blobs():
+                total += size
+                if key not in live:
+                    candidates.append((mtime, path, size))
+            candidates.sort()
+
+            deleted = freed = 0
+            for mtime, path, size in candidates:
+                expired = now - mtime >= self.gc_grace_seconds
+                over_quota = bool(quota_bytes) and total - freed > quota_bytes
+                if not (expired or over_quota):
+                    continue
+                if not dry_run:
+                    # Skip blobs stored again since the scan
+                    if os.stat(path).st_mtime != mtime:
+                        continue
+                    os.remove(path)
+                deleted += 1
+                freed += size
+
+        remaining = total - freed
+        return {
+            "deleted_blobs": deleted,
+            "freed_bytes": freed,
+            "remaining_bytes": remaining,
+            "over_quota": bool(quota_bytes) and remaining > quota_bytes,
+        }
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    from config_manager import ConfigManager
+
+    store = ConfigManager().get_asset_store()
+    if len(sys.argv) > 1:
+        key = store.put_file(sys.argv[1])
+        store.add_to_manifest("example", {os.path.basename(sys.argv[1]): key})
+        print(f"Stored {sys.argv[1]} as {key}")
+
+    print(f"Usage: {store.get_usage()}")
+    print(f"Garbage collection: {store.gc(dry_run=True)}")
@@ -0,0 +1,121 @@
+"""
+Frame Writer Benchmark for Video Generator App
+Compares MoviePy's write_videofile path (create_video_from_scenes) with the
+pooled raw frame writer (create_video_raw) by CPU time and garbage
+collector activity per encoded minute
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from media_processor import MediaProcessor
+from fixtures import create_scene_fixtures
+
+
+class GCMonitor:
+    """Counts garbage collections and the time spent in them"""
+
+    def __init__(self):
+        self.collections = 0
+        self.pause_seconds = 0.0
+        self._started = None
+
+    def _callback(self, phase, info):
+        if phase == "start":
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            self.collections += 1
+            self.pause_seconds += time.perf_counter() - self._started
+            self._started = None
+
+    def __enter__(self):
+        gc.collect()
+        gc.callbacks.append(self._callback)
+        return self
+
+    def __exit__(self, *exc):
+        gc.callbacks.remove(self._callback)
+
+
+def children_cpu_seconds():
+    """CPU time of finished child processes (ffmpeg), if the platform reports it"""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def measure(render, video_seconds):
+    """Run render() once and normalize its costs per encoded minute"""
+    cpu_started = time.process_time()
+    children_started = children_cpu_seconds()
+    wall_started = time.perf_counter()
+    with GCMonitor() as monitor:
+        render()
+    minutes = video_seconds / 60.0
+    return {
+        "wall_seconds": time.perf_counter() - wall_started,
+        "python_cpu_seconds_per_minute": (time.process_time() - cpu_started) / minutes,
+        "encoder_cpu_seconds_per_minute": (children_cpu_seconds() - children_started) / minutes,
+        "gc_collections_per_minute": monitor.collections / minutes,
+        "gc_pause_ms_per_minute": monitor.pause_seconds * 1000 / minutes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenes", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per scene")
+    parser.add_argument("--width", type=int, default=540)
+    parser.add_argument("--height", type=int, default=960)
+    parser.add_argument("--fps", type=int, default=24)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_frame_writer_")
+    try:
+        scenes = create_scene_fixtures(os.path.join(work_dir, "fixtures"), args.scenes, args.width,
+                                       args.height, args.duration)
+        processor = MediaProcessor(video_fps=args.fps)
+        video_seconds = args.scenes * args.duration
+
+        moviepy = measure(lambda: processor.create_video_from_scenes(
+            scenes, os.path.join(work_dir, "moviepy.mp4"), captions=None), video_seconds)
+        raw = measure(lambda: processor.create_video_raw(
+            scenes, os.path.join(work_dir, "raw.mp4"), captions=None), video_seconds)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        "benchmark": "frame_writer",
+        "scenes": args.scenes,
+        "video_seconds": video_seconds,
+        "moviepy": moviepy,
+        "raw": raw,
+    }
+    print(f"{'per encoded minute':<28}{'moviepy':>10}{'raw':>10}")
+    for key in ("python_cpu_seconds_per_minute", "encoder_cpu_seconds_per_minute",
+                "gc_collections_per_minute", "gc_pause_ms_per_minute"):
+        print(f"{key:<28}{moviepy[key]:10.2f}{raw[key]:10.2f}")
+    print(f"{'wall_seconds (total)':<28}{moviepy['wall_seconds']:10.2f}{raw['wall_seconds']:10.2f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
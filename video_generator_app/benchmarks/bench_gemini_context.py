@@ -0,0 +1,130 @@
+"""
+Gemini Context Benchmark for Video Generator App
+Compares input tokens and latency per Gemini call against a local stand-in
+model backend: the previous inline prompts, GeminiClient with the shipped
+min_cache_tokens, and a hypothetical run that forces every block into a
+cached context
+
+The shipped blocks are far below min_cache_tokens, so with the shipped
+config every call takes the system-instruction path and sends the same
+tokens as the inline prompts. The forced-cache column shows what caching
+would save if the blocks grew past the threshold (or it were lowered).
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gcp_clients.gemini_client import GeminiClient, TASKS
+from gcp_clients.gemini_context import MIN_CACHE_TOKENS, estimate_tokens
+from fake_clients import FakeGeminiClient, FakeModelFactory
+
+TOPIC = "การเรียนรู้ภาษาอังกฤษด้วยตนเอง"
+IMAGE_STYLE = "ภาพถ่ายสมจริง, แสงสวยงาม, มุมกล้องระดับสายตา"
+
+
+def build_calls(num_scenes):
+    """One video's worth of Gemini calls as (task, fields) pairs"""
+    script = FakeGeminiClient().generate_script(TOPIC, num_scenes)
+    scenes = json.loads(FakeGeminiClient().parse_script(script))
+    calls = [("generate_script", {"topic": TOPIC}), ("parse_script", {"script_text": script})]
+    calls += [("generate_image_prompt", {"scene_description": scene["description"],
+                                         "image_style_config": IMAGE_STYLE})
+              for scene in scenes]
+    return calls
+
+
+def run_inline(factory, calls):
+    """The previous behaviour: a new model per call with the whole template in the prompt"""
+    for task, fields in calls:
+        instructions, request = TASKS[task]
+        factory.create_model("stand-in").generate_content(instructions + "\n\n" + request.format(**fields))
+
+
+def run_client(client, calls):
+    """Send the calls through GeminiClient and its instruction contexts"""
+    methods = {
+        "generate_script": client.generate_script,
+        "parse_script": client.parse_script,
+        "generate_image_prompt": client.generate_image_prompt_for_scene,
+    }
+    for task, fields in calls:
+        methods[task](**fields)
+
+
+def measure(mode, calls, repeats, backend):
+    """Run the calls repeats times in one mode and normalize per call"""
+    factory = FakeModelFactory(**backend)
+    client = None
+    if mode != "inline":
+        min_cache_tokens = 0 if mode == "forced_cache" else MIN_CACHE_TOKENS
+        client = GeminiClient("stand-in", "local", min_cache_tokens=min_cache_tokens, model_factory=factory)
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        if client is None:
+            run_inline(factory, calls)
+        else:
+            run_client(client, calls)
+    elapsed = time.perf_counter() - started
+    if client is not None:
+        client.close()
+
+    stats = factory.get_stats()
+    return {
+        "sent_tokens_per_call": stats["sent_tokens"] / stats["requests"],
+        "cached_tokens_per_call": stats["cached_tokens"] / stats["requests"],
+        "latency_ms_per_call": elapsed * 1000 / stats["requests"],
+        "caches_created": stats["caches_created"],
+        "requests": stats["requests"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenes", type=int, default=6)
+    parser.add_argument("--repeats", type=int, default=5, help="Videos' worth of calls per mode")
+    parser.add_argument("--latency", type=float, default=0.02, help="Fixed seconds per request")
+    parser.add_argument("--input-token-ms", type=float, default=0.05,
+                        help="Milliseconds per uncached input token")
+    parser.add_argument("--cached-token-ms", type=float, default=0.005,
+                        help="Milliseconds per cached input token")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    backend = {"latency": args.latency, "input_token_seconds": args.input_token_ms / 1000,
+               "cached_token_seconds": args.cached_token_ms / 1000}
+    calls = build_calls(args.scenes)
+    modes = ("inline", "shipped", "forced_cache")
+    block_tokens = {task: estimate_tokens(instructions) for task, (instructions, _) in TASKS.items()}
+    results = {
+        "benchmark": "gemini_context",
+        "min_cache_tokens": MIN_CACHE_TOKENS,
+        "block_tokens": block_tokens,
+        "scenes": args.scenes,
+        "calls_per_video": len(calls),
+        "repeats": args.repeats,
+        "modes": {mode: measure(mode, calls, args.repeats, backend) for mode in modes},
+    }
+
+    inline, shipped = results["modes"]["inline"], results["modes"]["shipped"]
+    print(f"Shipped config (min_cache_tokens={MIN_CACHE_TOKENS}, largest block "
+          f"~{max(block_tokens.values())} tokens): {shipped['sent_tokens_per_call']:.1f} tokens "
+          f"and {shipped['latency_ms_per_call']:.1f} ms per call vs {inline['sent_tokens_per_call']:.1f} "
+          f"tokens and {inline['latency_ms_per_call']:.1f} ms inline")
+    print("forced_cache is hypothetical: it ignores the cache minimum\n")
+    print(f"{'per call':<24}" + "".join(f"{mode:>20}" for mode in modes))
+    for key in ("sent_tokens_per_call", "cached_tokens_per_call", "latency_ms_per_call", "caches_created"):
+        print(f"{key:<24}" + "".join(f"{results['modes'][mode][key]:20.1f}" for mode in modes))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
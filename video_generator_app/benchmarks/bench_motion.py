@@ -0,0 +1,87 @@
+"""
+Motion Render Benchmark for Video Generator App
+Compares a static create_video_from_scenes render with create_motion_video
+(Ken Burns motion and crossfades) on the same scenes
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from media_processor import MediaProcessor
+from motion_engine import MotionRenderer
+from fixtures import create_scene_fixtures
+
+
+def time_frame_generation(scenes, width, height, fps, transition_seconds):
+    """Time the motion engine alone, without encoding
+
+    Returns:
+        (seconds, frames)
+    """
+    renderer = MotionRenderer(width, height, fps, transition_seconds)
+    durations = [scene["audio_duration"] for scene in scenes]
+    started = time.perf_counter()
+    total = 0
+    for _, _, total in renderer.render(scenes, durations):
+        pass
+    return time.perf_counter() - started, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenes", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds per scene")
+    parser.add_argument("--width", type=int, default=540)
+    parser.add_argument("--height", type=int, default=960)
+    parser.add_argument("--fps", type=int, default=24)
+    parser.add_argument("--transition", type=float, default=0.5, help="Crossfade seconds")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_motion_")
+    try:
+        scenes = create_scene_fixtures(os.path.join(work_dir, "fixtures"), args.scenes, args.width,
+                                       args.height, args.duration)
+        processor = MediaProcessor(video_fps=args.fps)
+
+        started = time.perf_counter()
+        processor.create_video_from_scenes(scenes, os.path.join(work_dir, "static.mp4"), captions=None)
+        static_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        processor.create_motion_video(scenes, os.path.join(work_dir, "motion.mp4"),
+                                      transition_seconds=args.transition, captions=None)
+        motion_seconds = time.perf_counter() - started
+
+        generate_seconds, frames = time_frame_generation(scenes, args.width, args.height, args.fps,
+                                                         args.transition)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        "benchmark": "motion",
+        "scenes": args.scenes,
+        "frames": frames,
+        "static_seconds": static_seconds,
+        "motion_seconds": motion_seconds,
+        "motion_vs_static": motion_seconds / static_seconds,
+        "frame_generation_ms_per_frame": generate_seconds / frames * 1000,
+    }
+    print(f"static render:    {static_seconds:7.2f}s")
+    print(f"motion render:    {motion_seconds:7.2f}s  ({results['motion_vs_static']:.2f}x static)")
+    print(f"frame generation: {results['frame_generation_ms_per_frame']:7.2f}ms/frame ({frames} frames)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
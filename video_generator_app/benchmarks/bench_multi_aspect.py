@@ -0,0 +1,105 @@
+"""
+Multi-Aspect Render Benchmark for Video Generator App
+Compares one create_video_from_scenes call per aspect ratio with a single
+create_multi_aspect_videos pass producing all of them
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+from PIL import Image, ImageOps
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from media_processor import MediaProcessor, ASPECT_PRESETS
+from fixtures import create_scene_fixtures
+
+
+def scaled_outputs(output_dir, scale):
+    """Get {output path: (width, height)} for every preset, scaled down for speed"""
+    outputs = {}
+    for name, (width, height) in ASPECT_PRESETS.items():
+        # libx264 with yuv420p needs even dimensions
+        size = (int(width * scale) // 2 * 2, int(height * scale) // 2 * 2)
+        outputs[os.path.join(output_dir, f"video_{name.replace(':', 'x')}.mp4")] = size
+    return outputs
+
+
+def run_separate(processor, scenes, outputs, fixture_dir):
+    """Render each aspect ratio with its own full decode and encode"""
+    started = time.perf_counter()
+    for output_path, (width, height) in outputs.items():
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        # create_video_from_scenes renders at the image size, so each ratio
+        # needs its own resized copy of the scene images
+        sized_scenes = []
+        for scene in scenes:
+            image_path = os.path.join(fixture_dir, f"{width}x{height}_{os.path.basename(scene['image_path'])}")
+            if not os.path.exists(image_path):
+                with Image.open(scene["image_path"]) as image:
+                    ImageOps.pad(image, (width, height)).save(image_path)
+            sized_scenes.append(dict(scene, image_path=image_path))
+        processor.create_video_from_scenes(sized_scenes, output_path)
+    return time.perf_counter() - started
+
+
+def run_multi(processor, scenes, outputs):
+    """Render every aspect ratio in one pass"""
+    started = time.perf_counter()
+    processor.create_multi_aspect_videos(scenes, outputs)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenes", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds per scene")
+    parser.add_argument("--scale", type=float, default=0.5, help="Scale applied to the preset sizes")
+    parser.add_argument("--fps", type=int, default=24)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_multi_aspect_")
+    try:
+        width, height = ASPECT_PRESETS["9:16"]
+        fixture_dir = os.path.join(work_dir, "fixtures")
+        scenes = create_scene_fixtures(fixture_dir, args.scenes, int(width * args.scale),
+                                       int(height * args.scale), args.duration)
+        processor = MediaProcessor(video_fps=args.fps)
+
+        separate_outputs = scaled_outputs(os.path.join(work_dir, "separate"), args.scale)
+        first_output = next(iter(separate_outputs.items()))
+
+        single_seconds = run_separate(processor, scenes, dict([first_output]), fixture_dir)
+        separate_seconds = run_separate(processor, scenes, separate_outputs, fixture_dir)
+        multi_seconds = run_multi(processor, scenes, scaled_outputs(os.path.join(work_dir, "multi"), args.scale))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        "benchmark": "multi_aspect",
+        "scenes": args.scenes,
+        "aspect_ratios": list(ASPECT_PRESETS),
+        "single_render_seconds": single_seconds,
+        "separate_renders_seconds": separate_seconds,
+        "multi_aspect_seconds": multi_seconds,
+        "multi_vs_single": multi_seconds / single_seconds,
+        "speedup": separate_seconds / multi_seconds,
+    }
+    print(f"one ratio:          {single_seconds:7.2f}s")
+    print(f"{len(ASPECT_PRESETS)} separate renders: {separate_seconds:7.2f}s")
+    print(f"multi-aspect pass:  {multi_seconds:7.2f}s  "
+          f"({results['multi_vs_single']:.2f}x one render, {results['speedup']:.2f}x faster than separate)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
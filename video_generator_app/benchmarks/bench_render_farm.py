@@ -0,0 +1,84 @@
+"""
+Render Farm Benchmark for Video Generator App
+Measures how render throughput scales with the number of worker processes
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from render_farm import RenderFarm, RenderQueue
+from fixtures import create_scene_fixtures
+
+
+def run_farm(work_dir, scenes, num_jobs, num_workers, encoder_threads):
+    """Render num_jobs copies of the scene set and return videos per minute"""
+    db_path = os.path.join(work_dir, f"queue_{num_workers}.sqlite3")
+    output_dir = os.path.join(work_dir, f"videos_{num_workers}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    queue = RenderQueue(db_path)
+    for i in range(num_jobs):
+        queue.enqueue(scenes, os.path.join(output_dir, f"video_{i:03d}.mp4"))
+    queue.close()
+
+    farm = RenderFarm(db_path, num_workers=num_workers, encoder_threads=encoder_threads,
+                      video_fps=24, heartbeat_interval=1.0)
+    started = time.perf_counter()
+    counts = farm.run_until_empty(poll_interval=0.1)
+    elapsed = time.perf_counter() - started
+
+    output_bytes = sum(os.path.getsize(os.path.join(output_dir, name)) for name in os.listdir(output_dir))
+    return {
+        "workers": num_workers,
+        "seconds": elapsed,
+        "videos_per_minute": 60.0 * counts["done"] / elapsed,
+        "failed": counts["failed"],
+        "output_bytes": output_bytes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=8, help="Videos rendered per run")
+    parser.add_argument("--scenes", type=int, default=3, help="Scenes per video")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        help="Worker counts to try (default: 1, 2, 4, ... up to CPU count)")
+    parser.add_argument("--encoder-threads", type=int, default=1)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    worker_counts = args.workers
+    if not worker_counts:
+        cpu_count = os.cpu_count() or 1
+        worker_counts = [n for n in (1, 2, 4, 8, 16, 32, 64) if n <= cpu_count]
+
+    work_dir = tempfile.mkdtemp(prefix="bench_render_farm_")
+    try:
+        scenes = create_scene_fixtures(os.path.join(work_dir, "fixtures"), args.scenes)
+        results = []
+        for num_workers in worker_counts:
+            result = run_farm(work_dir, scenes, args.jobs, num_workers, args.encoder_threads)
+            baseline = results[0] if results else result
+            result["speedup"] = result["videos_per_minute"] / baseline["videos_per_minute"]
+            result["efficiency"] = result["speedup"] * baseline["workers"] / num_workers
+            results.append(result)
+            print(f"{num_workers:3d} workers: {result['videos_per_minute']:7.2f} videos/min  "
+                  f"speedup {result['speedup']:.2f}x  efficiency {result['efficiency']:.0%}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"benchmark": "render_farm", "jobs": args.jobs, "scenes": args.scenes,
+                       "encoder_threads": args.encoder_threads, "results": results}, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Startup Benchmark for Video Generator App
+Measures cold import time of main_app and checks that heavy modules stay lazy
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be imported until first use. PIL.Image and
+# PIL.ImageTk are not listed because customtkinter itself imports them.
+HEAVY_MODULES = [
+    "moviepy.editor",
+    "numpy",
+    "imageio",
+    "google.cloud.aiplatform",
+    "vertexai",
+    "google.cloud.texttospeech",
+]
+
+PROBE = (
+    "import sys, json; import main_app; "
+    f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+)
+
+
+def measure_import(runs):
+    """Import main_app in fresh interpreters and return (best seconds, loaded heavy modules)"""
+    timings = []
+    loaded = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", PROBE], cwd=APP_DIR,
+                                capture_output=True, text=True, check=True)
+        timings.append(time.perf_counter() - started)
+        loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return min(timings), loaded
+
+
+def slowest_imports(limit):
+    """Get the slowest top-level imports of main_app from python -X importtime"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main_app"],
+                            cwd=APP_DIR, capture_output=True, text=True, check=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        entries.append((int(cumulative_us), name.strip()))
+    return sorted(entries, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget", type=float, default=1.0, help="Maximum cold import time in seconds")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time (best is kept)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    seconds, loaded = measure_import(args.runs)
+    slowest = slowest_imports(10)
+
+    print(f"main_app cold import: {seconds * 1000:.0f} ms (budget {args.budget * 1000:.0f} ms)")
+    for cumulative_us, name in slowest:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+    if loaded:
+        print(f"Heavy modules imported at startup: {', '.join(loaded)}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "benchmark": "startup",
+                "import_seconds": seconds,
+                "budget_seconds": args.budget,
+                "heavy_modules_loaded": loaded,
+                "slowest_imports": [{"name": name, "cumulative_ms": us / 1000} for us, name in slowest],
+            }, f, indent=4)
+
+    if seconds > args.budget or loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Fake GCP Clients for Video Generator App Benchmarks
+Drop-in stand-ins for GeminiClient, ImagenClient and TTSClient with
+configurable latency and failure rates, and a stand-in Gemini model backend
+that accounts input tokens
+"""
+
+import os
+import sys
+import json
+import zlib
+import time
+import random
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cancellation import raise_if_cancelled
+from fixtures import create_scene_image, create_tone
+from gcp_clients.gemini_context import estimate_tokens
+
+
+class FakeServiceError(Exception):
+    """Simulated transient API failure"""
+
+
+class FakeBackend:
+    """Shared latency, failure and call-count behaviour of the fake clients"""
+
+    def __init__(self, latency=0.0, jitter=0.0, failure_rate=0.0, seed=None):
+        """Initialize the fake backend
+
+        Args:
+            latency: Mean seconds per call
+            jitter: Uniform +/- seconds added to each call's latency
+            failure_rate: Probability (0.0 to 1.0) that a call raises FakeServiceError
+            seed: Random seed for reproducible runs; each client class
+                derives its own stream from it, so the clients do not fail
+                on the same call indices
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        if seed is not None:
+            # crc32 rather than hash(): string hashes change between runs
+            seed += zlib.crc32(type(self).__name__.encode("utf-8"))
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+
+    def simulate_call(self, name, cancel_token=None):
+        """Sleep for the simulated latency and maybe fail
+
+        With a cancel_token the sleep ends early and raises OperationCancelled.
+        """
+        raise_if_cancelled(cancel_token)
+        with self.lock:
+            self.calls += 1
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            fail = self.random.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+
+        if cancel_token is not None:
+            cancel_token.wait(delay)
+            raise_if_cancelled(cancel_token)
+        else:
+            time.sleep(delay)
+        if fail:
+            raise FakeServiceError(f"Simulated failure in {name}")
+
+    def get_stats(self):
+        """Get call and failure counts"""
+        with self.lock:
+            return {"calls": self.calls, "failures": self.failures}
+
+
+class FakeGeminiClient(FakeBackend):
+    """Stand-in for GeminiClient"""
+
+    def generate_script(self, topic, num_scenes=4, cancel_token=None):
+        self.simulate_call("generate_script", cancel_token)
+        lines = [f"# สคริปต์วิดีโอ: {topic}", ""]
+        for i in range(num_scenes):
+            lines += [
+                f"## ฉากที่ {i + 1}: ฉาก {i + 1}",
+                f"**คำพูด**: คำบรรยายของฉากที่ {i + 1} เกี่ยวกับ{topic}",
+                f"**ภาพ**: ภาพประกอบฉากที่ {i + 1} เกี่ยวกับ{topic}",
+                "",
+            ]
+        return "\n".join(lines)
+
+    def generate_image_prompt_for_scene(self, scene_description, image_style_config, cancel_token=None):
+        self.simulate_call("generate_image_prompt_for_scene", cancel_token)
+        return f"Photorealistic illustration of: {scene_description}"
+
+    def parse_script(self, script_text, cancel_token=None):
+        self.simulate_call("parse_script", cancel_token)
+        scenes = []
+        for block in script_text.split("## ")[1:]:
+            lines = block.splitlines()
+            scenes.append({
+                "scene_number": len(scenes) + 1,
+                "title": lines[0].split(":", 1)[-1].strip(),
+                "speech": lines[1].split(":", 1)[-1].strip(),
+                "description": lines[2].split(":", 1)[-1].strip(),
+            })
+        return json.dumps(scenes, ensure_ascii=False)
+
+
+class FakeCacheMissing(Exception):
+    """Simulated request against an expired cached content"""
+
+
+class FakeUsage:
+    """Token counts in the shape of a Gemini response's usage_metadata"""
+
+    def __init__(self, prompt_token_count, cached_content_token_count):
+        self.prompt_token_count = prompt_token_count
+        self.cached_content_token_count = cached_content_token_count
+
+
+class FakeResponse:
+    def __init__(self, text, usage_metadata):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class FakeCachedContent:
+    """Stand-in for a server-side cached content"""
+
+    def __init__(self, system_instruction, ttl):
+        self.system_instruction = system_instruction
+        self.tokens = estimate_tokens(system_instruction)
+        self.ttl = ttl
+        self.deleted = False
+
+
+class FakeGeminiModel:
+    """Stand-in for GenerativeModel
+
+    Uncached input tokens cost input_token_seconds each on top of the
+    backend latency (prompt processing); cached tokens cost
+    cached_token_seconds.
+    """
+
+    def __init__(self, factory, system_instruction=None, cached_content=None):
+        self.factory = factory
+        self.system_instruction = system_instruction
+        self.cached_content = cached_content
+
+    def generate_content(self, text):
+        cached_tokens = 0
+        if self.cached_content is not None:
+            if self.cached_content.deleted:
+                raise FakeCacheMissing("Cached content not found")
+            cached_tokens = self.cached_content.tokens
+        sent_tokens = estimate_tokens(text) + estimate_tokens(self.system_instruction)
+
+        self.factory.simulate_call("generate_content")
+        self.factory.record_request(sent_tokens, cached_tokens)
+        time.sleep(sent_tokens * self.factory.input_token_seconds +
+                   cached_tokens * self.factory.cached_token_seconds)
+        return FakeResponse("ok", FakeUsage(sent_tokens + cached_tokens, cached_tokens))
+
+
+class FakeModelFactory(FakeBackend):
+    """Stand-in for VertexModelFactory that counts the input tokens sent"""
+
+    def __init__(self, input_token_seconds=0.0, cached_token_seconds=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.input_token_seconds = input_token_seconds
+        self.cached_token_seconds = cached_token_seconds
+        self.requests = 0
+        self.sent_tokens = 0
+        self.cached_tokens = 0
+        self.caches_created = 0
+
+    def record_request(self, sent_tokens, cached_tokens):
+        with self.lock:
+            self.requests += 1
+            self.sent_tokens += sent_tokens
+            self.cached_tokens += cached_tokens
+
+    def create_model(self, model_name, system_instruction=None):
+        return FakeGeminiModel(self, system_instruction)
+
+    def create_cache(self, model_name, system_instruction, ttl, display_name=None):
+        self.simulate_call("create_cache")
+        with self.lock:
+            self.caches_created += 1
+        time.sleep(estimate_tokens(system_instruction) * self.input_token_seconds)
+        return FakeCachedContent(system_instruction, ttl)
+
+    def model_from_cache(self, handle):
+        return FakeGeminiModel(self, cached_content=handle)
+
+    def refresh_cache(self, handle, ttl):
+        handle.ttl = ttl
+
+    def delete_cache(self, handle):
+        handle.deleted = True
+
+    def is_cache_missing(self, error):
+        return isinstance(error, FakeCacheMissing)
+
+    def get_stats(self):
+        """Get call, token and cache counts"""
+        with self.lock:
+            return {"calls": self.calls, "failures": self.failures, "requests": self.requests,
+                    "sent_tokens": self.sent_tokens, "cached_tokens": self.cached_tokens,
+                    "caches_created": self.caches_created}
+
+
+class FakeImagenClient(FakeBackend):
+    """Stand-in for ImagenClient that draws a synthetic image"""
+
+    def generate_image(self, image_prompt, width, height, output_path, cancel_token=None):
+        self.simulate_call("generate_image", cancel_token)
+        index = sum(map(ord, image_prompt)) % 256
+        return create_scene_image(output_path, width, height, index)
+
+
+class FakeTTSClient(FakeBackend):
+    """Stand-in for TTSClient that writes a sine tone as narration
+
+    The tone is WAV data, so the returned path has a .wav extension.
+    """
+
+    def __init__(self, chars_per_second=15.0, max_duration=None, **kwargs):
+        super().__init__(**kwargs)
+        self.chars_per_second = chars_per_second
+        self.max_duration = max_duration
+
+    def generate_audio_for_scene(self, text_to_speak, voice_config, output_path, cancel_token=None):
+        self.simulate_call("generate_audio_for_scene", cancel_token)
+        duration = len(text_to_speak) / self.chars_per_second / voice_config.get("speaking_rate", 1.0)
+        if self.max_duration:
+            duration = min(duration, self.max_duration)
+
+        output_path = os.path.splitext(output_path)[0] + ".wav"
+        create_tone(output_path, duration)
+        return {"path": output_path, "duration": duration}
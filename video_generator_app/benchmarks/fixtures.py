@@ -0,0 +1,64 @@
+"""
+Synthetic Fixtures for Video Generator App Benchmarks
+Creates scene images and narration tones locally, without any API calls
+"""
+
+import os
+import math
+import wave
+import array
+
+from PIL import Image, ImageDraw
+
+
+def create_scene_image(output_path, width, height, index=0):
+    """Create a gradient test image with a scene number and save it as PNG"""
+    hue = (index * 47) % 256
+    gradient = Image.linear_gradient("L").resize((width, height))
+    image = Image.merge("RGB", (
+        gradient,
+        gradient.point(lambda v: (v + hue) % 256),
+        Image.new("L", (width, height), hue),
+    ))
+    draw = ImageDraw.Draw(image)
+    draw.text((width // 10, height // 10), f"Scene {index + 1}", fill=(255, 255, 255))
+    image.save(output_path)
+    return output_path
+
+
+def create_tone(output_path, duration, frequency=440.0, sample_rate=22050):
+    """Create a mono sine-wave WAV file standing in for narration"""
+    num_samples = int(duration * sample_rate)
+    step = 2 * math.pi * frequency / sample_rate
+    samples = array.array("h", (int(8000 * math.sin(i * step)) for i in range(num_samples)))
+
+    with wave.open(output_path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.tobytes())
+    return output_path
+
+
+def create_scene_fixtures(directory, num_scenes, width=540, height=960, duration=2.0):
+    """Create images and tones for num_scenes scenes
+
+    Returns:
+        List of scene dictionaries in the format expected by
+        MediaProcessor.create_video_from_scenes
+    """
+    os.makedirs(directory, exist_ok=True)
+    scenes = []
+    for i in range(num_scenes):
+        image_path = os.path.join(directory, f"scene_{i + 1:03d}.png")
+        audio_path = os.path.join(directory, f"scene_{i + 1:03d}.wav")
+        if not os.path.exists(image_path):
+            create_scene_image(image_path, width, height, i)
+        if not os.path.exists(audio_path):
+            create_tone(audio_path, duration, frequency=220.0 + 20 * (i % 12))
+        scenes.append({
+            "image_path": image_path,
+            "audio_path": audio_path,
+            "audio_duration": duration,
+        })
+    return scenes
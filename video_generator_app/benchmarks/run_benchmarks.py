@@ -0,0 +1,287 @@
+"""
+End-to-End Benchmark Suite for Video Generator App
+Runs the full generation and render pipeline against fake GCP clients and
+synthetic media, and writes machine-readable results for regression checks
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+DEFAULT_SCENE_COUNTS = [1, 10, 50, 200]
+
+
+class ResourceSampler:
+    """Samples RSS and open file descriptors of this process and its children
+
+    Uses /proc, so only Linux reports the whole process tree; elsewhere the
+    peaks fall back to getrusage() and descriptors are not counted.
+    """
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak_rss_bytes = 0
+        self.peak_fds = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._has_proc = os.path.isdir("/proc/self/fd")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        if resource is not None:
+            # ru_maxrss is in kilobytes on Linux, bytes on macOS
+            scale = 1 if sys.platform == "darwin" else 1024
+            self_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+            self.peak_rss_bytes = max(self.peak_rss_bytes, self_peak)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if self._has_proc:
+                rss, fds = self._sample_tree(os.getpid())
+                self.peak_rss_bytes = max(self.peak_rss_bytes, rss)
+                self.peak_fds = max(self.peak_fds, fds)
+
+    @staticmethod
+    def _sample_tree(root_pid):
+        """Sum RSS and descriptor counts over root_pid and its descendants"""
+        children = {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", "r") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+
+        rss = fds = 0
+        pending = [root_pid]
+        while pending:
+            pid = pending.pop()
+            pending.extend(children.get(pid, []))
+            try:
+                with open(f"/proc/{pid}/statm", "r") as f:
+                    rss += int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+                fds += len(os.listdir(f"/proc/{pid}/fd"))
+            except (OSError, ValueError):
+                continue
+        return rss, fds
+
+
+def summarize_stages(timings):
+    """Group task timings by stage name ("image:3" -> "image")"""
+    stages = {}
+    for name, (started_at, finished_at) in timings.items():
+        stage = name.split(":", 1)[0]
+        summary = stages.setdefault(stage, {"count": 0, "total_seconds": 0.0,
+                                            "first_start": started_at, "last_end": finished_at})
+        summary["count"] += 1
+        summary["total_seconds"] += finished_at - started_at
+        summary["first_start"] = min(summary["first_start"], started_at)
+        summary["last_end"] = max(summary["last_end"], finished_at)
+
+    for summary in stages.values():
+        # Span from the stage's first start to its last finish
+        summary["wall_seconds"] = summary.pop("last_end") - summary.pop("first_start")
+    return stages
+
+
+def run_case(num_scenes, settings):
+    """Run one pipeline benchmark in this process and return its metrics"""
+    from pipeline_scheduler import PipelineScheduler, build_video_pipeline
+    from fake_clients import FakeGeminiClient, FakeImagenClient, FakeTTSClient
+    from tracing import tracer
+
+    if settings.get("trace_dir"):
+        tracer.enabled = True
+
+    backend = {"latency": settings["latency"], "jitter": settings["latency"] / 2,
+               "failure_rate": settings["failure_rate"], "seed": settings["seed"]}
+    gemini = FakeGeminiClient(**backend)
+    imagen = FakeImagenClient(**backend)
+    tts = FakeTTSClient(max_duration=settings["scene_duration"], **backend)
+
+    config = {
+        "image_width": settings["width"],
+        "image_height": settings["height"],
+        "video_fps": settings["fps"],
+    }
+    scenes = [
+        {"speech": f"คำบรรยายสำหรับฉากที่ {i + 1} " * 4, "description": f"ภาพประกอบฉากที่ {i + 1}"}
+        for i in range(num_scenes)
+    ]
+
+    work_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    try:
+        scheduler = PipelineScheduler(io_workers=settings["io_workers"],
+                                      cpu_workers=settings["cpu_workers"])
+        build_video_pipeline(scheduler, scenes, os.path.join(work_dir, "video.mp4"),
+                             gemini, imagen, tts, config, work_dir)
+
+        with ResourceSampler() as sampler:
+            started = time.perf_counter()
+            results = scheduler.run()
+            wall_seconds = time.perf_counter() - started
+
+        if settings.get("trace_dir"):
+            os.makedirs(settings["trace_dir"], exist_ok=True)
+            tracer.export_chrome_trace(os.path.join(settings["trace_dir"], f"trace_{num_scenes}_scenes.json"))
+
+        stages = summarize_stages(scheduler.get_timings())
+        video_seconds = sum(results[f"audio:{i}"]["duration"] for i in range(num_scenes))
+        frames = video_seconds * settings["fps"]
+        segment = stages.get("segment", {})
+
+        return {
+            "scenes": num_scenes,
+            "wall_seconds": wall_seconds,
+            "video_seconds": video_seconds,
+            "stages": stages,
+            "render_fps": frames / segment["wall_seconds"] if segment.get("wall_seconds") else None,
+            "render_fps_per_worker": frames / segment["total_seconds"] if segment.get("total_seconds") else None,
+            "retries": sum(task.attempts - 1 for task in scheduler.tasks.values() if task.attempts),
+            "api_calls": {
+                "gemini": gemini.get_stats(),
+                "imagen": imagen.get_stats(),
+                "tts": tts.get_stats(),
+            },
+            "peak_rss_mb": sampler.peak_rss_bytes / (1024 * 1024),
+            "peak_fds": sampler.peak_fds if sampler.peak_fds else None,
+            "output_bytes": os.path.getsize(os.path.join(work_dir, "video.mp4")),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_case_isolated(num_scenes, settings):
+    """Run one case in a fresh interpreter so peak memory is not shared"""
+    cmd = [sys.executable, os.path.abspath(__file__), "--case", str(num_scenes),
+           "--settings", json.dumps(settings)]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Benchmark case with {num_scenes} scenes failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare_results(current, baseline, tolerance):
+    """Print per-case changes against a baseline run
+
+    Returns:
+        List of regression descriptions (wall time or render fps worse
+        than the baseline by more than tolerance)
+    """
+    baseline_cases = {case["scenes"]: case for case in baseline["cases"]}
+    regressions = []
+    for case in current["cases"]:
+        old = baseline_cases.get(case["scenes"])
+        if old is None:
+            continue
+
+        wall_change = case["wall_seconds"] / old["wall_seconds"] - 1
+        print(f"{case['scenes']:4d} scenes: wall {old['wall_seconds']:.2f}s -> "
+              f"{case['wall_seconds']:.2f}s ({wall_change:+.0%})")
+        if wall_change > tolerance:
+            regressions.append(f"{case['scenes']} scenes: wall time {wall_change:+.0%}")
+
+        if case.get("render_fps") and old.get("render_fps"):
+            fps_change = case["render_fps"] / old["render_fps"] - 1
+            if fps_change < -tolerance:
+                regressions.append(f"{case['scenes']} scenes: render fps {fps_change:+.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenes", type=int, nargs="+", default=DEFAULT_SCENE_COUNTS,
+                        help="Scene counts to benchmark")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean fake API latency (s)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fake API failure probability")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--width", type=int, default=540)
+    parser.add_argument("--height", type=int, default=960)
+    parser.add_argument("--fps", type=int, default=24)
+    parser.add_argument("--scene-duration", type=float, default=2.0, help="Max narration per scene (s)")
+    parser.add_argument("--io-workers", type=int, default=8)
+    parser.add_argument("--cpu-workers", type=int, default=None)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed slowdown before --compare reports a regression")
+    parser.add_argument("--trace-dir", help="Write a Chrome trace per case into this directory")
+    parser.add_argument("--case", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--settings", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case is not None:
+        # Child process: run a single case and print its JSON
+        print(json.dumps(run_case(args.case, json.loads(args.settings))))
+        return
+
+    settings = {
+        "latency": args.latency,
+        "failure_rate": args.failure_rate,
+        "seed": args.seed,
+        "width": args.width,
+        "height": args.height,
+        "fps": args.fps,
+        "scene_duration": args.scene_duration,
+        "io_workers": args.io_workers,
+        "cpu_workers": args.cpu_workers,
+        "trace_dir": os.path.abspath(args.trace_dir) if args.trace_dir else None,
+    }
+    results = {
+        "benchmark": "pipeline",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": settings,
+        "cases": [],
+    }
+
+    for num_scenes in args.scenes:
+        case = run_case_isolated(num_scenes, settings)
+        results["cases"].append(case)
+        print(f"{num_scenes:4d} scenes: {case['wall_seconds']:7.2f}s wall, "
+              f"render {case['render_fps'] or 0:7.1f} fps, "
+              f"peak RSS {case['peak_rss_mb']:7.1f} MB, peak fds {case['peak_fds']}, "
+              f"retries {case['retries']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare_results(results, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Cancellation Module for Video Generator App
+Tokens that let the GUI stop running generation and render jobs
+"""
+
+import threading
+
+
+class OperationCancelled(Exception):
+    """Raised inside a job when its cancellation token was cancelled"""
+
+
+class CancellationToken:
+    """Thread-safe flag passed down to clients, the scheduler and the renderer"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        """Whether cancel() has been called"""
+        return self._event.is_set()
+
+    def cancel(self):
+        """Cancel the job and run the registered callbacks (once)"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in cancellation callback: {str(e)}")
+
+    def on_cancel(self, callback):
+        """Register callback() to run on cancel (immediately if already cancelled)
+
+        Returns:
+            A function that unregisters the callback; call it once the
+            work the callback would stop has finished, so a long-lived
+            token does not keep it alive
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+
+    def _remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        """Raise OperationCancelled if the job was cancelled"""
+        if self._event.is_set():
+            raise OperationCancelled("Operation cancelled")
+
+    def wait(self, timeout=None):
+        """Sleep up to timeout seconds, returning True early if cancelled"""
+        return self._event.wait(timeout)
+
+
+def raise_if_cancelled(cancel_token):
+    """Check an optional token"""
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
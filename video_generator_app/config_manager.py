@@ -4,10 +4,30 @@ Handles reading and writing configuration settings
 """
 
 import os
+import copy
 import json
+import tempfile
+import threading
 import configparser
+from contextlib import contextmanager
 from pathlib import Path
 
+from asset_store import AssetStore
+
+
+class ConfigBatch:
+    """Pending changes collected inside ConfigManager.batch_update()"""
+    
+    def __init__(self):
+        self.changes = {}
+    
+    def set(self, key, value):
+        """Stage a change; key may use dot notation (e.g. "output_paths.scripts")"""
+        self.changes[key] = value
+    
+    __setitem__ = set
+
+
 class ConfigManager:
     """Manages application configuration settings"""
     
@@ -18,69 +38,283 @@ class ConfigManager:
         "image_width": 1080,
         "image_height": 1920,
         "video_fps": 30,
+        "qa_artifacts": True,
+        "captions": "soft",
         "default_tts_voice": "th-TH-Neural2-C",
         "default_image_style_prompt": "ภาพถ่ายสมจริง, แสงสวยงาม, มุมกล้องระดับสายตา",
         "output_paths": {
             "scripts": "generated_content/scripts",
             "images": "generated_content/images",
             "audios": "generated_content/audios",
-            "videos": "generated_content/videos"
+            "videos": "generated_content/videos",
+            "jobs": "generated_content/jobs",
+            "thumbnails": "generated_content/thumbnails",
+            "assets": "generated_content/assets",
+            "projects": "generated_content/projects"
+        },
+        "render_farm": {
+            "workers": 0,
+            "encoder_threads": 2,
+            "memory_limit_mb": 4096,
+            "heartbeat_interval": 5,
+            "stale_timeout": 60
+        },
+        "gemini": {
+            "model": "gemini-1.5-pro-002",
+            "cache_ttl_seconds": 3600,
+            "min_cache_tokens": 32768
+        },
+        "encoder_quality": "standard",
+        "encoder_profiles": {},
+        "asset_store": {
+            "quota_mb": 0,
+            "gc_grace_seconds": 3600
+        },
+        "tracing": {
+            "enabled": False,
+            "metrics_port": 0,
+            "chrome_trace_path": ""
         }
     }
     
     def __init__(self, config_file_path="config.json"):
         """Initialize with path to config file"""
         self.config_file_path = config_file_path
+        self.subscribers = []
+        self._lock = threading.RLock()
+        self._batch = None
+        self._file_stamp = None
         self.config = self._load_config()
     
+    def _stat_file(self):
+        """Get (mtime_ns, size) of the config file, or None if it is missing"""
+        try:
+            stat = os.stat(self.config_file_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
     def _load_config(self):
         """Load configuration from file or create default if not exists"""
         if os.path.exists(self.config_file_path):
             try:
+                self._file_stamp = self._stat_file()
                 with open(self.config_file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    return self._merge_defaults(json.load(f))
             except (json.JSONDecodeError, UnicodeDecodeError) as e:
                 print(f"Error loading config file: {e}")
                 return self._create_default_config()
         else:
             return self._create_default_config()
     
+    def _merge_defaults(self, config):
+        """Fill in settings added since the config file was written"""
+        for key, value in self.DEFAULT_CONFIG.items():
+            if key not in config:
+                config[key] = copy.deepcopy(value)
+            elif isinstance(value, dict) and isinstance(config[key], dict):
+                for sub_key, sub_value in value.items():
+                    config[key].setdefault(sub_key, copy.deepcopy(sub_value))
+        return config
+    
     def _create_default_config(self):
         """Create and save default configuration"""
-        self.save_config(self.DEFAULT_CONFIG)
-        return self.DEFAULT_CONFIG.copy()
+        # Deep copy so edits never leak into the nested DEFAULT_CONFIG dicts
+        config = copy.deepcopy(self.DEFAULT_CONFIG)
+        self.save_config(config)
+        return config
     
     def save_config(self, config=None):
-        """Save configuration to file"""
+        """Save configuration to file
+        
+        The file is written to a temporary file in the same directory and
+        renamed over config.json, so readers never see a half-written file.
+        """
         if config is None:
             config = self.config
         
+        config_dir = os.path.dirname(os.path.abspath(self.config_file_path))
+        temp_path = None
         try:
-            with open(self.config_file_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4, ensure_ascii=False)
+            with self._lock:
+                fd, temp_path = tempfile.mkstemp(dir=config_dir, prefix=".config.", suffix=".tmp")
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(config, f, indent=4, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.config_file_path)
+                temp_path = None
+                self._file_stamp = self._stat_file()
             return True
         except Exception as e:
             print(f"Error saving config file: {e}")
             return False
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
     
     def get_config(self):
         """Get current configuration"""
         return self.config
     
     def update_config(self, key, value):
-        """Update a specific configuration value"""
-        # Handle nested keys with dot notation (e.g., "output_paths.scripts")
+        """Update a specific configuration value
+        
+        Each call writes the file; use batch_update() to change several values.
+        """
+        try:
+            with self.batch_update() as batch:
+                batch.set(key, value)
+            return True
+        except ValueError as e:
+            print(f"Invalid config value: {e}")
+            return False
+        except OSError:
+            return False
+    
+    @contextmanager
+    def batch_update(self):
+        """Collect several changes and apply them as one transaction
+        
+        All staged values are validated before anything changes, the file
+        is written once, and subscribers are notified once. If the block
+        raises, a value is invalid (ValueError) or the file cannot be
+        written (OSError), nothing is applied.
+        Nested batches join the outermost one.
+        
+        Example:
+            with config_manager.batch_update() as batch:
+                batch["image_width"] = 1080
+                batch["output_paths.videos"] = "out/videos"
+        """
+        with self._lock:
+            if self._batch is not None:
+                yield self._batch
+                return
+            
+            self._batch = ConfigBatch()
+            try:
+                yield self._batch
+                changes = self._batch.changes
+            finally:
+                self._batch = None
+            
+            self._commit(changes)
+    
+    def _commit(self, changes):
+        """Validate, write and publish a set of staged changes"""
+        for key, value in changes.items():
+            self._validate(key, value)
+        
+        new_config = copy.deepcopy(self.config)
+        for key, value in changes.items():
+            self._set_value(new_config, key, value)
+        
+        changed = self._diff(self.config, new_config)
+        if not changed:
+            return
+        
+        if not self.save_config(new_config):
+            raise OSError(f"Could not write {self.config_file_path}")
+        
+        # Update in place so references from get_config() stay current
+        self.config.clear()
+        self.config.update(new_config)
+        self._notify(changed)
+    
+    def _validate(self, key, value):
+        """Check a staged value against the type of its default"""
+        main_key, _, sub_key = key.partition(".")
+        default = self.DEFAULT_CONFIG.get(main_key)
+        if sub_key:
+            if main_key not in self.config or not isinstance(self.config[main_key], dict):
+                raise ValueError(f"Invalid config key: {key}")
+            default = default.get(sub_key) if isinstance(default, dict) else None
+        
+        if default is None:
+            return
+        if isinstance(default, bool):
+            valid = isinstance(value, bool)
+        elif isinstance(default, (int, float)):
+            # Any number will do, but bool is a subclass of int
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+        else:
+            valid = isinstance(value, type(default))
+        
+        if not valid:
+            raise ValueError(f"{key} must be {type(default).__name__}, got {type(value).__name__}")
+    
+    @staticmethod
+    def _set_value(config, key, value):
         if "." in key:
             main_key, sub_key = key.split(".", 1)
-            if main_key in self.config and isinstance(self.config[main_key], dict):
-                self.config[main_key][sub_key] = value
-            else:
-                print(f"Invalid config key: {key}")
-                return False
+            config[main_key][sub_key] = value
         else:
-            self.config[key] = value
+            config[key] = value
+    
+    @staticmethod
+    def _diff(old, new):
+        """Get changed values as {key: new value}, using dot keys for sections"""
+        changed = {}
+        for key in set(old) | set(new):
+            old_value, new_value = old.get(key), new.get(key)
+            if isinstance(old_value, dict) and isinstance(new_value, dict):
+                for sub_key in set(old_value) | set(new_value):
+                    if old_value.get(sub_key) != new_value.get(sub_key):
+                        changed[f"{key}.{sub_key}"] = new_value.get(sub_key)
+            elif old_value != new_value:
+                changed[key] = new_value
+        return changed
+    
+    def subscribe(self, callback):
+        """Call callback(changes) after each applied update or reload
         
-        return self.save_config()
+        changes maps the changed keys (dot notation for sections) to their
+        new values.
+        """
+        self.subscribers.append(callback)
+    
+    def unsubscribe(self, callback):
+        """Stop notifying callback"""
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+    
+    def _notify(self, changed):
+        for callback in list(self.subscribers):
+            try:
+                callback(changed)
+            except Exception as e:
+                print(f"Error in config subscriber: {e}")
+    
+    def reload_if_changed(self):
+        """Re-read the config file if another process replaced it
+        
+        Only the file's mtime and size are checked, so this is cheap enough
+        to call before every job.
+        
+        Returns:
+            True if the configuration was reloaded
+        """
+        with self._lock:
+            stamp = self._stat_file()
+            if stamp is None or stamp == self._file_stamp:
+                return False
+            
+            try:
+                with open(self.config_file_path, 'r', encoding='utf-8') as f:
+                    new_config = self._merge_defaults(json.load(f))
+            except (OSError, json.JSONDecodeError, UnicodeDecodeError) as e:
+                print(f"Error reloading config file: {e}")
+                return False
+            
+            self._file_stamp = stamp
+            changed = self._diff(self.config, new_config)
+            self.config.clear()
+            self.config.update(new_config)
+        
+        if changed:
+            self._notify(changed)
+        return True
     
     def get_full_path(self, path_key):
         """Get absolute path for a relative output path"""
@@ -93,6 +327,16 @@ class ConfigManager:
         
         return os.path.join(base_dir, relative_path)
     
+    def get_asset_store(self):
+        """Get the content-addressed store for generated assets"""
+        store_config = self.config.get("asset_store", {})
+        quota_mb = store_config.get("quota_mb")
+        return AssetStore(
+            self.get_full_path("assets"),
+            quota_bytes=quota_mb * 1024 * 1024 if quota_mb else None,
+            gc_grace_seconds=store_config.get("gc_grace_seconds", 3600)
+        )
+    
     def ensure_directories_exist(self):
         """Ensure all output directories exist"""
         for path_key in self.config["output_paths"]:
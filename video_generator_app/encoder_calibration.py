@@ -0,0 +1,260 @@
+"""
+Encoder Calibration Module for Video Generator App
+Measures x264 settings on this machine and saves the best profile per quality tier
+"""
+
+import os
+import re
+import time
+import shutil
+import platform
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from lazy_imports import lazy_import
+from frame_writer import RawFrameWriter
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+ImageFilter = lazy_import("PIL.ImageFilter")
+motion_engine = lazy_import("motion_engine")
+
+# Each tier lists the CRFs to search, the lowest visual quality it accepts
+# (SSIM against the lossless source) and how much larger than the tier's
+# smallest acceptable file a faster setting may make the video
+QUALITY_TIERS = {
+    "draft": {"crfs": [26, 28, 30], "min_ssim": 0.94, "max_size_ratio": 2.0},
+    "standard": {"crfs": [20, 23, 26], "min_ssim": 0.965, "max_size_ratio": 1.25},
+    "high": {"crfs": [16, 18, 20], "min_ssim": 0.98, "max_size_ratio": 1.1},
+}
+
+DEFAULT_PRESETS = ["ultrafast", "veryfast", "faster", "medium"]
+
+
+def default_thread_counts():
+    """Thread counts worth trying on this machine"""
+    cpus = os.cpu_count() or 1
+    return sorted({1, max(1, cpus // 2), cpus})
+
+
+def default_segment_workers():
+    """Segment parallelism worth trying on this machine"""
+    cpus = os.cpu_count() or 1
+    return sorted({1, min(2, cpus), max(1, cpus // 4)})
+
+
+def create_calibration_source(ffmpeg_binary, output_path, width, height, fps, seconds, num_scenes=3):
+    """Render a lossless synthetic clip with textured scenes, motion and crossfades
+
+    The texture gives the encoder real work; flat test gradients compress
+    so easily that every preset looks alike.
+
+    Returns:
+        Number of frames in the clip
+    """
+    work_dir = tempfile.mkdtemp(prefix="calibration_")
+    try:
+        scenes = []
+        for i in range(num_scenes):
+            noise = Image.effect_noise((width, height), 48 + 16 * i).filter(ImageFilter.GaussianBlur(1.5))
+            gradient = Image.linear_gradient("L").resize((width, height))
+            image = Image.merge("RGB", (noise, gradient, gradient.rotate(90 * i).resize((width, height))))
+            image_path = os.path.join(work_dir, f"scene_{i}.png")
+            image.save(image_path)
+            scenes.append({"image_path": image_path})
+
+        renderer = motion_engine.MotionRenderer(width, height, fps)
+        writer = RawFrameWriter(ffmpeg_binary, output_path, width, height, fps,
+                                encoder_args=["-preset", "ultrafast", "-qp", "0"])
+        total = 0
+        with writer:
+            for frames, _, total in renderer.render(scenes, [seconds / num_scenes] * num_scenes):
+                writer.write(frames)
+        return total
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def measure_ssim(ffmpeg_binary, encoded_path, source_path):
+    """Get the mean SSIM of an encode against its source (1.0 is identical)"""
+    result = subprocess.run([ffmpeg_binary, "-hide_banner", "-i", encoded_path, "-i", source_path,
+                             "-lavfi", "ssim", "-f", "null", "-"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+    return float(re.search(rb"All:([\d.]+)", result.stderr).group(1))
+
+
+def encode_trial(ffmpeg_binary, source_path, output_path, duration, preset, crf, threads, segment_workers):
+    """Encode the source with one setting combination
+
+    With segment_workers > 1 the clip is cut into that many time ranges
+    encoded by concurrent ffmpeg processes and joined with stream copy,
+    the way the pipeline encodes scene segments in parallel.
+
+    Returns:
+        (seconds, bytes, ssim)
+    """
+    work_dir = os.path.dirname(output_path)
+    encode_args = ["-an", "-c:v", "libx264", "-pix_fmt", "yuv420p", "-preset", preset, "-crf", str(crf),
+                   "-threads", str(threads)]
+
+    def run(cmd):
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+
+    started = time.perf_counter()
+    if segment_workers <= 1:
+        run([ffmpeg_binary, "-y", "-loglevel", "error", "-i", source_path] + encode_args + [output_path])
+    else:
+        length = duration / segment_workers
+        parts = [os.path.join(work_dir, f"part_{i}.mp4") for i in range(segment_workers)]
+        commands = [[ffmpeg_binary, "-y", "-loglevel", "error", "-ss", f"{i * length:.3f}",
+                     "-t", f"{length:.3f}", "-i", source_path] + encode_args + [part]
+                    for i, part in enumerate(parts)]
+        with ThreadPoolExecutor(max_workers=segment_workers) as executor:
+            list(executor.map(run, commands))
+
+        list_path = os.path.join(work_dir, "parts.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            f.writelines(f"file '{os.path.abspath(part)}'\n" for part in parts)
+        run([ffmpeg_binary, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path,
+             "-c", "copy", output_path])
+        for path in parts + [list_path]:
+            os.remove(path)
+    seconds = time.perf_counter() - started
+
+    size = os.path.getsize(output_path)
+    ssim = measure_ssim(ffmpeg_binary, output_path, source_path)
+    os.remove(output_path)
+    return seconds, size, ssim
+
+
+def pick_profiles(trials, tiers=QUALITY_TIERS):
+    """Choose the fastest trial per tier among those of acceptable quality and size
+
+    Trials at the tier's CRFs that reach its min_ssim are acceptable; if
+    none does (an unusually hard source), the tier's lowest CRF is used.
+    Of those, the fastest encode whose file is within max_size_ratio of
+    the smallest wins, so both CRF and speed settings trade against size.
+
+    Returns:
+        Dictionary of tier name to profile
+    """
+    profiles = {}
+    for tier, settings in tiers.items():
+        candidates = [trial for trial in trials if trial["crf"] in settings["crfs"]]
+        if not candidates:
+            continue
+        acceptable = [trial for trial in candidates if trial["ssim"] >= settings["min_ssim"]]
+        if not acceptable:
+            acceptable = [trial for trial in candidates if trial["crf"] == min(settings["crfs"])]
+        smallest = min(trial["bytes"] for trial in acceptable)
+        eligible = [trial for trial in acceptable if trial["bytes"] <= smallest * settings["max_size_ratio"]]
+        best = max(eligible, key=lambda trial: trial["encode_fps"])
+        profiles[tier] = {
+            "preset": best["preset"],
+            "crf": best["crf"],
+            "threads": best["threads"],
+            "segment_workers": best["segment_workers"],
+            "encode_fps": round(best["encode_fps"], 2),
+            "ssim": round(best["ssim"], 4),
+            "bytes_per_second": int(best["bytes_per_second"]),
+        }
+    return profiles
+
+
+def calibrate(ffmpeg_binary, width=540, height=960, fps=30, seconds=4.0, presets=None,
+              thread_counts=None, segment_workers=None, tiers=QUALITY_TIERS, progress=print):
+    """Encode a synthetic clip under every setting combination
+
+    Every CRF any tier lists is tried once and shared between tiers.
+    Combinations that would run more encoder threads than the machine has
+    CPUs are skipped.
+
+    Args:
+        ffmpeg_binary: Path to ffmpeg
+        width, height, fps, seconds: Shape of the synthetic clip
+        presets: x264 presets to try (defaults to DEFAULT_PRESETS)
+        thread_counts: Threads per ffmpeg process to try
+        segment_workers: Concurrent segment encodes to try
+        tiers: Quality tiers (see QUALITY_TIERS)
+        progress: Callable receiving a line per trial (None for silence)
+
+    Returns:
+        (profiles, trials): the best profile per tier and every measurement
+    """
+    presets = presets or DEFAULT_PRESETS
+    thread_counts = thread_counts or default_thread_counts()
+    segment_workers = segment_workers or default_segment_workers()
+    cpus = os.cpu_count() or 1
+
+    work_dir = tempfile.mkdtemp(prefix="calibration_")
+    try:
+        source_path = os.path.join(work_dir, "source.mp4")
+        frames = create_calibration_source(ffmpeg_binary, source_path, width, height, fps, seconds)
+        duration = frames / fps
+
+        crfs = sorted({crf for settings in tiers.values() for crf in settings["crfs"]})
+        trials = []
+        for crf in crfs:
+            for preset in presets:
+                for threads in thread_counts:
+                    for workers in segment_workers:
+                        if threads * workers > cpus and threads * workers > 1:
+                            continue
+                        elapsed, size, ssim = encode_trial(ffmpeg_binary, source_path,
+                                                           os.path.join(work_dir, "trial.mp4"), duration,
+                                                           preset, crf, threads, workers)
+                        trial = {
+                            "preset": preset, "crf": crf, "threads": threads, "segment_workers": workers,
+                            "seconds": elapsed, "bytes": size, "ssim": ssim,
+                            "encode_fps": frames / elapsed, "bytes_per_second": size / duration,
+                        }
+                        trials.append(trial)
+                        if progress:
+                            progress(f"{preset:<10} crf {crf:<3} threads {threads:<3} segments {workers:<3} "
+                                     f"{trial['encode_fps']:7.1f} encode fps {size / 1024:9.1f} KiB "
+                                     f"ssim {ssim:.4f}")
+        return pick_profiles(trials, tiers), trials
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def save_profiles(config_manager, profiles):
+    """Store calibrated profiles under "encoder_profiles" in the config"""
+    calibrated_at = datetime.now().isoformat(timespec="seconds")
+    stamped = {tier: dict(profile, calibrated_at=calibrated_at, host=platform.node(),
+                          cpu_count=os.cpu_count())
+               for tier, profile in profiles.items()}
+    with config_manager.batch_update() as batch:
+        batch["encoder_profiles"] = dict(config_manager.get_config().get("encoder_profiles") or {}, **stamped)
+    return stamped
+
+
+# Example usage
+if __name__ == "__main__":
+    import json
+    import argparse
+    from moviepy.config import get_setting
+    from config_manager import ConfigManager
+
+    parser = argparse.ArgumentParser(description="Calibrate x264 encoder profiles for this machine")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--seconds", type=float, default=4.0, help="Length of the synthetic clip")
+    parser.add_argument("--scale", type=float, default=0.5, help="Clip size relative to the configured video size")
+    parser.add_argument("--presets", nargs="+", default=DEFAULT_PRESETS)
+    parser.add_argument("--threads", type=int, nargs="+", help="Thread counts to try")
+    parser.add_argument("--segments", type=int, nargs="+", help="Segment parallelism to try")
+    parser.add_argument("--dry-run", action="store_true", help="Print the profiles without saving them")
+    args = parser.parse_args()
+
+    config_manager = ConfigManager(args.config)
+    config = config_manager.get_config()
+    width = int(config.get("image_width", 1080) * args.scale) // 2 * 2
+    height = int(config.get("image_height", 1920) * args.scale) // 2 * 2
+
+    profiles, _ = calibrate(get_setting("FFMPEG_BINARY"), width, height, config.get("video_fps", 30),
+                            args.seconds, args.presets, args.threads, args.segments)
+    if not args.dry_run:
+        profiles = save_profiles(config_manager, profiles)
+    print(json.dumps(profiles, indent=4))
@@ -0,0 +1,171 @@
+"""
+Frame Writer Module for Video Generator App
+Streams raw RGB frames from NumPy straight into an ffmpeg encoder
+"""
+
+import os
+import subprocess
+import tempfile
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+
+class FrameBufferPool:
+    """A fixed set of reusable frame buffers, each tagged with what it holds
+
+    get(key, fill) hands back the buffer already holding key without
+    touching it; otherwise the least recently used buffer is refilled in
+    place. Each buffer has a byte memoryview made once, so writing a frame
+    allocates nothing.
+    """
+
+    def __init__(self, width, height, size=3):
+        """Allocate size buffers of height x width RGB"""
+        self.shape = (height, width, 3)
+        self.buffers = [np.empty(self.shape, dtype=np.uint8) for _ in range(size)]
+        self.views = [memoryview(buffer).cast("B") for buffer in self.buffers]
+        self._keys = [None] * size
+        self._order = list(range(size))  # least recently used first
+        self.fills = 0
+        self.hits = 0
+
+    def get(self, key, fill):
+        """Get the buffer holding key, calling fill(buffer) only if it must be refilled
+
+        Returns:
+            (buffer, view): the uint8 array and its byte memoryview
+        """
+        if key in self._keys:
+            index = self._keys.index(key)
+            self.hits += 1
+        else:
+            index = self._order[0]
+            self._keys[index] = None
+            fill(self.buffers[index])
+            self._keys[index] = key
+            self.fills += 1
+
+        self._order.remove(index)
+        self._order.append(index)
+        return self.buffers[index], self.views[index]
+
+    def invalidate(self, key=None):
+        """Forget what one buffer (or every buffer) holds"""
+        for index, held in enumerate(self._keys):
+            if key is None or held == key:
+                self._keys[index] = None
+
+
+class RawFrameWriter:
+    """Pipes rgb24 frames into ffmpeg and muxes ready-made audio/subtitles
+
+    Frames are written as arrays of shape (height, width, 3) or batches of
+    shape (n, height, width, 3), dtype uint8 and C-contiguous, or as byte
+    memoryviews of such arrays. The pipe is unbuffered, so the bytes go
+    from the array to the kernel without a tobytes() or buffer copy.
+    """
+
+    def __init__(self, ffmpeg_binary, output_path, width, height, fps, audio_path=None,
+                 subtitle_path=None, threads=None, codec="libx264", encoder_args=()):
+        """Start the encoder
+
+        Args:
+            ffmpeg_binary: Path to ffmpeg
+            output_path: Video file to write
+            width, height: Frame size in pixels (even numbers for yuv420p)
+            fps: Frames per second
+            audio_path: Optional already-encoded AAC audio, stream copied
+            subtitle_path: Optional .srt/.vtt added as a mov_text track
+            threads: Encoder threads (None lets ffmpeg decide)
+            codec: Video codec
+            encoder_args: Extra codec arguments, e.g. ["-preset", "veryfast", "-crf", "23"]
+        """
+        self.output_path = output_path
+        self.frame_size = width * height * 3
+        self.frames_written = 0
+
+        cmd = [
+            ffmpeg_binary, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}",
+            "-r", str(fps), "-i", "-",
+        ]
+        maps = ["-map", "0:v"]
+        if audio_path:
+            cmd += ["-i", audio_path]
+            maps += ["-map", "1:a"]
+        if subtitle_path:
+            cmd += ["-i", subtitle_path]
+            maps += ["-map", f"{2 if audio_path else 1}:0", "-c:s", "mov_text",
+                     "-metadata:s:s:0", "language=tha"]
+
+        cmd += maps + ["-c:v", codec, "-pix_fmt", "yuv420p"] + list(encoder_args)
+        if threads:
+            cmd += ["-threads", str(threads)]
+        if audio_path:
+            cmd += ["-c:a", "copy"]
+        cmd += ["-movflags", "+faststart", output_path]
+
+        self.cmd = cmd
+        # ffmpeg's messages go to a file so a full stderr pipe can never
+        # block the encoder while we are blocked writing frames
+        self._stderr = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                        stderr=self._stderr, bufsize=0)
+
+    def write(self, frames, repeat=1):
+        """Write one frame or a batch of frames, repeat times"""
+        view = frames if isinstance(frames, memoryview) else memoryview(frames).cast("B")
+        try:
+            for _ in range(repeat):
+                self._write_all(view)
+        except BrokenPipeError:
+            self._raise_error()
+        self.frames_written += repeat * (view.nbytes // self.frame_size)
+
+    def _write_all(self, view):
+        # An unbuffered pipe write may be partial if interrupted
+        written = self.process.stdin.write(view)
+        while written < view.nbytes:
+            written += self.process.stdin.write(view[written:])
+
+    def close(self):
+        """Finish encoding and wait for ffmpeg
+
+        Returns:
+            Path to the written video
+        """
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.process.wait()
+        if self.process.returncode != 0:
+            self._raise_error()
+        self._stderr.close()
+        return self.output_path
+
+    def abort(self):
+        """Kill the encoder and delete the partial output"""
+        self.process.kill()
+        self.process.wait()
+        self._stderr.close()
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+
+    def _raise_error(self):
+        self.process.wait()
+        self._stderr.seek(0)
+        stderr = self._stderr.read()
+        self._stderr.close()
+        raise subprocess.CalledProcessError(self.process.returncode, self.cmd, stderr=stderr)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
@@ -4,112 +4,155 @@ Handles interactions with Google's Gemini API via Vertex AI
 """
 
 import os
-from google.cloud import aiplatform
-from vertexai.preview.generative_models import GenerativeModel, Part
+from tracing import tracer
+from cancellation import raise_if_cancelled
+from gcp_clients.gemini_context import (InstructionCache, VertexModelFactory, DEFAULT_MODEL,
+                                        DEFAULT_CACHE_TTL, MIN_CACHE_TOKENS)
+
+# Static instruction blocks, registered once per client (see InstructionCache);
+# each call passes only the text built from the matching *_REQUEST template.
+# At their current size they are sent as system instructions, not cached
+SCRIPT_INSTRUCTIONS = """
+สร้างสคริปต์วิดีโอเกี่ยวกับหัวข้อที่ได้รับ โดยแบ่งเป็นฉากๆ ในรูปแบบต่อไปนี้:
+
+# สคริปต์วิดีโอ: [หัวข้อ]
+
+## ฉากที่ 1: [ชื่อฉาก]
+**คำพูด**: [คำพูดสำหรับฉากนี้]
+**ภาพ**: [คำอธิบายภาพที่ควรแสดงในฉากนี้]
+
+## ฉากที่ 2: [ชื่อฉาก]
+**คำพูด**: [คำพูดสำหรับฉากนี้]
+**ภาพ**: [คำอธิบายภาพที่ควรแสดงในฉากนี้]
+
+(ทำต่อไปจนครบประมาณ 4-6 ฉาก)
+
+คำแนะนำเพิ่มเติม:
+- แต่ละฉากควรมีความยาวคำพูดประมาณ 2-4 ประโยค
+- คำอธิบายภาพควรมีรายละเอียดเพียงพอสำหรับการสร้างภาพ
+- เนื้อหาควรมีความต่อเนื่องและครอบคลุมประเด็นสำคัญของหัวข้อ
+""".strip()
+
+SCRIPT_REQUEST = 'หัวข้อ: "{topic}"'
+
+IMAGE_PROMPT_INSTRUCTIONS = """
+ฉันต้องการสร้าง prompt ภาษาอังกฤษสำหรับ text-to-image AI เพื่อสร้างภาพจากคำอธิบายภาพและสไตล์ภาพที่ได้รับ
+
+โปรดสร้าง prompt ที่มีรายละเอียดมากพอสำหรับ AI สร้างภาพ โดยระบุ:
+- สิ่งที่ต้องการให้แสดงในภาพ
+- มุมมองกล้อง
+- แสงและบรรยากาศ
+- สไตล์ภาพ
+- รายละเอียดอื่นๆ ที่จำเป็น
+
+ให้ตอบเฉพาะ prompt ภาษาอังกฤษเท่านั้น ไม่ต้องมีคำอธิบายเพิ่มเติม
+""".strip()
+
+IMAGE_PROMPT_REQUEST = 'คำอธิบายภาพ: "{scene_description}"\nสไตล์ภาพที่ต้องการ: {image_style_config}'
+
+PARSE_SCRIPT_INSTRUCTIONS = """
+โปรดแยกสคริปต์วิดีโอที่ได้รับเป็นฉากๆ และส่งกลับในรูปแบบ JSON
+
+โครงสร้าง JSON ที่ต้องการ:
+```json
+[
+  {
+    "scene_number": 1,
+    "title": "ชื่อฉาก",
+    "speech": "คำพูดสำหรับฉากนี้",
+    "description": "คำอธิบายภาพที่ควรแสดงในฉากนี้"
+  },
+  {
+    "scene_number": 2,
+    "title": "ชื่อฉาก",
+    "speech": "คำพูดสำหรับฉากนี้",
+    "description": "คำอธิบายภาพที่ควรแสดงในฉากนี้"
+  }
+]
+```
+
+ให้ตอบเฉพาะ JSON เท่านั้น ไม่ต้องมีคำอธิบายเพิ่มเติม
+""".strip()
+
+PARSE_SCRIPT_REQUEST = "{script_text}"
+
+# Block name -> (instructions, per-call request template)
+TASKS = {
+    "generate_script": (SCRIPT_INSTRUCTIONS, SCRIPT_REQUEST),
+    "generate_image_prompt": (IMAGE_PROMPT_INSTRUCTIONS, IMAGE_PROMPT_REQUEST),
+    "parse_script": (PARSE_SCRIPT_INSTRUCTIONS, PARSE_SCRIPT_REQUEST),
+}
 
 class GeminiClient:
     """Client for interacting with Google's Gemini API"""
     
-    def __init__(self, project_id, location):
-        """Initialize the Gemini client with project and location"""
+    def __init__(self, project_id, location, model_name=DEFAULT_MODEL, cache_ttl=DEFAULT_CACHE_TTL,
+                 min_cache_tokens=MIN_CACHE_TOKENS, model_factory=None):
+        """Initialize the Gemini client with project and location
+        
+        Args:
+            project_id: Google Cloud project
+            location: Vertex AI region
+            model_name: Gemini model
+            cache_ttl: Lifetime of cached instruction contexts in seconds
+            min_cache_tokens: Smallest instruction block stored as a cached context
+            model_factory: Creates models and cached contents (defaults to Vertex AI)
+        """
         self.project_id = project_id
         self.location = location
         
-        # Initialize Vertex AI
-        aiplatform.init(project=project_id, location=location)
+        # Initialize Vertex AI unless another backend was given
+        if model_factory is None:
+            model_factory = VertexModelFactory(project_id, location)
+        self.contexts = InstructionCache(model_factory, model_name, cache_ttl, min_cache_tokens)
     
-    def generate_script(self, topic):
-        """Generate a video script based on the given topic"""
-        # Create the prompt for script generation
-        prompt = f"""
-        สร้างสคริปต์วิดีโอเกี่ยวกับ "{topic}" โดยแบ่งเป็นฉากๆ ในรูปแบบต่อไปนี้:
-        
-        # สคริปต์วิดีโอ: {topic}
-        
-        ## ฉากที่ 1: [ชื่อฉาก]
-        **คำพูด**: [คำพูดสำหรับฉากนี้]
-        **ภาพ**: [คำอธิบายภาพที่ควรแสดงในฉากนี้]
-        
-        ## ฉากที่ 2: [ชื่อฉาก]
-        **คำพูด**: [คำพูดสำหรับฉากนี้]
-        **ภาพ**: [คำอธิบายภาพที่ควรแสดงในฉากนี้]
-        
-        (ทำต่อไปจนครบประมาณ 4-6 ฉาก)
-        
-        คำแนะนำเพิ่มเติม:
-        - แต่ละฉากควรมีความยาวคำพูดประมาณ 2-4 ประโยค
-        - คำอธิบายภาพควรมีรายละเอียดเพียงพอสำหรับการสร้างภาพ
-        - เนื้อหาควรมีความต่อเนื่องและครอบคลุมประเด็นสำคัญของหัวข้อ
-        """
-        
-        # Call Gemini API
-        model = GenerativeModel("gemini-1.5-pro")
-        response = model.generate_content(prompt)
+    @classmethod
+    def from_config(cls, config, model_factory=None):
+        """Create a client from the app config"""
+        gemini_config = config.get("gemini", {})
+        return cls(config["project_id"], config["location"],
+                   model_name=gemini_config.get("model", DEFAULT_MODEL),
+                   cache_ttl=gemini_config.get("cache_ttl_seconds", DEFAULT_CACHE_TTL),
+                   min_cache_tokens=gemini_config.get("min_cache_tokens", MIN_CACHE_TOKENS),
+                   model_factory=model_factory)
+    
+    def _generate(self, task, cancel_token=None, **fields):
+        """Send one task's per-call text against its registered instructions"""
+        instructions, request = TASKS[task]
+        text = request.format(**fields)
+        
+        # Call Gemini API (the request cannot be interrupted, so a cancelled
+        # job stops before sending and discards a late response)
+        raise_if_cancelled(cancel_token)
+        with tracer.span(f"gemini.{task}", prompt_chars=len(text)) as span:
+            response = self.contexts.generate(task, instructions, text)
+            span.set("response_chars", len(response.text))
+            usage = getattr(response, "usage_metadata", None)
+            if usage is not None:
+                span.set("prompt_tokens", usage.prompt_token_count)
+                span.set("cached_tokens", getattr(usage, "cached_content_token_count", 0))
+        raise_if_cancelled(cancel_token)
         
         return response.text
     
-    def generate_image_prompt_for_scene(self, scene_description, image_style_config):
+    def generate_script(self, topic, cancel_token=None):
+        """Generate a video script based on the given topic"""
+        return self._generate("generate_script", cancel_token, topic=topic)
+    
+    def generate_image_prompt_for_scene(self, scene_description, image_style_config, cancel_token=None):
         """Generate an image prompt for Imagen based on scene description"""
-        # Create the prompt for image prompt generation
-        prompt = f"""
-        ฉันต้องการสร้าง prompt ภาษาอังกฤษสำหรับ text-to-image AI เพื่อสร้างภาพจากคำอธิบายนี้:
-        
-        "{scene_description}"
-        
-        สไตล์ภาพที่ต้องการ: {image_style_config}
-        
-        โปรดสร้าง prompt ที่มีรายละเอียดมากพอสำหรับ AI สร้างภาพ โดยระบุ:
-        - สิ่งที่ต้องการให้แสดงในภาพ
-        - มุมมองกล้อง
-        - แสงและบรรยากาศ
-        - สไตล์ภาพ
-        - รายละเอียดอื่นๆ ที่จำเป็น
-        
-        ให้ตอบเฉพาะ prompt ภาษาอังกฤษเท่านั้น ไม่ต้องมีคำอธิบายเพิ่มเติม
-        """
-        
-        # Call Gemini API
-        model = GenerativeModel("gemini-1.5-pro")
-        response = model.generate_content(prompt)
-        
-        return response.text
+        return self._generate("generate_image_prompt", cancel_token, scene_description=scene_description,
+                              image_style_config=image_style_config)
     
-    def parse_script(self, script_text):
+    def parse_script(self, script_text, cancel_token=None):
         """Parse script text into structured scene data"""
-        # Create the prompt for script parsing
-        prompt = f"""
-        โปรดแยกสคริปต์วิดีโอต่อไปนี้เป็นฉากๆ และส่งกลับในรูปแบบ JSON:
-        
-        {script_text}
-        
-        โครงสร้าง JSON ที่ต้องการ:
-        ```json
-        [
-          {{
-            "scene_number": 1,
-            "title": "ชื่อฉาก",
-            "speech": "คำพูดสำหรับฉากนี้",
-            "description": "คำอธิบายภาพที่ควรแสดงในฉากนี้"
-          }},
-          {{
-            "scene_number": 2,
-            "title": "ชื่อฉาก",
-            "speech": "คำพูดสำหรับฉากนี้",
-            "description": "คำอธิบายภาพที่ควรแสดงในฉากนี้"
-          }}
-        ]
-        ```
-        
-        ให้ตอบเฉพาะ JSON เท่านั้น ไม่ต้องมีคำอธิบายเพิ่มเติม
-        """
-        
-        # Call Gemini API
-        model = GenerativeModel("gemini-1.5-pro")
-        response = model.generate_content(prompt)
-        
         # In a real implementation, we would parse the JSON response
         # For now, we'll just return the text
-        return response.text
+        return self._generate("parse_script", cancel_token, script_text=script_text)
+    
+    def close(self):
+        """Delete cached instruction contexts (they otherwise expire after cache_ttl)"""
+        self.contexts.close()
 
 
 # Example usage
@@ -132,3 +175,5 @@ if __name__ == "__main__":
         "ภาพถ่ายสมจริง, แสงสวยงาม, มุมกล้องระดับสายตา"
     )
     print(image_prompt)
+    
+    client.close()
@@ -0,0 +1,206 @@
+"""
+Gemini Context Module for Video Generator App
+Registers static instruction blocks once and reuses them across Gemini calls
+"""
+
+import time
+import threading
+from datetime import timedelta
+
+from lazy_imports import lazy_import
+
+aiplatform = lazy_import("google.cloud.aiplatform")
+generative_models = lazy_import("vertexai.preview.generative_models")
+caching = lazy_import("vertexai.preview.caching")
+api_exceptions = lazy_import("google.api_core.exceptions")
+
+DEFAULT_MODEL = "gemini-1.5-pro-002"
+DEFAULT_CACHE_TTL = 3600
+
+# Vertex AI rejects cached contents smaller than this (gemini-1.5 models)
+MIN_CACHE_TOKENS = 32768
+
+
+def estimate_tokens(text):
+    """Rough token count (about four UTF-8 bytes per token)
+
+    Only used to decide whether a block is large enough to cache.
+    """
+    return max(1, len(text.encode("utf-8")) // 4) if text else 0
+
+
+class VertexModelFactory:
+    """Creates Gemini models and cached contents through Vertex AI"""
+
+    def __init__(self, project_id, location):
+        """Initialize Vertex AI with project and location"""
+        aiplatform.init(project=project_id, location=location)
+
+    def create_model(self, model_name, system_instruction=None):
+        """Get a model that sends system_instruction with every request"""
+        return generative_models.GenerativeModel(model_name, system_instruction=system_instruction)
+
+    def create_cache(self, model_name, system_instruction, ttl, display_name=None):
+        """Store system_instruction server-side as a cached content"""
+        return caching.CachedContent.create(
+            model_name=model_name,
+            system_instruction=system_instruction,
+            ttl=timedelta(seconds=ttl),
+            display_name=display_name,
+        )
+
+    def model_from_cache(self, handle):
+        """Get a model whose requests reference the cached content"""
+        return generative_models.GenerativeModel.from_cached_content(cached_content=handle)
+
+    def refresh_cache(self, handle, ttl):
+        """Extend the cached content's expiry to ttl seconds from now"""
+        handle.update(ttl=timedelta(seconds=ttl))
+
+    def delete_cache(self, handle):
+        """Delete the cached content"""
+        handle.delete()
+
+    def is_cache_missing(self, error):
+        """Whether a request failed because its cached content is gone"""
+        return isinstance(error, api_exceptions.NotFound)
+
+
+class InstructionContext:
+    """A registered instruction block and the model bound to it"""
+
+    def __init__(self, instruction, model, handle=None, expires_at=None):
+        self.instruction = instruction
+        self.model = model
+        self.handle = handle
+        self.expires_at = expires_at
+
+    @property
+    def cached(self):
+        return self.handle is not None
+
+
+class InstructionCache:
+    """Registers each static instruction block once and hands out its model
+
+    Blocks large enough for Vertex AI context caching are stored as cached
+    contents, so requests carry only the per-call text and a reference to
+    the cache. Smaller blocks (or a failed cache registration) fall back to
+    a reusable model with the block as its system instruction; that keeps
+    the block an identical request prefix, which models with implicit
+    caching discount automatically.
+
+    The blocks GeminiClient ships today are a few hundred tokens, far
+    below MIN_CACHE_TOKENS, so they take the system-instruction path and
+    send as many input tokens as inline prompts did; caching only pays off
+    once a block passes the threshold.
+
+    Cached contents live for ttl seconds. A context used within
+    refresh_margin seconds of expiry has its TTL extended, and one that
+    expired server-side is registered again.
+    """
+
+    def __init__(self, model_factory, model_name=DEFAULT_MODEL, ttl=DEFAULT_CACHE_TTL,
+                 min_cache_tokens=MIN_CACHE_TOKENS, refresh_margin=None, clock=time.monotonic):
+        """Initialize the instruction cache
+
+        Args:
+            model_factory: Creates models and cached contents (see VertexModelFactory)
+            model_name: Gemini model (context caching needs a pinned version)
+            ttl: Lifetime of cached contents in seconds
+            min_cache_tokens: Smallest block worth caching; smaller blocks use system instructions
+            refresh_margin: Seconds before expiry at which the TTL is extended (default ttl / 10)
+            clock: Monotonic time source
+        """
+        self.model_factory = model_factory
+        self.model_name = model_name
+        self.ttl = ttl
+        self.min_cache_tokens = min_cache_tokens
+        self.refresh_margin = ttl / 10 if refresh_margin is None else refresh_margin
+        self.clock = clock
+        self._contexts = {}
+        self._lock = threading.Lock()
+        self.stats = {"registered": 0, "cached": 0, "refreshed": 0, "expired": 0}
+
+    def _register(self, name, instruction):
+        """Create the model (and cached content, if worthwhile) for a block"""
+        self.stats["registered"] += 1
+        if estimate_tokens(instruction) >= self.min_cache_tokens:
+            try:
+                handle = self.model_factory.create_cache(self.model_name, instruction, self.ttl,
+                                                         display_name=name)
+                model = self.model_factory.model_from_cache(handle)
+                self.stats["cached"] += 1
+                return InstructionContext(instruction, model, handle, self.clock() + self.ttl)
+            except Exception as e:
+                print(f"Error caching instruction context {name}, using system instruction: {str(e)}")
+
+        return InstructionContext(instruction, self.model_factory.create_model(self.model_name, instruction))
+
+    def model(self, name, instruction):
+        """Get the model for an instruction block, registering it on first use
+
+        Args:
+            name: Block name
+            instruction: Static instruction text
+
+        Returns:
+            Model whose generate_content takes only the per-call text
+        """
+        return self._context(name, instruction).model
+
+    def _context(self, name, instruction):
+        """Get the registered context for a block, refreshing it near expiry"""
+        with self._lock:
+            context = self._contexts.get(name)
+            if context is None or context.instruction != instruction:
+                context = self._contexts[name] = self._register(name, instruction)
+
+            elif context.cached and context.expires_at - self.clock() < self.refresh_margin:
+                try:
+                    self.model_factory.refresh_cache(context.handle, self.ttl)
+                    context.expires_at = self.clock() + self.ttl
+                    self.stats["refreshed"] += 1
+                except Exception as e:
+                    print(f"Error refreshing instruction context {name}: {str(e)}")
+                    context = self._contexts[name] = self._register(name, instruction)
+
+            return context
+
+    def generate(self, name, instruction, text):
+        """Send the per-call text against an instruction block
+
+        A request made against a cached content and rejected because the
+        cache expired server-side is retried once against a newly
+        registered block. Other errors, including a not-found error on the
+        system-instruction path, are raised as they are.
+
+        Returns:
+            The model response
+        """
+        context = self._context(name, instruction)
+        try:
+            return context.model.generate_content(text)
+        except Exception as e:
+            if not context.cached or not self.model_factory.is_cache_missing(e):
+                raise
+            self.invalidate(name)
+            return self.model(name, instruction).generate_content(text)
+
+    def invalidate(self, name):
+        """Forget a block so its next use registers it again"""
+        with self._lock:
+            if self._contexts.pop(name, None) is not None:
+                self.stats["expired"] += 1
+
+    def close(self):
+        """Delete the cached contents instead of waiting for their TTL"""
+        with self._lock:
+            contexts = list(self._contexts.values())
+            self._contexts.clear()
+        for context in contexts:
+            if context.cached:
+                try:
+                    self.model_factory.delete_cache(context.handle)
+                except Exception as e:
+                    print(f"Error deleting instruction context: {str(e)}")
@@ -4,11 +4,15 @@ Handles interactions with Google's Imagen API via Vertex AI
 """
 
 import os
-from google.cloud import aiplatform
-from vertexai.preview.generative_models import GenerativeModel, Part
 import base64
-from PIL import Image
 import io
+from lazy_imports import lazy_import
+from tracing import tracer
+from cancellation import OperationCancelled, raise_if_cancelled
+
+aiplatform = lazy_import("google.cloud.aiplatform")
+generative_models = lazy_import("vertexai.preview.generative_models")
+Image = lazy_import("PIL.Image")
 
 class ImagenClient:
     """Client for interacting with Google's Imagen API"""
@@ -21,31 +25,37 @@ class ImagenClient:
         # Initialize Vertex AI
         aiplatform.init(project=project_id, location=location)
     
-    def generate_image(self, image_prompt, width, height, output_path):
+    def generate_image(self, image_prompt, width, height, output_path, cancel_token=None):
         """Generate an image based on the given prompt and save it to the output path"""
         try:
-            # Call Imagen API
-            model = GenerativeModel("imagegeneration@002")
-            response = model.generate_content(
-                image_prompt,
-                generation_config={
-                    "width": width,
-                    "height": height,
-                }
-            )
-            
-            # Extract image data
-            if response.candidates and response.candidates[0].content.parts:
-                image_part = response.candidates[0].content.parts[0]
-                if hasattr(image_part, "file_data") and image_part.file_data:
-                    # Save the image to the output path
-                    with open(output_path, "wb") as f:
-                        f.write(image_part.file_data.file_content)
-                    
-                    return output_path
-            
-            raise Exception("Failed to generate image: No image data in response")
+            raise_if_cancelled(cancel_token)
+            with tracer.span("imagen.generate_image", width=width, height=height) as span:
+                # Call Imagen API
+                model = generative_models.GenerativeModel("imagegeneration@002")
+                response = model.generate_content(
+                    image_prompt,
+                    generation_config={
+                        "width": width,
+                        "height": height,
+                    }
+                )
+                raise_if_cancelled(cancel_token)
+                
+                # Extract image data
+                if response.candidates and response.candidates[0].content.parts:
+                    image_part = response.candidates[0].content.parts[0]
+                    if hasattr(image_part, "file_data") and image_part.file_data:
+                        # Save the image to the output path
+                        with open(output_path, "wb") as f:
+                            f.write(image_part.file_data.file_content)
+                        span.set("bytes_written", len(image_part.file_data.file_content))
+                        
+                        return output_path
+                
+                raise Exception("Failed to generate image: No image data in response")
         
+        except OperationCancelled:
+            raise
         except Exception as e:
             print(f"Error generating image: {str(e)}")
             raise
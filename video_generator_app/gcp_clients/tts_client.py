@@ -4,7 +4,11 @@ Handles interactions with Google Cloud Text-to-Speech API
 """
 
 import os
-from google.cloud import texttospeech
+from lazy_imports import lazy_import
+from tracing import tracer
+from cancellation import OperationCancelled, raise_if_cancelled
+
+texttospeech = lazy_import("google.cloud.texttospeech")
 
 class TTSClient:
     """Client for interacting with Google Cloud Text-to-Speech API"""
@@ -14,9 +18,11 @@ class TTSClient:
         self.project_id = project_id
         self.client = texttospeech.TextToSpeechClient()
     
-    def generate_audio_for_scene(self, text_to_speak, voice_config, output_path):
+    def generate_audio_for_scene(self, text_to_speak, voice_config, output_path, cancel_token=None):
         """Generate audio for a scene and return the path and duration"""
         try:
+            raise_if_cancelled(cancel_token)
+            
             # Set the text input to be synthesized
             synthesis_input = texttospeech.SynthesisInput(text=text_to_speak)
             
@@ -38,13 +44,16 @@ class TTSClient:
             )
             
             # Perform the text-to-speech request
-            response = self.client.synthesize_speech(
-                input=synthesis_input, voice=voice, audio_config=audio_config
-            )
-            
-            # Write the response to the output file
-            with open(output_path, "wb") as out:
-                out.write(response.audio_content)
+            with tracer.span("tts.synthesize_speech", characters=len(text_to_speak)) as span:
+                response = self.client.synthesize_speech(
+                    input=synthesis_input, voice=voice, audio_config=audio_config
+                )
+                raise_if_cancelled(cancel_token)
+                
+                # Write the response to the output file
+                with open(output_path, "wb") as out:
+                    out.write(response.audio_content)
+                span.set("bytes_written", len(response.audio_content))
             
             # Get audio duration (in a real implementation, we would use a library like pydub)
             # For now, we'll estimate based on character count and speaking rate
@@ -57,6 +66,8 @@ class TTSClient:
                 "duration": estimated_duration
             }
         
+        except OperationCancelled:
+            raise
         except Exception as e:
             print(f"Error generating audio: {str(e)}")
             raise
@@ -65,7 +76,8 @@ class TTSClient:
         """List available voices, optionally filtered by language code"""
         try:
             # List all available voices
-            response = self.client.list_voices(language_code=language_code)
+            with tracer.span("tts.list_voices"):
+                response = self.client.list_voices(language_code=language_code)
             voices = []
             
             for voice in response.voices:
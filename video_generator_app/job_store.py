@@ -0,0 +1,225 @@
+"""
+Job Store Module for Video Generator App
+Records per-scene stage results in SQLite so interrupted videos can resume
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+# Stage status values
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# Scene id used for job-level stages such as the final concat
+JOB_LEVEL_SCENE = -1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    output_path TEXT,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stages (
+    job_id TEXT NOT NULL,
+    scene_id INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    inputs_hash TEXT NOT NULL,
+    output TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, scene_id, stage)
+);
+"""
+
+
+def hash_inputs(*parts):
+    """Get a stable hash for a stage's inputs (any JSON-serializable values)"""
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def file_fingerprint(path):
+    """Get a cheap identity for a file: path, size and modification time"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (path, None, None)
+    return (path, stat.st_size, stat.st_mtime_ns)
+
+
+def artifact_exists(output):
+    """Check that the file(s) referenced by a recorded stage output still exist"""
+    if isinstance(output, str):
+        return os.path.exists(output)
+    if isinstance(output, dict) and "path" in output:
+        return os.path.exists(output["path"])
+    return output is not None
+
+
+class JobStore:
+    """SQLite-backed record of which stages of which jobs have finished"""
+
+    def __init__(self, db_path, batch_size=20, flush_interval=1.0):
+        """Open (or create) the job store
+
+        Args:
+            db_path: Path to the SQLite database file
+            batch_size: Commit after this many writes
+            flush_interval: Commit at least this often (seconds) while writing
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self._last_commit = time.monotonic()
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def _write(self, sql, params):
+        """Execute a write and commit once the current batch is full"""
+        with self._lock:
+            self.conn.execute(sql, params)
+            self._pending_writes += 1
+            if (self._pending_writes >= self.batch_size
+                    or time.monotonic() - self._last_commit >= self.flush_interval):
+                self._commit_locked()
+
+    def _commit_locked(self):
+        self.conn.commit()
+        self._pending_writes = 0
+        self._last_commit = time.monotonic()
+
+    def flush(self):
+        """Commit any batched writes"""
+        with self._lock:
+            self._commit_locked()
+
+    def close(self):
+        """Commit batched writes and close the database"""
+        with self._lock:
+            self._commit_locked()
+            self.conn.close()
+
+    def start_job(self, job_id, output_path=None):
+        """Register a job, or mark an existing one as running again"""
+        now = time.time()
+        self._write(
+            """INSERT INTO jobs (job_id, output_path, status, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(job_id) DO UPDATE SET status = excluded.status,
+                   updated_at = excluded.updated_at""",
+            (job_id, output_path, STATUS_RUNNING, now, now)
+        )
+
+    def finish_job(self, job_id, status=STATUS_DONE):
+        """Set the final status of a job and commit immediately"""
+        self._write("UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+                    (status, time.time(), job_id))
+        self.flush()
+
+    def get_job(self, job_id):
+        """Get a job record as a dictionary, or None if unknown"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT job_id, output_path, status, created_at, updated_at FROM jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("job_id", "output_path", "status", "created_at", "updated_at"), row))
+
+    def get_completed(self, job_id, scene_id, stage, inputs_hash):
+        """Get the recorded output of a finished stage
+
+        Returns:
+            The stage output, or None if the stage has not finished with
+            these exact inputs
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT output FROM stages WHERE job_id = ? AND scene_id = ? AND stage = ? "
+                "AND inputs_hash = ? AND status = ?",
+                (job_id, scene_id, stage, inputs_hash, STATUS_DONE)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def mark_running(self, job_id, scene_id, stage, inputs_hash):
+        """Record that a stage has started"""
+        self._record(job_id, scene_id, stage, inputs_hash, None, STATUS_RUNNING, None)
+
+    def mark_done(self, job_id, scene_id, stage, inputs_hash, output):
+        """Record a stage's output artifact"""
+        self._record(job_id, scene_id, stage, inputs_hash,
+                     json.dumps(output, ensure_ascii=False), STATUS_DONE, None)
+
+    def mark_failed(self, job_id, scene_id, stage, inputs_hash, error):
+        """Record that a stage failed"""
+        self._record(job_id, scene_id, stage, inputs_hash, None, STATUS_FAILED, str(error))
+
+    def _record(self, job_id, scene_id, stage, inputs_hash, output, status, error):
+        self._write(
+            """INSERT OR REPLACE INTO stages
+               (job_id, scene_id, stage, inputs_hash, output, status, error, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (job_id, scene_id, stage, inputs_hash, output, status, error, time.time())
+        )
+
+    def get_job_stages(self, job_id):
+        """Get every stage record of a job, ordered by scene and stage"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT scene_id, stage, inputs_hash, output, status, error, updated_at "
+                "FROM stages WHERE job_id = ? ORDER BY scene_id, stage",
+                (job_id,)
+            ).fetchall()
+
+        stages = []
+        for scene_id, stage, inputs_hash, output, status, error, updated_at in rows:
+            stages.append({
+                "scene_id": scene_id,
+                "stage": stage,
+                "inputs_hash": inputs_hash,
+                "output": json.loads(output) if output else None,
+                "status": status,
+                "error": error,
+                "updated_at": updated_at,
+            })
+        return stages
+
+
+# Example usage
+if __name__ == "__main__":
+    from config_manager import ConfigManager
+
+    config_manager = ConfigManager()
+    config_manager.ensure_directories_exist()
+    store = JobStore(os.path.join(config_manager.get_full_path("jobs"), "job_store.sqlite3"))
+
+    job_id = hash_inputs("example-job")
+    store.start_job(job_id, "generated_content/videos/example.mp4")
+    inputs_hash = hash_inputs("ภาพแสดงคนกำลังเรียนภาษาอังกฤษ", 1080, 1920)
+    store.mark_done(job_id, 0, "image", inputs_hash, "generated_content/images/scene_001.png")
+    store.flush()
+
+    print(store.get_completed(job_id, 0, "image", inputs_hash))
+    print(store.get_job_stages(job_id))
+    store.close()
@@ -0,0 +1,55 @@
+"""
+Lazy Imports Module for Video Generator App
+Defers heavy imports (MoviePy, Vertex AI, Pillow) until first use
+"""
+
+import importlib
+import threading
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        """Import the real module (once) and return it"""
+        if self._module is None:
+            # importlib holds a per-module lock, so concurrent first uses
+            # from the GUI and the preload thread import only once
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """Get a proxy for module name that imports it on first use"""
+    return LazyModule(name)
+
+
+def preload_modules(module_names):
+    """Import modules on a background thread so first use does not stall the UI
+
+    Modules that are not installed are skipped.
+
+    Returns:
+        The started daemon thread
+    """
+    def preload():
+        for name in module_names:
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                print(f"Skipping preload of {name}: {str(e)}")
+
+    thread = threading.Thread(target=preload, name="module-preload", daemon=True)
+    thread.start()
+    return thread
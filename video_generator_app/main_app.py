@@ -14,7 +14,22 @@ from datetime import datetime
 
 # Import local modules
 from config_manager import ConfigManager
-from app_gui import ScrollableTextFrame, SceneFrame, SettingsFrame
+from app_gui import ScrollableTextFrame, VirtualSceneList, SettingsFrame
+from scene_model import parse_script_scenes
+from project_file import Project, ProjectError, PROJECT_EXTENSION, RENDER_SETTING_KEYS
+from thumbnail_service import ThumbnailService
+from ui_update_bus import UIUpdateBus
+from cancellation import CancellationToken, OperationCancelled
+from lazy_imports import preload_modules
+from tracing import configure_tracing, tracer
+
+# Heavy modules loaded lazily on first use; preloaded once the window is up
+PRELOAD_MODULES = [
+    "moviepy.editor",
+    "google.cloud.aiplatform",
+    "vertexai.preview.generative_models",
+    "google.cloud.texttospeech",
+]
 
 class VideoGeneratorApp:
     """Main application class for Video Generator App"""
@@ -30,6 +45,17 @@ class VideoGeneratorApp:
         # Ensure output directories exist
         self.config_manager.ensure_directories_exist()
         
+        # Enable tracing and the metrics endpoint if configured
+        configure_tracing(self.config_manager.get_config())
+        
+        # Scene previews are decoded off the main thread
+        self.thumbnail_service = ThumbnailService(root, self.config_manager.get_full_path("thumbnails"))
+        
+        # Background jobs post status and progress here instead of calling
+        # root.after() directly; updates are applied at most once per frame
+        self.ui_bus = UIUpdateBus(root)
+        self.cancel_token = None
+        
         # Create main container
         self.main_container = ctk.CTkFrame(root)
         self.main_container.pack(fill="both", expand=True, padx=10, pady=10)
@@ -51,11 +77,17 @@ class VideoGeneratorApp:
         # Initialize scenes list
         self.scenes = []
         
+        # Project the current work was opened from or saved to
+        self.project = None
+        
         # Status bar
         self.status_bar = ctk.CTkFrame(root, height=25)
         self.status_bar.pack(fill="x", side="bottom")
         self.status_label = ctk.CTkLabel(self.status_bar, text="พร้อมใช้งาน")
         self.status_label.pack(side="left", padx=10)
+        self.progress_bar = ctk.CTkProgressBar(self.status_bar, width=200)
+        self.progress_bar.pack(side="right", padx=10)
+        self.progress_bar.set(0)
     
     def setup_main_tab(self):
         """Set up the main tab for video generation"""
@@ -83,8 +115,9 @@ class VideoGeneratorApp:
         self.script_text = ScrollableTextFrame(self.script_frame)
         self.script_text.pack(fill="both", expand=True, padx=10, pady=5)
         
-        # Scenes frame (initially hidden)
-        self.scenes_container = ctk.CTkScrollableFrame(self.main_tab, label_text="ฉาก")
+        # Scenes list (initially hidden); only visible rows get widgets
+        self.scenes_container = VirtualSceneList(self.main_tab, label_text="ฉาก",
+                                                 thumbnail_service=self.thumbnail_service)
         
         # Bottom buttons frame
         self.bottom_frame = ctk.CTkFrame(self.main_tab)
@@ -94,15 +127,85 @@ class VideoGeneratorApp:
                                             command=self.parse_script)
         self.parse_script_btn.pack(side="left", padx=10)
         
+        self.open_project_btn = ctk.CTkButton(self.bottom_frame, text="เปิดโปรเจกต์", 
+                                            command=self.open_project)
+        self.open_project_btn.pack(side="left", padx=10)
+        
+        self.save_project_btn = ctk.CTkButton(self.bottom_frame, text="บันทึกโปรเจกต์", 
+                                            command=self.save_project)
+        self.save_project_btn.pack(side="left", padx=10)
+        
         self.create_video_btn = ctk.CTkButton(self.bottom_frame, text="สร้างวิดีโอทั้งหมด", 
                                             command=self.create_video)
         self.create_video_btn.pack(side="right", padx=10)
+        
+        self.cancel_btn = ctk.CTkButton(self.bottom_frame, text="ยกเลิก", state="disabled",
+                                      command=self.cancel_job)
+        self.cancel_btn.pack(side="right", padx=10)
     
     def setup_settings_tab(self):
         """Set up the settings tab"""
         self.settings_frame = SettingsFrame(self.settings_tab, self.config_manager)
         self.settings_frame.pack(fill="both", expand=True)
     
+    def set_status(self, text):
+        """Show status text; safe to call from any thread"""
+        self.ui_bus.post("status", self.show_status, text)
+    
+    def show_status(self, text):
+        """Show status text (main thread)"""
+        self.status_label.configure(text=text)
+    
+    def set_progress(self, value):
+        """Show overall job progress (0.0 to 1.0); safe to call from any thread"""
+        self.ui_bus.post("progress", self.progress_bar.set, value)
+    
+    def set_scene_progress(self, scene, value):
+        """Show progress of one scene; safe to call from any thread"""
+        scene.progress = value
+        self.ui_bus.post(("scene", scene.scene_id), self.scenes_container.refresh_scene, scene)
+    
+    def start_job(self, target, *args):
+        """Run target(cancel_token, *args) on a background thread
+        
+        Returns:
+            The job's CancellationToken, or None if another job is running
+        """
+        if self.cancel_token is not None:
+            messagebox.showerror("ข้อผิดพลาด", "มีงานที่กำลังทำงานอยู่ กรุณารอหรือยกเลิกก่อน")
+            return None
+        
+        self.cancel_token = CancellationToken()
+        self.cancel_btn.configure(state="normal")
+        self.progress_bar.set(0)
+        
+        def run(cancel_token):
+            try:
+                target(cancel_token, *args)
+            except OperationCancelled:
+                self.set_status("ยกเลิกงานแล้ว")
+            except Exception as e:
+                print(f"Error in background job: {str(e)}")
+                self.set_status("เกิดข้อผิดพลาด")
+                self.ui_bus.post_event(messagebox.showerror, "ข้อผิดพลาด", str(e))
+            finally:
+                self.ui_bus.post_event(self.finish_job, cancel_token)
+        
+        threading.Thread(target=run, args=(self.cancel_token,), daemon=True).start()
+        return self.cancel_token
+    
+    def finish_job(self, cancel_token):
+        """Reset job controls once a job's thread has ended (main thread)"""
+        if self.cancel_token is cancel_token:
+            self.cancel_token = None
+            self.cancel_btn.configure(state="disabled")
+    
+    def cancel_job(self):
+        """Cancel the running job"""
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+            self.status_label.configure(text="กำลังยกเลิก...")
+    
     def generate_script(self):
         """Generate script using Gemini API"""
         topic = self.topic_entry.get().strip()
@@ -110,15 +213,12 @@ class VideoGeneratorApp:
             messagebox.showerror("ข้อผิดพลาด", "กรุณาระบุหัวข้อวิดีโอ")
             return
         
-        # Update status
-        self.status_label.configure(text="กำลังสร้างสคริปต์...")
-        
         # In a real implementation, this would call the Gemini API
         # For now, we'll just simulate it with a placeholder
-        def mock_generate_script():
+        def mock_generate_script(cancel_token):
             # Simulate API delay
-            import time
-            time.sleep(2)
+            if cancel_token.wait(2):
+                raise OperationCancelled("Script generation cancelled")
             
             # Create a placeholder script based on the topic
             placeholder_script = f"""# สคริปต์วิดีโอ: {topic}
@@ -140,11 +240,13 @@ class VideoGeneratorApp:
 **ภาพ**: ภาพสรุปเนื้อหาทั้งหมดของ{topic} พร้อมข้อความขอบคุณผู้ชม"""
             
             # Update UI in the main thread
-            self.root.after(0, lambda: self.script_text.insert_text(placeholder_script))
-            self.root.after(0, lambda: self.status_label.configure(text="สร้างสคริปต์เสร็จสิ้น"))
+            self.ui_bus.post_event(self.script_text.insert_text, placeholder_script)
+            self.set_progress(1.0)
+            self.set_status("สร้างสคริปต์เสร็จสิ้น")
         
         # Run in a separate thread to avoid freezing the UI
-        threading.Thread(target=mock_generate_script).start()
+        if self.start_job(mock_generate_script):
+            self.status_label.configure(text="กำลังสร้างสคริปต์...")
     
     def parse_script(self):
         """Parse script into scenes"""
@@ -153,76 +255,180 @@ class VideoGeneratorApp:
             messagebox.showerror("ข้อผิดพลาด", "ไม่พบสคริปต์ กรุณาสร้างสคริปต์ก่อน")
             return
         
-        # Clear existing scenes
-        for widget in self.scenes_container.winfo_children():
-            widget.destroy()
-        self.scenes = []
-        
         # Show scenes container
         self.scenes_container.pack(fill="both", expand=True, padx=10, pady=10, before=self.bottom_frame)
         
-        # Simple parsing logic (in a real app, this would be more robust)
-        import re
-        scene_pattern = r"## ฉากที่ (\d+): (.+?)\n\*\*คำพูด\*\*: (.+?)\n\*\*ภาพ\*\*: (.+?)(?=\n\n|$)"
-        matches = re.findall(scene_pattern, script_text, re.DOTALL)
+        # Parse into plain scene models; the list builds widgets lazily
+        scenes = parse_script_scenes(script_text)
         
-        if not matches:
+        if not scenes:
             messagebox.showerror("ข้อผิดพลาด", "ไม่สามารถแยกฉากจากสคริปต์ได้ กรุณาตรวจสอบรูปแบบสคริปต์")
             return
         
-        # Create scene frames
-        for i, (scene_num, title, speech, description) in enumerate(matches):
-            scene_frame = SceneFrame(self.scenes_container, scene_id=i)
-            scene_frame.pack(fill="x", expand=True, padx=5, pady=10)
-            
-            # Set scene data
-            scene_frame.speech_text.insert("1.0", speech.strip())
-            scene_frame.desc_text.insert("1.0", description.strip())
-            
-            self.scenes.append(scene_frame)
+        self.scenes = scenes
+        self.scenes_container.set_scenes(self.scenes)
         
         self.status_label.configure(text=f"แยกฉากเสร็จสิ้น พบทั้งหมด {len(self.scenes)} ฉาก")
     
+    def save_project(self):
+        """Save the topic, script and scenes as a project file"""
+        path = self.project.path if self.project is not None else None
+        if path is None:
+            path = filedialog.asksaveasfilename(
+                title="บันทึกโปรเจกต์",
+                defaultextension=PROJECT_EXTENSION,
+                filetypes=[("Video Generator Project", f"*{PROJECT_EXTENSION}")],
+                initialdir=self.config_manager.get_full_path("projects")
+            )
+            if not path:
+                return
+        
+        config = self.config_manager.get_config()
+        if self.project is None:
+            name = os.path.splitext(os.path.basename(path))[0]
+            self.project = Project.from_config(name, self.config_manager.get_asset_store(), config)
+        
+        # Read the widgets here; hashing new media runs in the background
+        self.project.topic = self.topic_entry.get().strip()
+        self.project.script = self.script_text.get_text()
+        self.project.scenes = self.scenes_container.get_models() if self.scenes else []
+        self.project.render_settings.update({key: config[key] for key in RENDER_SETTING_KEYS if key in config})
+        
+        if self.start_job(self.write_project, path):
+            self.status_label.configure(text="กำลังบันทึกโปรเจกต์...")
+    
+    def write_project(self, cancel_token, path):
+        """Write the project file (background thread)"""
+        self.project.save(path)
+        self.set_progress(1.0)
+        self.set_status(f"บันทึกโปรเจกต์แล้ว: {os.path.basename(path)}")
+    
+    def open_project(self):
+        """Open a project file; media and thumbnails load as scenes are shown"""
+        path = filedialog.askopenfilename(
+            title="เปิดโปรเจกต์",
+            filetypes=[("Video Generator Project", f"*{PROJECT_EXTENSION}")],
+            initialdir=self.config_manager.get_full_path("projects")
+        )
+        if not path:
+            return
+        
+        try:
+            project = Project.open(path, self.config_manager.get_asset_store())
+        except ProjectError as e:
+            messagebox.showerror("ข้อผิดพลาด", str(e))
+            return
+        
+        self.project = project
+        self.topic_entry.delete(0, "end")
+        self.topic_entry.insert(0, project.topic)
+        self.script_text.clear()
+        self.script_text.insert_text(project.script)
+        
+        self.scenes = project.scenes
+        if self.scenes:
+            self.scenes_container.pack(fill="both", expand=True, padx=10, pady=10, before=self.bottom_frame)
+        self.scenes_container.set_scenes(self.scenes)
+        
+        self.status_label.configure(text=f"เปิดโปรเจกต์ {project.name} ({len(self.scenes)} ฉาก)")
+    
     def create_video(self):
         """Create video from all scenes"""
         if not self.scenes:
             messagebox.showerror("ข้อผิดพลาด", "ไม่พบฉาก กรุณาแยกฉากจากสคริปต์ก่อน")
             return
         
-        # Check if all scenes have images and audio
-        # In a real implementation, this would check if files actually exist
+        scenes = self.scenes_container.get_models()
+        for scene in scenes:
+            scene.progress = 0.0
+            self.scenes_container.refresh_scene(scene)
         
-        # Update status
-        self.status_label.configure(text="กำลังสร้างวิดีโอ...")
+        # Generate a timestamp for the filename
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = os.path.join(self.config_manager.get_full_path("videos"), f"video_{timestamp}.mp4")
         
-        # In a real implementation, this would call the media processor
-        # For now, we'll just simulate it
-        def mock_create_video():
-            # Simulate processing delay
-            import time
-            time.sleep(3)
-            
-            # Generate a timestamp for the filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"video_{timestamp}.mp4"
-            output_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
-                                     "generated_content", "videos", filename)
-            
-            # Update UI in the main thread
-            self.root.after(0, lambda: messagebox.showinfo("สร้างวิดีโอเสร็จสิ้น", 
-                                                        f"สร้างวิดีโอเสร็จสิ้น\nบันทึกไฟล์ที่: {output_path}"))
-            self.root.after(0, lambda: self.status_label.configure(text="สร้างวิดีโอเสร็จสิ้น"))
+        # Render for real once every scene has its image and audio;
+        # otherwise simulate the job so progress and cancel can be tried
+        ready = all(scene.image_path and os.path.exists(scene.image_path) and
+                    scene.audio_path and os.path.exists(scene.audio_path) for scene in scenes)
+        target = self.render_video if ready else self.mock_create_video
         
-        # Run in a separate thread to avoid freezing the UI
-        threading.Thread(target=mock_create_video).start()
-
+        if self.start_job(target, scenes, output_path):
+            self.status_label.configure(text="กำลังสร้างวิดีโอ...")
+    
+    def render_video(self, cancel_token, scenes, output_path):
+        """Render the scenes with MediaProcessor (background thread)"""
+        from media_processor import MediaProcessor, caption_mode
+        
+        config = self.config_manager.get_config()
+        if self.project is not None:
+            config = self.project.render_config(config)
+        processor = MediaProcessor.from_config(config)
+        
+        # Scenes whose audio was not made in this session (e.g. opened from
+        # a project) do not know their duration yet; read it from the audio
+        scenes_data = [scene.to_dict() for scene in scenes]
+        for scene_data in scenes_data:
+            scene_data["audio_duration"] = processor.scene_duration(scene_data)
+        
+        # MoviePy reports progress over the whole timeline; map it back to
+        # scenes using their durations
+        durations = [scene_data["audio_duration"] for scene_data in scenes_data]
+        total_duration = sum(durations)
+        
+        def on_progress(fraction):
+            self.set_progress(fraction)
+            elapsed = fraction * total_duration
+            for scene, duration in zip(scenes, durations):
+                value = min(max(elapsed / duration, 0.0), 1.0)
+                if value != scene.progress:
+                    self.set_scene_progress(scene, value)
+                elapsed -= duration
+        
+        processor.create_video_from_scenes(
+            scenes_data, output_path, cancel_token=cancel_token, progress_callback=on_progress,
+            captions=caption_mode(config), qa_artifacts=config.get("qa_artifacts", True))
+        
+        self.set_progress(1.0)
+        self.set_status("สร้างวิดีโอเสร็จสิ้น")
+        self.ui_bus.post_event(messagebox.showinfo, "สร้างวิดีโอเสร็จสิ้น",
+                               f"สร้างวิดีโอเสร็จสิ้น\nบันทึกไฟล์ที่: {output_path}")
+    
+    def mock_create_video(self, cancel_token, scenes, output_path):
+        """Simulate rendering with per-scene progress (background thread)"""
+        steps = 20
+        for i, scene in enumerate(scenes):
+            for step in range(1, steps + 1):
+                # Simulate processing delay; wait() returns early on cancel
+                if cancel_token.wait(3 / (steps * len(scenes))):
+                    raise OperationCancelled("Video creation cancelled")
+                self.set_scene_progress(scene, step / steps)
+                self.set_progress((i + step / steps) / len(scenes))
+        
+        # Update UI in the main thread
+        self.set_status("สร้างวิดีโอเสร็จสิ้น")
+        self.ui_bus.post_event(messagebox.showinfo, "สร้างวิดีโอเสร็จสิ้น",
+                               f"สร้างวิดีโอเสร็จสิ้น\nบันทึกไฟล์ที่: {output_path}")
 
 def main():
     """Main function to run the application"""
     # Set up the root window
     root = ctk.CTk()
     app = VideoGeneratorApp(root)
+    
+    # Warm up heavy imports in the background once the window is shown
+    root.after(200, preload_modules, PRELOAD_MODULES)
     root.mainloop()
+    
+    # Stop any job still running so its workers exit with the window
+    if app.cancel_token is not None:
+        app.cancel_token.cancel()
+    app.thumbnail_service.shutdown()
+    
+    # Save the trace of this session if requested
+    trace_path = app.config_manager.get_config().get("tracing", {}).get("chrome_trace_path")
+    if tracer.enabled and trace_path:
+        tracer.export_chrome_trace(trace_path)
 
 
 if __name__ == "__main__":
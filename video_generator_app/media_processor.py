@@ -4,17 +4,126 @@ Handles video assembly from images and audio using MoviePy
 """
 
 import os
-from moviepy.editor import ImageClip, AudioFileClip, concatenate_videoclips, CompositeVideoClip, TextClip
-import moviepy.config as mp_config
+import subprocess
+import tempfile
+from lazy_imports import lazy_import
+from tracing import tracer
+from cancellation import OperationCancelled, raise_if_cancelled
+from subtitles import build_cues, write_subtitles
+from frame_writer import FrameBufferPool, RawFrameWriter
+
+# MoviePy pulls in numpy, imageio and ffmpeg probing; load it on first render
+editor = lazy_import("moviepy.editor")
+mp_config = lazy_import("moviepy.config")
+proglog = lazy_import("proglog")
+motion_engine = lazy_import("motion_engine")
+qa = lazy_import("qa_artifacts")
+Image = lazy_import("PIL.Image")
+ImageOps = lazy_import("PIL.ImageOps")
+
+# Common publishing sizes, (width, height)
+ASPECT_PRESETS = {
+    "9:16": (1080, 1920),
+    "16:9": (1920, 1080),
+    "1:1": (1080, 1080),
+}
+
+# Quality tier used when the config does not name one
+DEFAULT_ENCODER_QUALITY = "standard"
+
+_logger_class = None
+
+
+def _render_logger(cancel_token=None, progress_callback=None):
+    """Get a MoviePy logger that reports frame progress and honours cancellation
+    
+    Returns "bar" (MoviePy's default console bar) when neither is given.
+    """
+    global _logger_class
+    if cancel_token is None and progress_callback is None:
+        return "bar"
+    
+    if _logger_class is None:
+        class RenderProgressLogger(proglog.ProgressBarLogger):
+            def __init__(self, cancel_token, progress_callback):
+                super().__init__()
+                self.cancel_token = cancel_token
+                self.progress_callback = progress_callback
+            
+            def bars_callback(self, bar, attr, value, old_value=None):
+                # Raising here stops MoviePy between two frames
+                raise_if_cancelled(self.cancel_token)
+                # "t" is the video frame bar; "chunk" is the audio bar
+                if attr == "index" and bar == "t" and self.progress_callback:
+                    total = self.bars[bar]["total"] or 1
+                    self.progress_callback(min(value / total, 1.0))
+        
+        _logger_class = RenderProgressLogger
+    
+    return _logger_class(cancel_token, progress_callback)
+
+
+def caption_mode(config):
+    """Get the captions argument of the render methods from the config
+    
+    The "captions" setting is "soft", "burn" (MoviePy path only) or "none".
+    """
+    mode = config.get("captions", "soft")
+    return None if mode in (None, "", "none") else mode
+
+
+def select_encoder_profile(config, quality=None):
+    """Get the calibrated encoder profile for a quality tier from the config
+    
+    Profiles are written by encoder_calibration.py under "encoder_profiles";
+    "encoder_quality" picks the tier when quality is not given.
+    
+    Returns:
+        Profile dictionary (preset, crf, threads, segment_workers), or None
+        if the tier has not been calibrated
+    """
+    quality = quality or config.get("encoder_quality") or DEFAULT_ENCODER_QUALITY
+    return (config.get("encoder_profiles") or {}).get(quality)
+
 
 class MediaProcessor:
     """Handles video assembly from images and audio"""
     
-    def __init__(self, video_fps=30):
-        """Initialize the media processor with video FPS"""
+    def __init__(self, video_fps=30, threads=None, encoder_profile=None):
+        """Initialize the media processor
+        
+        Args:
+            video_fps: Frames per second of rendered videos
+            threads: Encoder thread count passed to ffmpeg (None uses the
+                profile's, or lets ffmpeg decide)
+            encoder_profile: Optional calibrated profile with x264 preset,
+                crf and threads (see select_encoder_profile)
+        """
         self.video_fps = video_fps
+        self.encoder_profile = encoder_profile or {}
+        self.threads = threads or self.encoder_profile.get("threads")
+        self.preset = self.encoder_profile.get("preset", "medium")
+        self.crf = self.encoder_profile.get("crf")
+    
+    @classmethod
+    def from_config(cls, config, quality=None, threads=None):
+        """Create a processor using the config's frame rate and encoder profile"""
+        return cls(video_fps=config.get("video_fps", 30), threads=threads,
+                   encoder_profile=select_encoder_profile(config, quality))
+    
+    def _encoder_args(self):
+        """Get the ffmpeg x264 rate-control arguments of the encoder profile"""
+        args = ["-preset", self.preset]
+        if self.crf is not None:
+            args += ["-crf", str(self.crf)]
+        return args
     
-    def create_video_from_scenes(self, scenes_data, output_video_path):
+    def _crf_params(self):
+        """ffmpeg_params for MoviePy's write_videofile (preset is its own argument)"""
+        return ["-crf", str(self.crf)] if self.crf is not None else None
+    
+    def create_video_from_scenes(self, scenes_data, output_video_path, cancel_token=None,
+                                 progress_callback=None, captions="soft", qa_artifacts=False):
         """Create a video from multiple scenes
         
         Args:
@@ -23,60 +132,717 @@ class MediaProcessor:
                 - image_path: Path to the image file
                 - audio_path: Path to the audio file
                 - audio_duration: Duration of the audio in seconds
-                - text: (Optional) Text to overlay on the image
+                - speech: (Optional) Narration text used for captions
+                - text: (Optional) Caption text when there is no speech
+                - timepoints: (Optional) TTS timepoints for caption timing
             output_video_path: Path to save the output video
+            cancel_token: Optional CancellationToken; cancelling stops the
+                encode between frames and removes the partial file
+            progress_callback: Optional callable receiving encode progress (0.0 to 1.0)
+            captions: "soft" writes an .srt next to the video and embeds it
+                as a mov_text track, "burn" draws each scene's "text" into
+                the frames, None adds no captions
+            qa_artifacts: Also write a poster thumbnail and a contact sheet
+                next to the video (see create_qa_artifacts)
         
         Returns:
             Path to the created video file
         """
         try:
-            # Create clips for each scene
-            clips = []
-            
-            for scene in scenes_data:
-                # Create image clip
-                img_clip = ImageClip(scene["image_path"])
-                
-                # Set duration to match audio
-                img_clip = img_clip.set_duration(scene["audio_duration"])
-                
-                # Add audio
-                audio_clip = AudioFileClip(scene["audio_path"])
-                img_clip = img_clip.set_audio(audio_clip)
-                
-                # Add text overlay if provided
-                if "text" in scene and scene["text"]:
-                    txt_clip = TextClip(
-                        scene["text"],
-                        font="Arial",
-                        fontsize=24,
-                        color="white",
-                        bg_color="rgba(0,0,0,0.5)",
-                        method="caption",
-                        size=(img_clip.w, None)
+            with tracer.span("media.create_video", scenes=len(scenes_data)):
+                # Create clips for each scene
+                clips = []
+                
+                with tracer.span("media.decode", scenes=len(scenes_data)):
+                    for scene in scenes_data:
+                        raise_if_cancelled(cancel_token)
+                        
+                        # Create image clip
+                        img_clip = editor.ImageClip(scene["image_path"])
+                        
+                        # Set duration to match audio (scenes loaded from a
+                        # project or the GUI may not know it yet)
+                        audio_clip = editor.AudioFileClip(scene["audio_path"])
+                        img_clip = img_clip.set_duration(scene.get("audio_duration") or audio_clip.duration)
+                        
+                        # Add audio
+                        img_clip = img_clip.set_audio(audio_clip)
+                        
+                        clips.append(img_clip)
+                
+                with tracer.span("media.composite"):
+                    # Burned-in captions force compositing every frame, so
+                    # they are only drawn when asked for
+                    for i, scene in enumerate(scenes_data):
+                        if captions == "burn" and scene.get("text"):
+                            img_clip = clips[i]
+                            txt_clip = editor.TextClip(
+                                scene["text"],
+                                font="Arial",
+                                fontsize=24,
+                                color="white",
+                                bg_color="rgba(0,0,0,0.5)",
+                                method="caption",
+                                size=(img_clip.w, None)
+                            )
+                            txt_clip = txt_clip.set_position(("center", "bottom")).set_duration(img_clip.duration)
+                            clips[i] = editor.CompositeVideoClip([img_clip, txt_clip])
+                    
+                    # Concatenate all clips
+                    final_clip = editor.concatenate_videoclips(clips)
+                
+                # Write the result to a file (ffmpeg muxes the audio in the same pass)
+                with tracer.span("media.encode", frames=int(final_clip.duration * self.video_fps)) as span:
+                    final_clip.write_videofile(
+                        output_video_path,
+                        fps=self.video_fps,
+                        codec="libx264",
+                        audio_codec="aac",
+                        preset=self.preset,
+                        ffmpeg_params=self._crf_params(),
+                        threads=self.threads,
+                        logger=_render_logger(cancel_token, progress_callback)
                     )
-                    txt_clip = txt_clip.set_position(("center", "bottom")).set_duration(img_clip.duration)
-                    img_clip = CompositeVideoClip([img_clip, txt_clip])
+                    span.set("bytes_written", os.path.getsize(output_video_path))
+                
+                durations = [clip.duration for clip in clips]
+                if captions == "soft":
+                    subtitle_path = self.create_subtitles(scenes_data, self._sidecar_path(output_video_path),
+                                                          durations)
+                    if subtitle_path:
+                        self.embed_subtitles(output_video_path, subtitle_path, cancel_token=cancel_token)
                 
-                clips.append(img_clip)
+                if qa_artifacts:
+                    self.create_qa_artifacts(scenes_data, output_video_path, durations, size=final_clip.size)
             
-            # Concatenate all clips
-            final_clip = concatenate_videoclips(clips)
+            return output_video_path
+        
+        except OperationCancelled:
+            if os.path.exists(output_video_path):
+                os.remove(output_video_path)
+            raise
+        except Exception as e:
+            print(f"Error creating video: {str(e)}")
+            raise
+    
+    def create_video_raw(self, scenes_data, output_video_path, size=None, fit="pad", cancel_token=None,
+                         progress_callback=None, captions="soft", qa_artifacts=False):
+        """Create a still-image slideshow by writing frames straight to ffmpeg
+        
+        The low-level counterpart of create_video_from_scenes: each scene
+        image is decoded once into a buffer from a small FrameBufferPool
+        and that buffer's memoryview is written for every frame of the
+        scene, so nothing is allocated or copied per frame. A scene reusing
+        an image still in the pool is not decoded again.
+        
+        Args:
+            scenes_data: List of scene dictionaries (as for create_video_from_scenes)
+            output_video_path: Path to save the output video
+            size: (width, height) of the video (defaults to the first image's size)
+            fit: How other image sizes are brought to size ("pad" or "crop")
+            cancel_token: Optional CancellationToken; cancelling stops within
+                a second of video and removes the partial file
+            progress_callback: Optional callable receiving encode progress (0.0 to 1.0)
+            captions: "soft" embeds narration captions as a mov_text track
+                (and writes them next to the video as .srt), None adds no captions
+            qa_artifacts: Also write a poster thumbnail and a contact sheet
+                next to the video (see create_qa_artifacts)
+        
+        Returns:
+            Path to the created video file
+        """
+        audio_path = None
+        writer = None
+        try:
+            with tracer.span("media.create_video_raw", scenes=len(scenes_data)):
+                if captions not in ("soft", None):
+                    raise ValueError(f"Unsupported captions mode for raw videos: {captions}")
+                
+                if size is None:
+                    with Image.open(scenes_data[0]["image_path"]) as image:
+                        size = image.size
+                width, height = size[0] // 2 * 2, size[1] // 2 * 2
+                
+                durations = [self.scene_duration(scene) for scene in scenes_data]
+                with tempfile.NamedTemporaryFile(suffix=".m4a", delete=False) as f:
+                    audio_path = f.name
+                self._encode_narration(scenes_data, durations, audio_path, cancel_token)
+                
+                os.makedirs(os.path.dirname(os.path.abspath(output_video_path)), exist_ok=True)
+                subtitle_path = None
+                if captions == "soft":
+                    subtitle_path = self.create_subtitles(scenes_data, self._sidecar_path(output_video_path),
+                                                          durations)
+                
+                # Scene cuts on whole frames, rounded on the running total so
+                # the video does not drift from the narration
+                cuts, elapsed = [], 0.0
+                for duration in durations:
+                    elapsed += duration
+                    cuts.append(int(round(elapsed * self.video_fps)))
+                total_frames = cuts[-1]
+                
+                pool = FrameBufferPool(width, height)
+                writer = RawFrameWriter(mp_config.get_setting("FFMPEG_BINARY"), output_video_path, width,
+                                        height, self.video_fps, audio_path, subtitle_path, self.threads,
+                                        encoder_args=self._encoder_args())
+                
+                with tracer.span("media.encode", frames=total_frames) as span:
+                    first = 0
+                    for scene, end in zip(scenes_data, cuts):
+                        raise_if_cancelled(cancel_token)
+                        _, view = pool.get(
+                            scene["image_path"],
+                            lambda buffer, path=scene["image_path"]: self._fill_frame(buffer, path, fit))
+                        
+                        # A second of frames at a time between cancellation checks
+                        while first < end:
+                            count = min(end - first, self.video_fps)
+                            writer.write(view, repeat=count)
+                            first += count
+                            raise_if_cancelled(cancel_token)
+                            if progress_callback:
+                                progress_callback(first / total_frames)
+                    
+                    writer.close()
+                    writer = None
+                    span.set("bytes_written", os.path.getsize(output_video_path))
+                    span.set("decoded_images", pool.fills)
+                
+                if qa_artifacts:
+                    self.create_qa_artifacts(scenes_data, output_video_path, durations, size=(width, height),
+                                             fit=fit)
             
-            # Write the result to a file
-            final_clip.write_videofile(
-                output_video_path,
-                fps=self.video_fps,
-                codec="libx264",
-                audio_codec="aac"
-            )
+            return output_video_path
+        
+        except OperationCancelled:
+            if writer is not None:
+                writer.abort()
+                writer = None
+            if os.path.exists(output_video_path):
+                os.remove(output_video_path)
+            raise
+        except subprocess.CalledProcessError as e:
+            print(f"Error creating raw video: {e.stderr.decode(errors='replace')}")
+            raise
+        except Exception as e:
+            print(f"Error creating raw video: {str(e)}")
+            raise
+        finally:
+            # Still set only if encoding did not finish
+            if writer is not None:
+                writer.abort()
+            if audio_path and os.path.exists(audio_path):
+                os.remove(audio_path)
+    
+    @staticmethod
+    def _fill_frame(buffer, image_path, fit):
+        """Decode an image into a frame buffer, fitting it to the buffer's size"""
+        size = (buffer.shape[1], buffer.shape[0])
+        with Image.open(image_path) as image:
+            image = image.convert("RGB")
+            if image.size != size:
+                resize = ImageOps.fit if fit == "crop" else ImageOps.pad
+                image = resize(image, size, Image.LANCZOS)
+            buffer[...] = image
+    
+    @staticmethod
+    def _sidecar_path(video_path, extension=".srt"):
+        return os.path.splitext(video_path)[0] + extension
+    
+    def create_subtitles(self, scenes_data, output_path, durations=None):
+        """Write captions for the scenes' narration as SRT or WebVTT
+        
+        Timing follows each scene's audio duration (or TTS timepoints when
+        a scene has them), so the file lines up with the rendered video and
+        can be edited or translated without re-rendering.
+        
+        Args:
+            scenes_data: Scene dictionaries with speech (or text) and audio
+            output_path: .srt or .vtt path to write
+            durations: Optional per-scene durations (read from the scenes
+                or their audio files when omitted)
+        
+        Returns:
+            output_path, or None if no scene has caption text
+        """
+        try:
+            if durations is None:
+                durations = [self.scene_duration(scene) for scene in scenes_data]
+            cues = build_cues(scenes_data, durations)
+            if not cues:
+                return None
+            return write_subtitles(cues, output_path)
+        
+        except Exception as e:
+            print(f"Error creating subtitles: {str(e)}")
+            raise
+    
+    def create_qa_artifacts(self, scenes_data, output_video_path, durations=None, size=None, fit="crop",
+                            poster_scene=0, contact_sheet=True):
+        """Write a poster thumbnail and a contact sheet for a rendered video
+        
+        Both come straight from the scene images at the times the scenes
+        start, so no video frame is decoded. They are written next to the
+        video as <name>.poster.jpg and <name>.contact.jpg.
+        
+        Args:
+            scenes_data: The scenes the video was rendered from
+            output_video_path: The rendered video
+            durations: Optional per-scene durations (read from the scenes
+                or their audio files when omitted)
+            size: (width, height) of the video (defaults to the first image's size)
+            fit: How images were brought to the video size ("crop" or "pad")
+            poster_scene: Index of the scene used for the poster
+            contact_sheet: Also write the contact sheet
+        
+        Returns:
+            Dictionary with "poster" and "contact_sheet" paths (None if skipped)
+        """
+        try:
+            with tracer.span("media.qa_artifacts", scenes=len(scenes_data)):
+                if durations is None:
+                    durations = [self.scene_duration(scene) for scene in scenes_data]
+                if size is None:
+                    with Image.open(scenes_data[0]["image_path"]) as image:
+                        size = image.size
+                os.makedirs(os.path.dirname(os.path.abspath(output_video_path)), exist_ok=True)
+                
+                poster_path = qa.create_poster(
+                    scenes_data[poster_scene]["image_path"], self._sidecar_path(output_video_path, ".poster.jpg"),
+                    qa.poster_size(*size), fit)
+                
+                sheet_path = None
+                if contact_sheet:
+                    tile_width = qa.CONTACT_TILE_WIDTH
+                    tile_size = (tile_width, int(round(tile_width * size[1] / size[0])))
+                    starts = qa.scene_start_times(durations)
+                    tiles = [(scene["image_path"], f"{i + 1}  {qa.format_timestamp(start)}")
+                             for i, (scene, start) in enumerate(zip(scenes_data, starts))]
+                    sheet_path = qa.create_contact_sheet(
+                        tiles, self._sidecar_path(output_video_path, ".contact.jpg"), tile_size, fit=fit)
+            
+            return {"poster": poster_path, "contact_sheet": sheet_path}
+        
+        except Exception as e:
+            print(f"Error creating QA artifacts: {str(e)}")
+            raise
+    
+    def create_contact_sheet_from_video(self, video_path, output_path=None):
+        """Build a contact sheet for an existing video from its keyframes only
+        
+        Use create_qa_artifacts for videos rendered here; this path is for
+        videos whose scenes are not known.
+        
+        Returns:
+            Path to the contact sheet
+        """
+        output_path = output_path or self._sidecar_path(video_path, ".contact.jpg")
+        with tracer.span("media.keyframes"):
+            return qa.contact_sheet_from_video(mp_config.get_setting("FFMPEG_BINARY"),
+                                               video_path, output_path)
+    
+    def embed_subtitles(self, video_path, subtitle_path, output_path=None, language="tha",
+                        cancel_token=None):
+        """Add a subtitle file to a video as a soft mov_text track
+        
+        Video and audio are stream copied, so this costs about one file copy.
+        
+        Args:
+            video_path: Input video
+            subtitle_path: .srt or .vtt file
+            output_path: Where to write the result (defaults to replacing video_path)
+            language: ISO 639-2 language code of the track
+            cancel_token: Optional CancellationToken; cancelling kills ffmpeg
+        
+        Returns:
+            Path to the video with subtitles
+        """
+        target_path = output_path or f"{os.path.splitext(video_path)[0]}.subs.tmp.mp4"
+        try:
+            cmd = [
+                mp_config.get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+                "-i", video_path, "-i", subtitle_path,
+                "-map", "0:v", "-map", "0:a?", "-map", "1:0",
+                "-c", "copy", "-c:s", "mov_text", "-metadata:s:s:0", f"language={language}",
+                "-movflags", "+faststart", target_path
+            ]
+            with tracer.span("media.mux", subtitles=1) as span:
+                self._run_ffmpeg(cmd, cancel_token)
+                span.set("bytes_written", os.path.getsize(target_path))
+            
+            if output_path is None:
+                os.replace(target_path, video_path)
+                return video_path
+            return output_path
+        
+        except subprocess.CalledProcessError as e:
+            print(f"Error embedding subtitles: {e.stderr.decode(errors='replace')}")
+            raise
+        except Exception as e:
+            print(f"Error embedding subtitles: {str(e)}")
+            raise
+        finally:
+            if output_path is None and os.path.exists(target_path):
+                os.remove(target_path)
+    
+    def create_multi_aspect_videos(self, scenes_data, outputs, fit="pad", cancel_token=None,
+                                   captions="soft", qa_artifacts=False):
+        """Render one video per output size from a single decode of each scene
+        
+        Every image is decoded once, split once per output and cropped or
+        padded to that size before it is looped for the scene's duration,
+        so only the encoders run per frame. All outputs are encoded by one
+        ffmpeg process. The narration is encoded to AAC once and stream
+        copied into every output.
+        
+        Args:
+            scenes_data: List of scene dictionaries with image_path,
+                audio_path and audio_duration (as for create_video_from_scenes)
+            outputs: Dictionary mapping output path to (width, height) or
+                (width, height, fit)
+            fit: Default way to reach each size: "pad" letterboxes the whole
+                image, "crop" fills the frame and trims the overflow
+            cancel_token: Optional CancellationToken; cancelling kills ffmpeg
+            captions: "soft" embeds narration captions as a mov_text track
+                in every output (and writes them next to the first one as
+                .srt), None adds no captions
+            qa_artifacts: Also write a poster per output (at its size and
+                fit) and one contact sheet next to the first output
+        
+        Returns:
+            List of created video paths, in the order of outputs
+        """
+        audio_path = None
+        try:
+            with tracer.span("media.create_multi_aspect", scenes=len(scenes_data), outputs=len(outputs)):
+                durations = [self.scene_duration(scene) for scene in scenes_data]
+                
+                with tempfile.NamedTemporaryFile(suffix=".m4a", delete=False) as f:
+                    audio_path = f.name
+                self._encode_narration(scenes_data, durations, audio_path, cancel_token)
+                
+                cmd = [mp_config.get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error"]
+                for scene in scenes_data:
+                    cmd += ["-i", scene["image_path"]]
+                cmd += ["-i", audio_path]
+                audio_input = len(scenes_data)
+                
+                subtitle_input = None
+                if captions == "soft":
+                    first_output = next(iter(outputs))
+                    if self.create_subtitles(scenes_data, self._sidecar_path(first_output), durations):
+                        cmd += ["-i", self._sidecar_path(first_output)]
+                        subtitle_input = audio_input + 1
+                
+                filters = []
+                for i in range(len(scenes_data)):
+                    labels = "".join(f"[s{i}o{k}]" for k in range(len(outputs)))
+                    filters.append(f"[{i}:v]setsar=1,split={len(outputs)}{labels}")
+                
+                for k, size in enumerate(outputs.values()):
+                    width, height = size[0], size[1]
+                    output_fit = size[2] if len(size) > 2 else fit
+                    for i, duration in enumerate(durations):
+                        frames = max(int(round(duration * self.video_fps)), 1)
+                        filters.append(
+                            f"[s{i}o{k}]{self._fit_filter(width, height, output_fit)},setsar=1,format=yuv420p,"
+                            f"loop=loop={frames - 1}:size=1:start=0[v{i}o{k}]"
+                        )
+                    inputs = "".join(f"[v{i}o{k}]" for i in range(len(scenes_data)))
+                    filters.append(f"{inputs}concat=n={len(scenes_data)}:v=1:a=0,"
+                                   f"setpts=N/({self.video_fps}*TB)[out{k}]")
+                
+                cmd += ["-filter_complex", ";".join(filters)]
+                for k, output_path in enumerate(outputs):
+                    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+                    cmd += ["-map", f"[out{k}]", "-map", f"{audio_input}:a",
+                            "-r", str(self.video_fps), "-c:v", "libx264", "-pix_fmt", "yuv420p"]
+                    cmd += self._encoder_args()
+                    if self.threads:
+                        cmd += ["-threads", str(self.threads)]
+                    cmd += ["-c:a", "copy"]
+                    if subtitle_input is not None:
+                        cmd += ["-map", f"{subtitle_input}:0", "-c:s", "mov_text",
+                                "-metadata:s:s:0", "language=tha"]
+                    # No -shortest: it would also stop at the last caption
+                    cmd += ["-movflags", "+faststart", output_path]
+                
+                frames = int(sum(durations) * self.video_fps)
+                with tracer.span("media.encode", frames=frames * len(outputs)) as span:
+                    self._run_ffmpeg(cmd, cancel_token)
+                    span.set("bytes_written", sum(os.path.getsize(path) for path in outputs))
+                
+                if qa_artifacts:
+                    for k, (output_path, size) in enumerate(outputs.items()):
+                        self.create_qa_artifacts(scenes_data, output_path, durations, size=size[:2],
+                                                 fit=size[2] if len(size) > 2 else fit, contact_sheet=k == 0)
+            
+            return list(outputs)
+        
+        except OperationCancelled:
+            for output_path in outputs:
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+            raise
+        except subprocess.CalledProcessError as e:
+            print(f"Error creating multi-aspect videos: {e.stderr.decode(errors='replace')}")
+            raise
+        except Exception as e:
+            print(f"Error creating multi-aspect videos: {str(e)}")
+            raise
+        finally:
+            if audio_path and os.path.exists(audio_path):
+                os.remove(audio_path)
+    
+    def create_motion_video(self, scenes_data, output_video_path, size=None, transition_seconds=0.5,
+                            zoom=(1.0, 1.12), cancel_token=None, progress_callback=None, captions="soft",
+                            qa_artifacts=False):
+        """Create a video with Ken Burns motion and crossfades between scenes
+        
+        Frames come from motion_engine.MotionRenderer in batches and are
+        piped raw into ffmpeg, bypassing MoviePy's per-frame compositing.
+        The narration is encoded once and stream copied in, and scene cuts
+        stay where the audio durations put them.
+        
+        Args:
+            scenes_data: List of scene dictionaries (as for
+                create_video_from_scenes), optionally with "motion": one of
+                zoom_in, zoom_out, pan_left, pan_right, pan_up, pan_down, none
+            output_video_path: Path to save the output video
+            size: (width, height) of the video (defaults to the first image's size)
+            transition_seconds: Crossfade length at each cut (0 for hard cuts)
+            zoom: (low, high) zoom range of the default motions
+            cancel_token: Optional CancellationToken; cancelling stops between
+                frame batches and removes the partial file
+            progress_callback: Optional callable receiving encode progress (0.0 to 1.0)
+            captions: "soft" embeds narration captions as a mov_text track
+                (and writes them next to the video as .srt), None adds no captions
+            qa_artifacts: Also write a poster thumbnail and a contact sheet
+                next to the video (see create_qa_artifacts)
+        
+        Returns:
+            Path to the created video file
+        """
+        audio_path = None
+        writer = None
+        try:
+            with tracer.span("media.create_motion_video", scenes=len(scenes_data)):
+                if captions not in ("soft", None):
+                    raise ValueError(f"Unsupported captions mode for motion videos: {captions}")
+                
+                if size is None:
+                    with Image.open(scenes_data[0]["image_path"]) as image:
+                        size = image.size
+                # libx264 with yuv420p needs even dimensions
+                width, height = size[0] // 2 * 2, size[1] // 2 * 2
+                
+                durations = [self.scene_duration(scene) for scene in scenes_data]
+                with tempfile.NamedTemporaryFile(suffix=".m4a", delete=False) as f:
+                    audio_path = f.name
+                self._encode_narration(scenes_data, durations, audio_path, cancel_token)
+                
+                os.makedirs(os.path.dirname(os.path.abspath(output_video_path)), exist_ok=True)
+                subtitle_path = None
+                if captions == "soft":
+                    subtitle_path = self.create_subtitles(scenes_data, self._sidecar_path(output_video_path),
+                                                          durations)
+                
+                renderer = motion_engine.MotionRenderer(width, height, self.video_fps, transition_seconds, zoom)
+                writer = RawFrameWriter(mp_config.get_setting("FFMPEG_BINARY"), output_video_path, width,
+                                        height, self.video_fps, audio_path, subtitle_path, self.threads,
+                                        encoder_args=self._encoder_args())
+                
+                with tracer.span("media.encode", frames=int(round(sum(durations) * self.video_fps))) as span:
+                    for frames, done, total in renderer.render(scenes_data, durations):
+                        raise_if_cancelled(cancel_token)
+                        writer.write(frames)
+                        if progress_callback:
+                            progress_callback(done / total)
+                    writer.close()
+                    writer = None
+                    span.set("bytes_written", os.path.getsize(output_video_path))
+                
+                if qa_artifacts:
+                    self.create_qa_artifacts(scenes_data, output_video_path, durations, size=(width, height))
             
             return output_video_path
         
+        except OperationCancelled:
+            if writer is not None:
+                writer.abort()
+                writer = None
+            if os.path.exists(output_video_path):
+                os.remove(output_video_path)
+            raise
+        except subprocess.CalledProcessError as e:
+            print(f"Error creating motion video: {e.stderr.decode(errors='replace')}")
+            raise
         except Exception as e:
-            print(f"Error creating video: {str(e)}")
+            print(f"Error creating motion video: {str(e)}")
+            raise
+        finally:
+            # Still set only if encoding did not finish
+            if writer is not None:
+                writer.abort()
+            if audio_path and os.path.exists(audio_path):
+                os.remove(audio_path)
+    
+    @staticmethod
+    def _fit_filter(width, height, fit):
+        """Get the ffmpeg filter that brings any image to exactly width x height"""
+        if fit == "crop":
+            return f"scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height}"
+        if fit == "pad":
+            return (f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                    f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:color=black")
+        raise ValueError(f"Unknown fit mode: {fit}")
+    
+    @staticmethod
+    def scene_duration(scene):
+        """Get a scene's duration, reading the audio file only if it is not known"""
+        if scene.get("audio_duration"):
+            return scene["audio_duration"]
+        audio_clip = editor.AudioFileClip(scene["audio_path"])
+        duration = audio_clip.duration
+        audio_clip.close()
+        return duration
+    
+    def _encode_narration(self, scenes_data, durations, output_path, cancel_token=None):
+        """Join every scene's audio, padded or trimmed to its duration, into one AAC file"""
+        cmd = [mp_config.get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error"]
+        for scene in scenes_data:
+            cmd += ["-i", scene["audio_path"]]
+        
+        filters = []
+        for i, duration in enumerate(durations):
+            filters.append(f"[{i}:a]aresample=44100,aformat=channel_layouts=stereo,"
+                           f"apad,atrim=0:{duration:.6f},asetpts=PTS-STARTPTS[a{i}]")
+        inputs = "".join(f"[a{i}]" for i in range(len(scenes_data)))
+        filters.append(f"{inputs}concat=n={len(scenes_data)}:v=0:a=1[aout]")
+        
+        cmd += ["-filter_complex", ";".join(filters), "-map", "[aout]",
+                "-c:a", "aac", "-b:a", "192k", output_path]
+        with tracer.span("media.encode_audio", scenes=len(scenes_data)) as span:
+            self._run_ffmpeg(cmd, cancel_token)
+            span.set("bytes_written", os.path.getsize(output_path))
+        return output_path
+    
+    def render_scene_segment(self, scene, output_path, size=None):
+        """Render a single scene to its own video segment
+        
+        Segments rendered this way share codec settings, so they can be
+        joined afterwards with concatenate_segments() without re-encoding.
+        
+        Args:
+            scene: Dictionary with image_path, audio_path and optionally
+                audio_duration (defaults to the real audio length)
+            output_path: Path to save the segment
+            size: Optional (width, height) to resize the image to
+        
+        Returns:
+            Path to the created segment
+        """
+        try:
+            with tracer.span("media.decode", scenes=1):
+                audio_clip = editor.AudioFileClip(scene["audio_path"])
+                duration = scene.get("audio_duration") or audio_clip.duration
+                
+                img_clip = editor.ImageClip(scene["image_path"])
+                if size and (img_clip.w, img_clip.h) != tuple(size):
+                    img_clip = img_clip.resize(newsize=tuple(size))
+                img_clip = img_clip.set_duration(duration).set_audio(audio_clip)
+            
+            with tracer.span("media.encode", frames=int(duration * self.video_fps)) as span:
+                img_clip.write_videofile(
+                    output_path,
+                    fps=self.video_fps,
+                    codec="libx264",
+                    audio_codec="aac",
+                    preset=self.preset,
+                    ffmpeg_params=self._crf_params(),
+                    threads=self.threads,
+                    logger=None
+                )
+                span.set("bytes_written", os.path.getsize(output_path))
+            
+            audio_clip.close()
+            img_clip.close()
+            
+            return output_path
+        
+        except Exception as e:
+            print(f"Error rendering scene segment: {str(e)}")
             raise
     
+    def concatenate_segments(self, segment_paths, output_video_path, cancel_token=None, subtitle_path=None,
+                             language="tha"):
+        """Join segments from render_scene_segment() into one video
+        
+        Uses the ffmpeg concat demuxer with stream copy, so this costs
+        roughly one file copy rather than another encode.
+        
+        Args:
+            segment_paths: Ordered list of segment file paths
+            output_video_path: Path to save the output video
+            cancel_token: Optional CancellationToken; cancelling kills ffmpeg
+            subtitle_path: Optional .srt or .vtt muxed in as a soft mov_text track
+            language: ISO 639-2 language code of the subtitle track
+        
+        Returns:
+            Path to the created video file
+        """
+        list_file = None
+        try:
+            with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+                list_file = f.name
+                for path in segment_paths:
+                    escaped = os.path.abspath(path).replace("'", "'\\''")
+                    f.write(f"file '{escaped}'\n")
+            
+            cmd = [
+                mp_config.get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+                "-f", "concat", "-safe", "0", "-i", list_file,
+            ]
+            if subtitle_path:
+                cmd += ["-i", subtitle_path, "-map", "0:v", "-map", "0:a?", "-map", "1:0"]
+            cmd += ["-c", "copy"]
+            if subtitle_path:
+                cmd += ["-c:s", "mov_text", "-metadata:s:s:0", f"language={language}"]
+            cmd += ["-movflags", "+faststart", output_video_path]
+            with tracer.span("media.mux", segments=len(segment_paths)) as span:
+                self._run_ffmpeg(cmd, cancel_token)
+                span.set("bytes_written", os.path.getsize(output_video_path))
+            
+            return output_video_path
+        
+        except subprocess.CalledProcessError as e:
+            print(f"Error concatenating segments: {e.stderr.decode(errors='replace')}")
+            raise
+        except Exception as e:
+            print(f"Error concatenating segments: {str(e)}")
+            raise
+        finally:
+            if list_file and os.path.exists(list_file):
+                os.remove(list_file)
+    
+    @staticmethod
+    def _run_ffmpeg(cmd, cancel_token=None):
+        """Run an ffmpeg command, killing it if cancel_token is cancelled"""
+        process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if cancel_token is None:
+            _, stderr = process.communicate()
+        else:
+            unregister = cancel_token.on_cancel(process.kill)
+            try:
+                _, stderr = process.communicate()
+            finally:
+                unregister()
+        
+        raise_if_cancelled(cancel_token)
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr)
+    
     def add_background_music(self, video_path, music_path, output_path, music_volume=0.3):
         """Add background music to a video
         
@@ -90,11 +856,9 @@ class MediaProcessor:
             Path to the created video file
         """
         try:
-            from moviepy.editor import VideoFileClip, AudioFileClip
-            
             # Load video and music
-            video = VideoFileClip(video_path)
-            music = AudioFileClip(music_path)
+            video = editor.VideoFileClip(video_path)
+            music = editor.AudioFileClip(music_path)
             
             # Loop music if it's shorter than the video
             if music.duration < video.duration:
@@ -111,15 +875,20 @@ class MediaProcessor:
             final_audio = final_audio.audio_fadeout(3)
             
             # Add music to video
-            final_clip = video.set_audio(CompositeAudioClip([final_audio, music.set_start(0)]))
+            final_clip = video.set_audio(editor.CompositeAudioClip([final_audio, music.set_start(0)]))
             
             # Write the result to a file
-            final_clip.write_videofile(
-                output_path,
-                fps=self.video_fps,
-                codec="libx264",
-                audio_codec="aac"
-            )
+            with tracer.span("media.encode", frames=int(video.duration * self.video_fps)) as span:
+                final_clip.write_videofile(
+                    output_path,
+                    fps=self.video_fps,
+                    codec="libx264",
+                    audio_codec="aac",
+                    preset=self.preset,
+                    ffmpeg_params=self._crf_params(),
+                    threads=self.threads
+                )
+                span.set("bytes_written", os.path.getsize(output_path))
             
             return output_path
         
@@ -0,0 +1,246 @@
+"""
+Motion Engine Module for Video Generator App
+Generates Ken Burns pan/zoom frames and crossfades in NumPy batches
+"""
+
+import math
+import numpy as np
+from PIL import Image, ImageOps
+
+# Zoom range used by the default motions (1.0 shows the whole fitted image)
+DEFAULT_ZOOM = (1.0, 1.12)
+
+# Frames generated per batch; the buffer holds batch_size full frames
+DEFAULT_BATCH_SIZE = 16
+
+CENTRE = (0.5, 0.5)
+
+
+def smoothstep(t):
+    """Ease-in/ease-out curve for t in [0, 1]"""
+    return t * t * (3.0 - 2.0 * t)
+
+
+def scene_motion(index, scene, zoom=DEFAULT_ZOOM):
+    """Get the motion of a scene as (zoom_start, zoom_end, pan_start, pan_end)
+
+    Pan positions are (x, y) fractions of the room left around the visible
+    area, so (0.5, 0.5) keeps the view centred. A scene can pick its motion
+    with scene["motion"]; otherwise scenes alternate between zooming in and
+    zooming out.
+    """
+    motion = scene.get("motion") or ("zoom_in" if index % 2 == 0 else "zoom_out")
+    low, high = zoom
+    motions = {
+        "zoom_in": (low, high, CENTRE, CENTRE),
+        "zoom_out": (high, low, CENTRE, CENTRE),
+        "pan_left": (high, high, (1.0, 0.5), (0.0, 0.5)),
+        "pan_right": (high, high, (0.0, 0.5), (1.0, 0.5)),
+        "pan_up": (high, high, (0.5, 1.0), (0.5, 0.0)),
+        "pan_down": (high, high, (0.5, 0.0), (0.5, 1.0)),
+        "none": (low, low, CENTRE, CENTRE),
+    }
+    if motion not in motions:
+        raise ValueError(f"Unknown motion: {motion}")
+    return motions[motion]
+
+
+def prepare_base_image(image_path, width, height, max_zoom):
+    """Load an image cropped to the output aspect at max_zoom times the output size
+
+    At the deepest zoom the crop is then sampled 1:1, so nearest-neighbour
+    sampling never has to magnify the image.
+
+    Returns:
+        uint8 array of shape (base_height, base_width, 3)
+    """
+    size = (max(int(math.ceil(width * max_zoom)), width), max(int(math.ceil(height * max_zoom)), height))
+    with Image.open(image_path) as image:
+        fitted = ImageOps.fit(image.convert("RGB"), size, Image.LANCZOS)
+    return np.asarray(fitted)
+
+
+def sample_indices(base_width, base_height, width, height, num_frames, zoom_start, zoom_end,
+                   pan_start, pan_end, max_zoom):
+    """Compute the source rows and columns of every frame of a scene at once
+
+    Returns:
+        (rows, cols): int arrays of shape (num_frames, height) and
+        (num_frames, width) indexing the base image
+    """
+    if num_frames > 1:
+        t = smoothstep(np.arange(num_frames, dtype=np.float64) / (num_frames - 1))
+    else:
+        t = np.zeros(1)
+
+    zoom = zoom_start + (zoom_end - zoom_start) * t
+    pan_x = pan_start[0] + (pan_end[0] - pan_start[0]) * t
+    pan_y = pan_start[1] + (pan_end[1] - pan_start[1]) * t
+
+    # Visible rectangle in base pixels, kept inside the image
+    crop_w = np.minimum(width * max_zoom / zoom, base_width)
+    crop_h = np.minimum(height * max_zoom / zoom, base_height)
+    x0 = (base_width - crop_w) * pan_x
+    y0 = (base_height - crop_h) * pan_y
+
+    # Pixel centres of the output mapped into the rectangle
+    cols = x0[:, None] + (np.arange(width) + 0.5)[None, :] * (crop_w / width)[:, None]
+    rows = y0[:, None] + (np.arange(height) + 0.5)[None, :] * (crop_h / height)[:, None]
+    cols = np.clip(cols.astype(np.intp), 0, base_width - 1)
+    rows = np.clip(rows.astype(np.intp), 0, base_height - 1)
+    return rows, cols
+
+
+class MotionRenderer:
+    """Renders scene images with motion and crossfades into a reused frame buffer
+
+    Each scene is drawn by gathering rows and then columns of its
+    pre-sized base image straight into the batch buffer. A crossfade is
+    centred on each cut and only its overlapping frames are blended; every
+    other frame is a single-image gather.
+    """
+
+    def __init__(self, width, height, fps, transition_seconds=0.5, zoom=DEFAULT_ZOOM,
+                 batch_size=DEFAULT_BATCH_SIZE):
+        """Initialize the renderer
+
+        Args:
+            width, height: Output frame size
+            fps: Frames per second
+            transition_seconds: Crossfade length at each cut (0 for hard cuts)
+            zoom: (low, high) zoom range used by the scene motions
+            batch_size: Frames per yielded batch
+        """
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.transition_seconds = transition_seconds
+        self.zoom = zoom
+        self.batch_size = batch_size
+
+        self.frames = np.empty((batch_size, height, width, 3), dtype=np.uint8)
+        self._scratch = np.empty((height, width, 3), dtype=np.uint8)
+        self._blend_a = np.empty((height, width, 3), dtype=np.uint16)
+        self._blend_b = np.empty((height, width, 3), dtype=np.uint16)
+        self._row_buffers = {}
+
+    def plan(self, scenes_data, durations):
+        """Lay the scenes out on the frame timeline
+
+        Scene cuts fall where the scene durations say, so the video stays
+        in sync with the narration; each crossfade takes half its frames
+        from either side of the cut.
+
+        Returns:
+            (plans, total_frames) where each plan has the scene's image
+            path, first and end frame (end exclusive) and motion
+        """
+        cuts = [int(round(t * self.fps)) for t in np.cumsum(durations)]
+        lengths = [end - start for start, end in zip([0] + cuts[:-1], cuts)]
+        half = int(round(self.transition_seconds * self.fps / 2))
+        overlaps = [min(half, lengths[i] // 2, lengths[i + 1] // 2) for i in range(len(cuts) - 1)]
+
+        plans = []
+        for i, scene in enumerate(scenes_data):
+            first = cuts[i - 1] - overlaps[i - 1] if i > 0 else 0
+            end = cuts[i] + overlaps[i] if i < len(overlaps) else cuts[i]
+            plans.append({
+                "image_path": scene["image_path"],
+                "first": first,
+                "end": end,
+                "motion": scene_motion(i, scene, self.zoom),
+            })
+        return plans, (cuts[-1] if cuts else 0)
+
+    def _load(self, plan):
+        """Prepare a scene's base image and per-frame sampling indices"""
+        zoom_start, zoom_end, pan_start, pan_end = plan["motion"]
+        max_zoom = max(zoom_start, zoom_end)
+        base = prepare_base_image(plan["image_path"], self.width, self.height, max_zoom)
+        rows, cols = sample_indices(base.shape[1], base.shape[0], self.width, self.height,
+                                    plan["end"] - plan["first"], zoom_start, zoom_end,
+                                    pan_start, pan_end, max_zoom)
+        static = zoom_start == zoom_end and pan_start == pan_end
+        return {"base": base, "rows": rows, "cols": cols, "static": static, "still": None}
+
+    def _draw(self, scene, local_index, out):
+        """Draw one frame of a scene into out"""
+        if scene["still"] is not None:
+            np.copyto(out, scene["still"])
+            return
+
+        base = scene["base"]
+        row_buffer = self._row_buffers.get(base.shape[1])
+        if row_buffer is None:
+            row_buffer = self._row_buffers[base.shape[1]] = np.empty((self.height, base.shape[1], 3),
+                                                                     dtype=np.uint8)
+        np.take(base, scene["rows"][local_index], axis=0, out=row_buffer)
+        np.take(row_buffer, scene["cols"][local_index], axis=1, out=out)
+
+        if scene["static"]:
+            # Motionless scene: every frame is this one
+            scene["still"] = out.copy()
+
+    def _blend(self, out, other, weight):
+        """Blend other over out in place, weight in 0..256"""
+        np.multiply(out, 256 - weight, out=self._blend_a, dtype=np.uint16)
+        np.multiply(other, weight, out=self._blend_b, dtype=np.uint16)
+        np.add(self._blend_a, self._blend_b, out=self._blend_a)
+        np.right_shift(self._blend_a, 8, out=self._blend_a)
+        np.copyto(out, self._blend_a, casting="unsafe")
+
+    def render(self, scenes_data, durations):
+        """Generate the video's frames in batches
+
+        Yields views into one preallocated buffer, so each batch must be
+        consumed (written to the encoder) before the next is requested.
+
+        Args:
+            scenes_data: Scene dictionaries with image_path and optionally motion
+            durations: Duration in seconds of each scene
+
+        Yields:
+            (frames, frames_done, total_frames) where frames is a uint8
+            array of shape (n, height, width, 3)
+        """
+        plans, total_frames = self.plan(scenes_data, durations)
+        loaded = {}
+        current = 0
+
+        for batch_start in range(0, total_frames, self.batch_size):
+            count = min(self.batch_size, total_frames - batch_start)
+            for slot in range(count):
+                frame = batch_start + slot
+                while plans[current]["end"] <= frame:
+                    loaded.pop(current, None)
+                    current += 1
+
+                if current not in loaded:
+                    loaded[current] = self._load(plans[current])
+                out = self.frames[slot]
+                self._draw(loaded[current], frame - plans[current]["first"], out)
+
+                following = current + 1
+                if following < len(plans) and frame >= plans[following]["first"]:
+                    # Crossfade: only these frames pay for a second image
+                    if following not in loaded:
+                        loaded[following] = self._load(plans[following])
+                    plan = plans[following]
+                    overlap = plans[current]["end"] - plan["first"]
+                    weight = int(256 * (frame - plan["first"] + 0.5) / overlap)
+                    self._draw(loaded[following], frame - plan["first"], self._scratch)
+                    self._blend(out, self._scratch, weight)
+
+            yield self.frames[:count], batch_start + count, total_frames
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+
+    renderer = MotionRenderer(540, 960, 30)
+    scenes = [{"image_path": path} for path in sys.argv[1:]]
+    if scenes:
+        for frames, done, total in renderer.render(scenes, [3.0] * len(scenes)):
+            pass
+        print(f"Rendered {total} frames")
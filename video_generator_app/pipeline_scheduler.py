@@ -0,0 +1,589 @@
+"""
+Pipeline Scheduler Module for Video Generator App
+Runs the per-scene generation and rendering stages as a dependency graph
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from media_processor import MediaProcessor, caption_mode, select_encoder_profile
+from job_store import JOB_LEVEL_SCENE, hash_inputs, file_fingerprint, artifact_exists
+from tracing import tracer
+from cancellation import OperationCancelled
+
+# Stage kinds: network calls run on threads, encoding runs on processes
+IO_STAGE = "io"
+CPU_STAGE = "cpu"
+
+# Retries for API stages (Gemini, Imagen, TTS) on transient failures
+API_RETRIES = 2
+
+
+class PipelineError(Exception):
+    """Raised when one or more pipeline tasks failed"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        names = ", ".join(sorted(errors))
+        super().__init__(f"Pipeline tasks failed: {names}")
+
+
+class PipelineTask:
+    """A single unit of work in the pipeline graph"""
+
+    def __init__(self, name, func, args=(), deps=(), kind=IO_STAGE, checkpoint=None,
+                 output_is_file=True, max_retries=0):
+        """Create a task
+
+        Args:
+            name: Unique task name, e.g. "image:3"
+            func: Callable run as func(*args, *dependency_results)
+            args: Fixed positional arguments
+            deps: Names of tasks whose results are appended to args, in order
+            kind: IO_STAGE (thread pool) or CPU_STAGE (process pool).
+                CPU tasks must be picklable module-level functions.
+            checkpoint: Optional (scene_id, stage, key_func) tuple. When the
+                scheduler has a job store, key_func(*dependency_results)
+                returns the task's inputs; a stage already recorded with the
+                same inputs is skipped and its stored output reused.
+            output_is_file: Whether the result names a file that must still
+                exist for a checkpoint to be reused
+            max_retries: Extra attempts after a failure, with exponential backoff
+        """
+        self.name = name
+        self.func = func
+        self.args = tuple(args)
+        self.deps = tuple(deps)
+        self.kind = kind
+        self.checkpoint = checkpoint
+        self.output_is_file = output_is_file
+        self.max_retries = max_retries
+        self.attempts = 0
+        self.inputs_hash = None
+        self.resumed = False
+        self.status = "pending"
+        self.result = None
+        self.started_at = None
+        self.finished_at = None
+
+
+def _timed_call(name, func, args, max_retries=0, retry_delay=0.5, trace_worker=False):
+    """Run func(*args) for task name, retrying on failure
+
+    Args:
+        trace_worker: Record spans in this worker process and return them.
+            Set by the parent for process-pool tasks while tracing is on.
+
+    Returns:
+        (result, start, end, attempts, spans) with wall-clock start and end
+        times. spans holds the tracing spans recorded when trace_worker is
+        set, for the parent to merge; it is empty otherwise.
+    """
+    if trace_worker:
+        # A spawned worker has its own disabled tracer and a forked one
+        # inherits the parent's spans; start clean under either start method
+        tracer.enabled = True
+        tracer.reset()
+
+    started_at = time.time()
+    attempt = 0
+    with tracer.span("pipeline." + name.split(":", 1)[0], task=name) as span:
+        while True:
+            attempt += 1
+            try:
+                result = func(*args)
+                break
+            except OperationCancelled:
+                raise
+            except Exception as e:
+                if attempt > max_retries:
+                    raise
+                span.add("retries")
+                print(f"Retrying {name} after error (attempt {attempt}): {str(e)}")
+                time.sleep(retry_delay * 2 ** (attempt - 1))
+    finished_at = time.time()
+
+    spans = tracer.drain() if trace_worker else []
+    return result, started_at, finished_at, attempt, spans
+
+
+class PipelineScheduler:
+    """Runs a graph of tasks, starting each one as soon as its dependencies finish"""
+
+    def __init__(self, io_workers=8, cpu_workers=None, job_store=None, job_id=None):
+        """Initialize the scheduler
+
+        Args:
+            io_workers: Thread count for network-bound stages
+            cpu_workers: Process count for encoding stages (defaults to CPU count)
+            job_store: Optional JobStore used to checkpoint and resume tasks
+            job_id: Job identifier within the job store
+        """
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers or os.cpu_count() or 1
+        self.job_store = job_store
+        self.job_id = job_id
+        self.tasks = {}
+
+        if job_store is not None and job_id is None:
+            raise ValueError("A job_id is required when using a job store")
+
+    def add_task(self, name, func, args=(), deps=(), kind=IO_STAGE, checkpoint=None,
+                 output_is_file=True, max_retries=0):
+        """Add a task to the graph and return it"""
+        if name in self.tasks:
+            raise ValueError(f"Duplicate task name: {name}")
+        if kind not in (IO_STAGE, CPU_STAGE):
+            raise ValueError(f"Invalid task kind: {kind}")
+
+        task = PipelineTask(name, func, args, deps, kind, checkpoint, output_is_file, max_retries)
+        self.tasks[name] = task
+        return task
+
+    def run(self, cancel_token=None, progress_callback=None, poll_interval=0.1):
+        """Run every task in dependency order with maximum overlap
+
+        Args:
+            cancel_token: Optional CancellationToken. On cancel, queued tasks
+                are dropped, encoder processes are terminated and running
+                threads are abandoned (API stages check the token themselves).
+            progress_callback: Optional callable(task, done_count, total)
+                called from the scheduler thread whenever a task finishes
+            poll_interval: Seconds between cancellation checks while waiting
+
+        Returns:
+            Dictionary mapping task name to its result
+
+        Raises:
+            PipelineError: If any task failed. Tasks depending on a failed
+                task are skipped; independent branches still run to completion.
+            OperationCancelled: If cancel_token was cancelled
+        """
+        for task in self.tasks.values():
+            for dep in task.deps:
+                if dep not in self.tasks:
+                    raise ValueError(f"Task {task.name} depends on unknown task {dep}")
+
+        waiting_on = {name: set(task.deps) for name, task in self.tasks.items()}
+        dependents = {name: [] for name in self.tasks}
+        for name, task in self.tasks.items():
+            for dep in task.deps:
+                dependents[dep].append(name)
+
+        errors = {}
+        in_flight = {}
+        ready = deque(name for name, deps in waiting_on.items() if not deps)
+        finished = [0]
+
+        io_pool = ThreadPoolExecutor(max_workers=self.io_workers)
+        cpu_pool = None
+        if any(task.kind == CPU_STAGE for task in self.tasks.values()):
+            cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers)
+            # Start the workers before any I/O thread runs. With the fork
+            # start method, a worker forked while a thread holds a lock
+            # (such as the import lock) deadlocks on its first import.
+            cpu_pool.submit(int).result()
+
+        def complete(task):
+            finished[0] += 1
+            if progress_callback is not None:
+                progress_callback(task, finished[0], len(self.tasks))
+            for child in dependents[task.name]:
+                waiting_on[child].discard(task.name)
+                if not waiting_on[child] and self.tasks[child].status == "pending":
+                    ready.append(child)
+
+        def skip_dependents(name):
+            for child in dependents[name]:
+                if self.tasks[child].status == "pending":
+                    self.tasks[child].status = "skipped"
+                    skip_dependents(child)
+
+        def start(task):
+            dep_results = tuple(self.tasks[dep].result for dep in task.deps)
+            if self._resume(task, dep_results):
+                complete(task)
+                return
+
+            pool = cpu_pool if task.kind == CPU_STAGE else io_pool
+            task.status = "running"
+            future = pool.submit(_timed_call, task.name, task.func, task.args + dep_results,
+                                 task.max_retries, trace_worker=task.kind == CPU_STAGE and tracer.enabled)
+            in_flight[future] = task
+
+        cancelled = False
+        try:
+            while ready or in_flight:
+                if cancel_token is not None and cancel_token.cancelled:
+                    cancelled = True
+                    break
+                while ready:
+                    start(self.tasks[ready.popleft()])
+                if not in_flight:
+                    break
+
+                timeout = poll_interval if cancel_token is not None else None
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = in_flight.pop(future)
+                    try:
+                        (task.result, task.started_at, task.finished_at,
+                         task.attempts, spans) = future.result()
+                        tracer.merge(spans)
+                    except OperationCancelled:
+                        cancelled = True
+                        task.status = "cancelled"
+                        continue
+                    except Exception as e:
+                        print(f"Error in pipeline task {task.name}: {str(e)}")
+                        task.status = "failed"
+                        errors[task.name] = e
+                        self._checkpoint(task, error=e)
+                        skip_dependents(task.name)
+                        continue
+
+                    task.status = "done"
+                    self._checkpoint(task)
+                    complete(task)
+        finally:
+            if cancelled:
+                self._abandon(io_pool, cpu_pool)
+            else:
+                io_pool.shutdown(wait=True)
+                if cpu_pool is not None:
+                    cpu_pool.shutdown(wait=True)
+            if self.job_store is not None:
+                self.job_store.flush()
+
+        if cancelled:
+            for task in self.tasks.values():
+                if task.status in ("pending", "running"):
+                    task.status = "cancelled"
+            raise OperationCancelled("Pipeline cancelled")
+
+        stuck = [name for name, task in self.tasks.items() if task.status == "pending"]
+        if stuck:
+            raise ValueError(f"Dependency cycle between tasks: {', '.join(sorted(stuck))}")
+        if errors:
+            raise PipelineError(errors)
+
+        return {name: task.result for name, task in self.tasks.items()}
+
+    @staticmethod
+    def _abandon(io_pool, cpu_pool):
+        """Drop queued work and free the workers without waiting"""
+        io_pool.shutdown(wait=False, cancel_futures=True)
+        if cpu_pool is None:
+            return
+
+        # ProcessPoolExecutor has no public way to stop running tasks, so
+        # terminate its workers; their ffmpeg children exit on the broken pipe
+        processes = list(getattr(cpu_pool, "_processes", {}).values())
+        cpu_pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def _resume(self, task, dep_results):
+        """Reuse a checkpointed result for task if one matches its inputs"""
+        if self.job_store is None or task.checkpoint is None:
+            return False
+
+        scene_id, stage, key_func = task.checkpoint
+        task.inputs_hash = hash_inputs(stage, key_func(*dep_results))
+        output = self.job_store.get_completed(self.job_id, scene_id, stage, task.inputs_hash)
+        if output is None or (task.output_is_file and not artifact_exists(output)):
+            self.job_store.mark_running(self.job_id, scene_id, stage, task.inputs_hash)
+            return False
+
+        task.result = output
+        task.status = "done"
+        task.resumed = True
+        return True
+
+    def _checkpoint(self, task, error=None):
+        """Record a finished task in the job store"""
+        if self.job_store is None or task.checkpoint is None:
+            return
+
+        scene_id, stage, _ = task.checkpoint
+        if error is None:
+            self.job_store.mark_done(self.job_id, scene_id, stage, task.inputs_hash, task.result)
+        else:
+            self.job_store.mark_failed(self.job_id, scene_id, stage, task.inputs_hash, error)
+
+    def get_timings(self):
+        """Get (start, end) wall-clock times for every task that ran to completion"""
+        return {
+            name: (task.started_at, task.finished_at)
+            for name, task in self.tasks.items()
+            if task.status == "done" and not task.resumed
+        }
+
+
+# Stage functions. These are module-level so CPU stages can be pickled
+# into worker processes.
+
+def _prompt_stage(gemini_client, description, image_style, cancel_token):
+    return gemini_client.generate_image_prompt_for_scene(
+        description, image_style, cancel_token=cancel_token).strip()
+
+
+def _prepare_output(asset, output_path):
+    """Unlink a previous output that may be a hard link into the asset store
+
+    Writing through the link would change the stored blob for every
+    project sharing it.
+    """
+    if asset is not None and os.path.lexists(output_path):
+        os.remove(output_path)
+
+
+def _store_output(asset, output_path):
+    """Move a stage's output into the asset store, leaving a link behind"""
+    if asset is not None:
+        store, project, name = asset
+        store.ingest(output_path, project, name)
+
+
+def _image_stage(imagen_client, width, height, output_path, cancel_token, asset, image_prompt):
+    _prepare_output(asset, output_path)
+    result = imagen_client.generate_image(image_prompt, width, height, output_path,
+                                          cancel_token=cancel_token)
+    _store_output(asset, result)
+    return result
+
+
+def _audio_stage(tts_client, speech, voice_config, output_path, cancel_token, asset):
+    _prepare_output(asset, output_path)
+    result = tts_client.generate_audio_for_scene(speech, voice_config, output_path,
+                                                 cancel_token=cancel_token)
+    _store_output(asset, result["path"])
+    return result
+
+
+def _segment_stage(processor, size, output_path, image_path, audio_result):
+    scene = {"image_path": image_path, "audio_path": audio_result["path"]}
+    return processor.render_scene_segment(scene, output_path, size=size)
+
+
+def _subtitles_stage(processor, speeches, subtitle_path, *audio_results):
+    # Timed from the audio files, like the segments, so captions match the
+    # video; runs as a CPU stage so MoviePy stays out of the parent process
+    scenes = [{"speech": speech, "audio_path": audio_result["path"]}
+              for speech, audio_result in zip(speeches, audio_results)]
+    return processor.create_subtitles(scenes, subtitle_path) or ""
+
+
+def _concat_stage(processor, output_video_path, cancel_token, asset, subtitle_path, *segment_paths):
+    _prepare_output(asset, output_video_path)
+    result = processor.concatenate_segments(segment_paths, output_video_path, cancel_token=cancel_token,
+                                            subtitle_path=subtitle_path)
+    _store_output(asset, result)
+    return result
+
+
+def _qa_stage(processor, size, output_video_path, *inputs):
+    # inputs alternate image path and audio result, scene by scene
+    scenes = [{"image_path": image_path, "audio_path": audio_result["path"]}
+              for image_path, audio_result in zip(inputs[::2], inputs[1::2])]
+    return processor.create_qa_artifacts(scenes, output_video_path, size=size)
+
+
+def _files_key(*paths_or_results):
+    """Checkpoint key for stages whose inputs are files from earlier stages"""
+    paths = [r["path"] if isinstance(r, dict) else r for r in paths_or_results]
+    return [file_fingerprint(path) for path in paths]
+
+
+def build_video_pipeline(scheduler, scenes, output_video_path, gemini_client,
+                         imagen_client, tts_client, config, work_dir, cancel_token=None,
+                         asset_store=None, project=None):
+    """Add the full scene graph for one video to a scheduler
+
+    Per scene: prompt -> image, and audio in parallel; the scene's segment
+    encodes as soon as both its image and audio exist. The final concat
+    waits for every segment and, with soft captions, for the subtitle file
+    built from the audio, which it muxes in as a mov_text track. The poster
+    and contact sheet are built from the images alongside the encodes.
+    Every stage carries a checkpoint, so a scheduler with a job store skips
+    stages that already finished.
+
+    Args:
+        scheduler: PipelineScheduler to add tasks to
+        scenes: List of scene dictionaries (speech, description and
+            optionally image_prompt, as returned by SceneFrame.get_scene_data)
+        output_video_path: Path to save the final video
+        gemini_client, imagen_client, tts_client: API clients
+        config: Application configuration dictionary
+        work_dir: Directory for per-scene images, audio and segments
+        cancel_token: Optional CancellationToken handed to the API clients
+            and the final concat (encoder processes are terminated instead)
+        asset_store: Optional AssetStore; images, audio and the final video
+            are de-duplicated into it and recorded in project's manifest
+        project: Manifest name used with asset_store
+
+    Returns:
+        Name of the final task
+    """
+    width = config.get("image_width", 1080)
+    height = config.get("image_height", 1920)
+    # One processor for every stage; it is pickled into the CPU workers
+    processor = MediaProcessor.from_config(config)
+    encoder_key = (processor.video_fps, processor.preset, processor.crf)
+    image_style = config.get("default_image_style_prompt", "")
+    voice_config = {"name": config.get("default_tts_voice", "th-TH-Neural2-C")}
+    captions = caption_mode(config)
+    if captions not in ("soft", None):
+        raise ValueError(f"Unsupported captions mode for the pipeline: {captions}")
+
+    os.makedirs(work_dir, exist_ok=True)
+    segment_tasks = []
+    scene_inputs = []
+    audio_tasks = []
+
+    def asset(name):
+        return (asset_store, project, name) if asset_store is not None else None
+
+    for i, scene in enumerate(scenes):
+        image_path = os.path.join(work_dir, f"scene_{i + 1:03d}.png")
+        audio_path = os.path.join(work_dir, f"scene_{i + 1:03d}.mp3")
+        segment_path = os.path.join(work_dir, f"scene_{i + 1:03d}.mp4")
+
+        if scene.get("image_prompt"):
+            prompt = scene["image_prompt"]
+            image_args = (imagen_client, width, height, image_path, cancel_token,
+                          asset(f"image:{i}"), prompt)
+            image_deps = ()
+            image_key = lambda prompt=prompt: (prompt, width, height)
+        else:
+            scheduler.add_task(f"prompt:{i}", _prompt_stage,
+                               args=(gemini_client, scene["description"], image_style, cancel_token),
+                               checkpoint=(i, "prompt",
+                                           lambda d=scene["description"]: (d, image_style)),
+                               output_is_file=False, max_retries=API_RETRIES)
+            image_args = (imagen_client, width, height, image_path, cancel_token,
+                          asset(f"image:{i}"))
+            image_deps = (f"prompt:{i}",)
+            image_key = lambda prompt: (prompt, width, height)
+
+        scheduler.add_task(f"image:{i}", _image_stage, args=image_args, deps=image_deps,
+                           checkpoint=(i, "image", image_key), max_retries=API_RETRIES)
+        scheduler.add_task(f"audio:{i}", _audio_stage,
+                           args=(tts_client, scene["speech"], voice_config, audio_path, cancel_token,
+                                 asset(f"audio:{i}")),
+                           checkpoint=(i, "audio",
+                                       lambda speech=scene["speech"]: (speech, voice_config)),
+                           max_retries=API_RETRIES)
+        scheduler.add_task(f"segment:{i}", _segment_stage,
+                           args=(processor, (width, height), segment_path),
+                           deps=(f"image:{i}", f"audio:{i}"), kind=CPU_STAGE,
+                           checkpoint=(i, "segment",
+                                       lambda *files: (encoder_key, width, height, _files_key(*files))))
+        segment_tasks.append(f"segment:{i}")
+        audio_tasks.append(f"audio:{i}")
+        scene_inputs += [f"image:{i}", f"audio:{i}"]
+
+    video_args = (processor, output_video_path, cancel_token, asset("video"))
+    video_deps = list(segment_tasks)
+    if captions == "soft":
+        speeches = [scene["speech"] for scene in scenes]
+        scheduler.add_task("subtitles", _subtitles_stage,
+                           args=(processor, speeches, os.path.splitext(output_video_path)[0] + ".srt"),
+                           deps=audio_tasks, kind=CPU_STAGE,
+                           checkpoint=(JOB_LEVEL_SCENE, "subtitles",
+                                       lambda *audio: (speeches, _files_key(*audio))))
+        video_deps.insert(0, "subtitles")
+    else:
+        video_args += (None,)
+
+    scheduler.add_task("video", _concat_stage, args=video_args, deps=video_deps,
+                       checkpoint=(JOB_LEVEL_SCENE, "video",
+                                   lambda *files: (output_video_path, _files_key(*files))))
+
+    if config.get("qa_artifacts", True):
+        scheduler.add_task("qa", _qa_stage,
+                           args=(processor, (width, height), output_video_path),
+                           deps=scene_inputs, kind=CPU_STAGE,
+                           checkpoint=(JOB_LEVEL_SCENE, "qa",
+                                       lambda *files: (output_video_path, _files_key(*files))),
+                           output_is_file=False)
+    return "video"
+
+
+def run_video_pipeline(scenes, output_video_path, gemini_client, imagen_client,
+                       tts_client, config, work_dir, io_workers=8, cpu_workers=None,
+                       job_store=None, job_id=None, cancel_token=None, progress_callback=None,
+                       asset_store=None, project=None):
+    """Generate and render a whole video through the pipeline scheduler
+
+    With a job store, re-running the same job (by default identified by
+    its work directory) skips every stage that already finished, including
+    after a cancelled run. With an asset store, generated files are stored
+    once by content under the project's manifest (the job id by default).
+    Without cpu_workers, the calibrated encoder profile's segment_workers
+    sets how many segments encode at once.
+
+    Returns:
+        Path to the created video file
+    """
+    if cpu_workers is None:
+        cpu_workers = (select_encoder_profile(config) or {}).get("segment_workers")
+    if job_store is not None and job_id is None:
+        job_id = hash_inputs(os.path.abspath(work_dir))
+    if asset_store is not None and project is None:
+        project = job_id or hash_inputs(os.path.abspath(work_dir))
+
+    scheduler = PipelineScheduler(io_workers=io_workers, cpu_workers=cpu_workers,
+                                  job_store=job_store, job_id=job_id)
+    final_task = build_video_pipeline(scheduler, scenes, output_video_path, gemini_client,
+                                      imagen_client, tts_client, config, work_dir,
+                                      cancel_token=cancel_token, asset_store=asset_store,
+                                      project=project)
+
+    if job_store is not None:
+        job_store.start_job(job_id, output_video_path)
+    try:
+        results = scheduler.run(cancel_token=cancel_token, progress_callback=progress_callback)
+    except OperationCancelled:
+        if job_store is not None:
+            job_store.finish_job(job_id, "cancelled")
+        raise
+    except Exception:
+        if job_store is not None:
+            job_store.finish_job(job_id, "failed")
+        raise
+
+    if job_store is not None:
+        job_store.finish_job(job_id)
+    return results[final_task]
+
+
+# Example usage
+if __name__ == "__main__":
+    import json
+    from config_manager import ConfigManager
+    from job_store import JobStore
+    from gcp_clients.gemini_client import GeminiClient
+    from gcp_clients.imagen_client import ImagenClient
+    from gcp_clients.tts_client import TTSClient
+
+    config_manager = ConfigManager()
+    config = config_manager.get_config()
+
+    gemini = GeminiClient.from_config(config)
+    imagen = ImagenClient(config["project_id"], config["location"])
+    tts = TTSClient(config["project_id"])
+
+    scenes = json.loads(gemini.parse_script(gemini.generate_script("การเรียนรู้ภาษาอังกฤษด้วยตนเอง")))
+
+    output_path = os.path.join(config_manager.get_full_path("videos"), "pipeline_video.mp4")
+    work_dir = os.path.join(config_manager.get_full_path("videos"), "pipeline_work")
+    job_store = JobStore(os.path.join(config_manager.get_full_path("jobs"), "job_store.sqlite3"))
+    run_video_pipeline(scenes, output_path, gemini, imagen, tts, config, work_dir, job_store=job_store,
+                       asset_store=config_manager.get_asset_store())
+    job_store.close()
+    gemini.close()
+    print(f"Video created at {output_path}")
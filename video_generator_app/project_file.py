@@ -0,0 +1,282 @@
+"""
+Project File Module for Video Generator App
+Saves and opens projects as one compact manifest backed by the asset store
+"""
+
+import os
+import json
+import time
+import tempfile
+
+from scene_model import SceneModel
+from tracing import tracer
+
+PROJECT_FORMAT = "video-generator-project"
+PROJECT_VERSION = 1
+PROJECT_EXTENSION = ".vgproj"
+
+# Config keys copied into a project so it renders the same way elsewhere
+RENDER_SETTING_KEYS = ("video_fps", "image_width", "image_height", "encoder_quality", "qa_artifacts",
+                       "captions")
+
+# Scene fields stored in the manifest; paths are replaced by asset keys
+SCENE_FIELDS = ("title", "speech", "description", "image_prompt", "audio_duration")
+
+# Asset names match the pipeline's task names, so a pipeline run with
+# project=<project name> fills in the same manifest entries
+ASSET_KINDS = (("image", "image_path"), ("audio", "audio_path"))
+
+
+class ProjectError(Exception):
+    """Raised when a project file cannot be read"""
+
+
+class Project:
+    """A video project: script, scenes, asset hashes and render settings
+
+    The file on disk holds no media. Every image, audio file and rendered
+    video is stored in the AssetStore by content hash, and scenes point
+    straight at the read-only blobs, so opening a project reads one small
+    JSON file and nothing else. The store manifest named after the project
+    keeps its assets alive through garbage collection.
+    """
+
+    def __init__(self, name, asset_store, scenes=None, script="", topic="", render_settings=None,
+                 path=None):
+        """Create a project in memory
+
+        Args:
+            name: Project name (also its manifest name in the asset store)
+            asset_store: AssetStore holding the project's media
+            scenes: List of SceneModel
+            script: Full script text
+            topic: Video topic
+            render_settings: Dictionary of RENDER_SETTING_KEYS values
+            path: File the project was opened from or last saved to
+        """
+        self.name = name
+        self.asset_store = asset_store
+        self.scenes = list(scenes or [])
+        self.script = script
+        self.topic = topic
+        self.render_settings = dict(render_settings or {})
+        self.path = path
+        self.video_key = None
+        self.created_at = time.time()
+        # abspath -> (mtime_ns, size, key), so unchanged files are not re-hashed
+        self._key_cache = {}
+
+    @classmethod
+    def from_config(cls, name, asset_store, config, **kwargs):
+        """Create a project taking its render settings from the app config"""
+        settings = {key: config[key] for key in RENDER_SETTING_KEYS if key in config}
+        return cls(name, asset_store, render_settings=settings, **kwargs)
+
+    # Assets
+
+    def asset_path(self, key):
+        """Get the path of an asset in the store (no I/O)"""
+        return self.asset_store.blob_path(key) if key else ""
+
+    def _asset_key(self, path):
+        """Get the store key of a file, storing it if needed"""
+        if not path or not os.path.exists(path):
+            return None
+
+        # Paths that already are blobs carry their key in the file name
+        if os.path.dirname(os.path.abspath(path)).startswith(os.path.abspath(self.asset_store.objects_dir)):
+            return os.path.basename(path)
+
+        stat_result = os.stat(path)
+        stamp = (stat_result.st_mtime_ns, stat_result.st_size)
+        cached = self._key_cache.get(os.path.abspath(path))
+        if cached and cached[:2] == stamp:
+            return cached[2]
+
+        key = self.asset_store.put_file(path)
+        self._key_cache[os.path.abspath(path)] = stamp + (key,)
+        return key
+
+    def missing_assets(self):
+        """List (scene index, kind) of assets never generated or not in the store"""
+        missing = []
+        for i, scene in enumerate(self.scenes):
+            for kind, attr in ASSET_KINDS:
+                path = getattr(scene, attr)
+                if not path or not os.path.exists(path):
+                    missing.append((i, kind))
+        return missing
+
+    def adopt_store_assets(self):
+        """Point scenes at the assets a pipeline run recorded for this project
+
+        Returns:
+            Number of scene assets updated
+        """
+        manifest = self.asset_store.get_manifest(self.name)
+        updated = 0
+        for i, scene in enumerate(self.scenes):
+            for kind, attr in ASSET_KINDS:
+                key = manifest.get(f"{kind}:{i}")
+                if key and getattr(scene, attr) != self.asset_path(key):
+                    setattr(scene, attr, self.asset_path(key))
+                    updated += 1
+        if manifest.get("video"):
+            self.video_key = manifest["video"]
+        return updated
+
+    # Saving and opening
+
+    def to_manifest(self):
+        """Get the manifest, storing any scene media not yet in the asset store"""
+        scenes = []
+        assets = {}
+        for i, scene in enumerate(self.scenes):
+            record = {field: getattr(scene, field) for field in SCENE_FIELDS
+                      if getattr(scene, field) not in ("", None)}
+            for kind, attr in ASSET_KINDS:
+                key = self._asset_key(getattr(scene, attr))
+                if key:
+                    record[kind] = key
+                    assets[f"{kind}:{i}"] = key
+            scenes.append(record)
+        if self.video_key:
+            assets["video"] = self.video_key
+
+        return {
+            "format": PROJECT_FORMAT,
+            "version": PROJECT_VERSION,
+            "name": self.name,
+            "created_at": self.created_at,
+            "updated_at": time.time(),
+            "topic": self.topic,
+            "script": self.script,
+            "render": self.render_settings,
+            "scenes": scenes,
+            "assets": assets,
+        }
+
+    def save(self, path=None):
+        """Write the project atomically and register its assets in the store
+
+        Returns:
+            Path of the project file
+        """
+        path = path or self.path
+        if not path:
+            raise ValueError("No project file path given")
+        try:
+            with tracer.span("project.save", scenes=len(self.scenes)):
+                data = self.to_manifest()
+                directory = os.path.dirname(os.path.abspath(path))
+                os.makedirs(directory, exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(temp_path, path)
+                finally:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+
+                # Replace the store manifest so assets dropped from the
+                # project become collectable
+                self.asset_store.set_manifest(self.name, data["assets"])
+
+            self.path = path
+            return path
+
+        except Exception as e:
+            print(f"Error saving project: {str(e)}")
+            raise
+
+    @classmethod
+    def from_manifest(cls, data, asset_store, path=None):
+        """Build a project from a manifest without touching any asset"""
+        if data.get("format") != PROJECT_FORMAT:
+            raise ProjectError("Not a video generator project")
+        if data.get("version", 0) > PROJECT_VERSION:
+            raise ProjectError(f"Project version {data['version']} is newer than this app supports")
+
+        project = cls(data["name"], asset_store, script=data.get("script", ""), topic=data.get("topic", ""),
+                      render_settings=data.get("render"), path=path)
+        project.created_at = data.get("created_at", project.created_at)
+        project.video_key = data.get("assets", {}).get("video")
+        for i, record in enumerate(data.get("scenes", [])):
+            scene = SceneModel(i)
+            scene.update({field: record[field] for field in SCENE_FIELDS if field in record})
+            for kind, attr in ASSET_KINDS:
+                setattr(scene, attr, project.asset_path(record.get(kind)))
+            project.scenes.append(scene)
+        return project
+
+    @classmethod
+    def open(cls, path, asset_store):
+        """Open a project file
+
+        Only the manifest is read. Scene media is resolved to blob paths
+        by name, so thumbnails and audio are loaded when first used.
+        """
+        try:
+            with tracer.span("project.open"):
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                return cls.from_manifest(data, asset_store, path=path)
+
+        except (OSError, ValueError) as e:
+            print(f"Error opening project: {str(e)}")
+            raise ProjectError(f"Cannot open project {path}: {str(e)}") from e
+
+    # Rendering
+
+    def scene_dicts(self):
+        """Get scenes in the format used by MediaProcessor and the pipeline"""
+        return [scene.to_dict() for scene in self.scenes]
+
+    def render_config(self, config):
+        """Get the app config with this project's render settings applied"""
+        return dict(config, **self.render_settings)
+
+
+def render_project(path, config_manager, output_path=None):
+    """Render a saved project without the GUI and record the video in it
+
+    Returns:
+        Path to the rendered video
+    """
+    from media_processor import MediaProcessor, caption_mode
+
+    project = Project.open(path, config_manager.get_asset_store())
+    missing = project.missing_assets()
+    if missing or not project.scenes:
+        raise ProjectError(f"Project has no scenes or is missing assets: {missing}")
+
+    config = project.render_config(config_manager.get_config())
+    output_path = output_path or os.path.join(config_manager.get_full_path("videos"), f"{project.name}.mp4")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    # A previous render left the output as a hard link into the asset store;
+    # writing through it would change the stored video
+    if os.path.lexists(output_path):
+        os.remove(output_path)
+    MediaProcessor.from_config(config).create_video_from_scenes(
+        project.scene_dicts(), output_path, captions=caption_mode(config),
+        qa_artifacts=config.get("qa_artifacts", True))
+
+    project.video_key = project.asset_store.ingest(output_path, project.name, "video")
+    project.save()
+    return output_path
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    from config_manager import ConfigManager
+
+    config_manager = ConfigManager()
+    if len(sys.argv) > 2 and sys.argv[1] == "render":
+        print(f"Video created at {render_project(sys.argv[2], config_manager)}")
+    elif len(sys.argv) > 1:
+        project = Project.open(sys.argv[1], config_manager.get_asset_store())
+        print(f"{project.name}: {len(project.scenes)} scenes, missing assets: {project.missing_assets()}")
@@ -0,0 +1,185 @@
+"""
+QA Artifacts Module for Video Generator App
+Builds poster thumbnails and contact sheets from scene images or keyframes
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import subprocess
+
+from PIL import Image, ImageDraw, ImageOps
+
+# Longest side of a poster thumbnail (1280x720 is the common upload size)
+POSTER_MAX_SIDE = 1280
+
+CONTACT_TILE_WIDTH = 240
+CONTACT_COLUMNS = 4
+CONTACT_LABEL_HEIGHT = 18
+
+
+def format_timestamp(seconds):
+    """Format seconds as m:ss.s for tile labels"""
+    minutes, seconds = divmod(seconds, 60)
+    return f"{int(minutes)}:{seconds:04.1f}"
+
+
+def scene_start_times(durations):
+    """Get the start time of every scene from the scene durations"""
+    starts = []
+    elapsed = 0.0
+    for duration in durations:
+        starts.append(elapsed)
+        elapsed += duration
+    return starts
+
+
+def poster_size(width, height, max_side=POSTER_MAX_SIDE):
+    """Scale a video size down so its longest side is at most max_side"""
+    scale = min(1.0, max_side / max(width, height))
+    return int(width * scale) // 2 * 2, int(height * scale) // 2 * 2
+
+
+def load_fitted(image_path, size, fit="crop"):
+    """Decode an image straight to size
+
+    Decoding uses Pillow's draft mode (JPEG) and reduce() so a large image
+    is never fully resampled.
+
+    Args:
+        image_path: Image to load
+        size: (width, height) of the result
+        fit: "crop" fills the size and trims the overflow, "pad" letterboxes
+
+    Returns:
+        RGB PIL image of exactly size
+    """
+    with Image.open(image_path) as image:
+        image.draft("RGB", size)
+        factor = min(image.width // size[0], image.height // size[1])
+        if factor > 1:
+            image = image.reduce(factor)
+        image = image.convert("RGB")
+
+    if fit == "crop":
+        return ImageOps.fit(image, size, Image.BILINEAR)
+    if fit == "pad":
+        return ImageOps.pad(image, size, Image.BILINEAR, color="black")
+    raise ValueError(f"Unknown fit mode: {fit}")
+
+
+def create_poster(image_path, output_path, size, fit="crop", quality=90):
+    """Write a poster thumbnail (JPEG) from a scene image
+
+    Returns:
+        output_path
+    """
+    try:
+        load_fitted(image_path, size, fit).save(output_path, "JPEG", quality=quality)
+        return output_path
+
+    except Exception as e:
+        print(f"Error creating poster: {str(e)}")
+        raise
+
+
+def create_contact_sheet(tiles, output_path, tile_size, columns=CONTACT_COLUMNS, fit="crop", quality=85):
+    """Lay images out in a labelled grid for review
+
+    Args:
+        tiles: List of (image path, label) pairs
+        output_path: JPEG or PNG file to write
+        tile_size: (width, height) of each tile
+        columns: Tiles per row
+        fit: How images are brought to tile_size ("crop" or "pad")
+        quality: JPEG quality
+
+    Returns:
+        output_path
+    """
+    try:
+        tile_width, tile_height = tile_size
+        cell_height = tile_height + CONTACT_LABEL_HEIGHT
+        columns = max(1, min(columns, len(tiles)))
+        rows = (len(tiles) + columns - 1) // columns
+
+        sheet = Image.new("RGB", (columns * tile_width, rows * cell_height), "black")
+        draw = ImageDraw.Draw(sheet)
+        for i, (image_path, label) in enumerate(tiles):
+            x = (i % columns) * tile_width
+            y = (i // columns) * cell_height
+            sheet.paste(load_fitted(image_path, tile_size, fit), (x, y))
+            draw.text((x + 4, y + tile_height + 3), label, fill=(255, 255, 255))
+
+        if os.path.splitext(output_path)[1].lower() in (".jpg", ".jpeg"):
+            sheet.save(output_path, "JPEG", quality=quality)
+        else:
+            sheet.save(output_path)
+        return output_path
+
+    except Exception as e:
+        print(f"Error creating contact sheet: {str(e)}")
+        raise
+
+
+def extract_keyframes(ffmpeg_binary, video_path, output_dir, width=CONTACT_TILE_WIDTH):
+    """Decode only the keyframes of an existing video into small JPEGs
+
+    ffmpeg skips every non-key frame before decoding (-skip_frame nokey),
+    so this costs one decode per GOP rather than a decode of the whole
+    video. Scene cuts in rendered videos start a new GOP, so keyframes
+    land on or near every scene.
+
+    Returns:
+        List of (image path, time in seconds) pairs
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    cmd = [
+        ffmpeg_binary, "-y", "-hide_banner", "-loglevel", "info",
+        "-skip_frame", "nokey", "-i", video_path,
+        "-an", "-sn", "-vf", f"scale={width}:-2,showinfo", "-fps_mode", "passthrough",
+        "-q:v", "4", os.path.join(output_dir, "key_%05d.jpg"),
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, cmd, stderr=result.stderr)
+
+    times = [float(t) for t in re.findall(rb"pts_time:\s*([-\d.]+)", result.stderr)]
+    return [(os.path.join(output_dir, f"key_{i + 1:05d}.jpg"), t) for i, t in enumerate(times)]
+
+
+def contact_sheet_from_video(ffmpeg_binary, video_path, output_path, columns=CONTACT_COLUMNS,
+                             tile_width=CONTACT_TILE_WIDTH):
+    """Build a contact sheet for a video that was not rendered by this app
+
+    Returns:
+        output_path
+    """
+    temp_dir = tempfile.mkdtemp(prefix="keyframes_")
+    try:
+        keyframes = extract_keyframes(ffmpeg_binary, video_path, temp_dir, tile_width)
+        if not keyframes:
+            raise ValueError(f"No keyframes found in {video_path}")
+        with Image.open(keyframes[0][0]) as first:
+            tile_size = first.size
+        tiles = [(path, format_timestamp(t)) for path, t in keyframes]
+        return create_contact_sheet(tiles, output_path, tile_size, columns)
+
+    except subprocess.CalledProcessError as e:
+        print(f"Error extracting keyframes: {e.stderr.decode(errors='replace')[-500:]}")
+        raise
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    from moviepy.config import get_setting
+
+    if len(sys.argv) > 1:
+        video = sys.argv[1]
+        sheet = contact_sheet_from_video(get_setting("FFMPEG_BINARY"), video,
+                                         os.path.splitext(video)[0] + ".contact.jpg")
+        print(f"Contact sheet saved to {sheet}")
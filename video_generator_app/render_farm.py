@@ -0,0 +1,430 @@
+"""
+Render Farm Module for Video Generator App
+Renders many videos concurrently with a SQLite job queue and worker processes
+"""
+
+import os
+import json
+import time
+import shutil
+import sqlite3
+import threading
+import multiprocessing
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Render job status values
+STATUS_QUEUED = "queued"
+STATUS_CLAIMED = "claimed"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS render_jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scenes TEXT NOT NULL,
+    output_path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    worker_id TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    error TEXT,
+    enqueued_at REAL NOT NULL,
+    claimed_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS render_jobs_status ON render_jobs (status, job_id);
+"""
+
+
+class RenderQueue:
+    """SQLite-backed queue of render jobs shared between processes"""
+
+    def __init__(self, db_path):
+        """Open (or create) the queue database
+
+        Each process must create its own RenderQueue; connections are not
+        shared across processes.
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        # Autocommit mode: transactions are opened explicitly where needed
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+
+    def enqueue(self, scenes_data, output_path, max_attempts=3):
+        """Add a render job and return its id"""
+        cursor = self.conn.execute(
+            "INSERT INTO render_jobs (scenes, output_path, status, max_attempts, enqueued_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (json.dumps(scenes_data, ensure_ascii=False), output_path, STATUS_QUEUED,
+             max_attempts, time.time())
+        )
+        return cursor.lastrowid
+
+    def claim(self, worker_id):
+        """Atomically claim the oldest queued job
+
+        Returns:
+            Dictionary with job_id, scenes and output_path, or None if the
+            queue is empty
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT job_id, scenes, output_path FROM render_jobs WHERE status = ? "
+                "ORDER BY job_id LIMIT 1",
+                (STATUS_QUEUED,)
+            ).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE render_jobs SET status = ?, worker_id = ?, attempts = attempts + 1, "
+                    "claimed_at = ?, heartbeat_at = ? WHERE job_id = ?",
+                    (STATUS_CLAIMED, worker_id, now, now, row[0])
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        if row is None:
+            return None
+        return {"job_id": row[0], "scenes": json.loads(row[1]), "output_path": row[2]}
+
+    def heartbeat(self, job_id, worker_id):
+        """Record that a worker is still rendering a job
+
+        Returns:
+            False if the worker lost the job (it was requeued as stale)
+        """
+        cursor = self.conn.execute(
+            "UPDATE render_jobs SET heartbeat_at = ? WHERE job_id = ? AND worker_id = ? AND status = ?",
+            (time.time(), job_id, worker_id, STATUS_CLAIMED)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, worker_id):
+        """Mark a claimed job as finished
+
+        Returns:
+            False if the worker no longer held the job
+        """
+        cursor = self.conn.execute(
+            "UPDATE render_jobs SET status = ?, finished_at = ? WHERE job_id = ? AND worker_id = ? "
+            "AND status = ?",
+            (STATUS_DONE, time.time(), job_id, worker_id, STATUS_CLAIMED)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, worker_id, error):
+        """Requeue a failed job, or mark it failed once it is out of attempts"""
+        self.conn.execute(
+            "UPDATE render_jobs SET status = CASE WHEN attempts < max_attempts THEN ? ELSE ? END, "
+            "worker_id = NULL, error = ?, finished_at = ? WHERE job_id = ? AND worker_id = ?",
+            (STATUS_QUEUED, STATUS_FAILED, str(error), time.time(), job_id, worker_id)
+        )
+
+    def requeue_worker(self, worker_id):
+        """Requeue every job claimed by a worker that died; returns the count"""
+        cursor = self.conn.execute(
+            "UPDATE render_jobs SET status = CASE WHEN attempts < max_attempts THEN ? ELSE ? END, "
+            "worker_id = NULL, error = ? WHERE worker_id = ? AND status = ?",
+            (STATUS_QUEUED, STATUS_FAILED, f"Worker {worker_id} died", worker_id, STATUS_CLAIMED)
+        )
+        return cursor.rowcount
+
+    def requeue_stale(self, timeout):
+        """Requeue claimed jobs whose heartbeat is older than timeout seconds"""
+        cursor = self.conn.execute(
+            "UPDATE render_jobs SET status = CASE WHEN attempts < max_attempts THEN ? ELSE ? END, "
+            "worker_id = NULL, error = ? WHERE status = ? AND heartbeat_at < ?",
+            (STATUS_QUEUED, STATUS_FAILED, "Heartbeat timed out", STATUS_CLAIMED,
+             time.time() - timeout)
+        )
+        return cursor.rowcount
+
+    def get_counts(self):
+        """Get the number of jobs in each status"""
+        rows = self.conn.execute(
+            "SELECT status, COUNT(*) FROM render_jobs GROUP BY status"
+        ).fetchall()
+        counts = {STATUS_QUEUED: 0, STATUS_CLAIMED: 0, STATUS_DONE: 0, STATUS_FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+
+def _limit_memory(memory_limit_mb):
+    """Cap this process's address space (POSIX only)"""
+    if resource is None or not memory_limit_mb:
+        return
+    limit = int(memory_limit_mb) * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _heartbeat_loop(db_path, job_id, worker_id, interval, done_event, cancel_token):
+    """Send heartbeats for a job until done_event is set
+
+    Runs beside the render, which blocks the worker's main loop for the
+    whole job. If the job was requeued as stale in the meantime, the
+    render is cancelled so two workers do not finish the same job.
+    """
+    queue = RenderQueue(db_path)
+    try:
+        while not done_event.wait(interval):
+            try:
+                if not queue.heartbeat(job_id, worker_id):
+                    print(f"Render worker {worker_id} lost job {job_id}; cancelling its render")
+                    cancel_token.cancel()
+                    return
+            except sqlite3.Error as e:
+                # A busy database must not end the heartbeats; retry next interval
+                print(f"Error sending heartbeat for job {job_id}: {str(e)}")
+    finally:
+        queue.close()
+
+
+def _publish_outputs(part_dir, output_dir):
+    """Move a finished render (video and caption sidecars) into place"""
+    for filename in os.listdir(part_dir):
+        os.replace(os.path.join(part_dir, filename), os.path.join(output_dir, filename))
+
+
+def worker_main(db_path, worker_id, stop_event, video_fps=30, encoder_threads=None,
+                memory_limit_mb=None, heartbeat_interval=5.0, poll_interval=0.5,
+                config_path=None, encoder_profile=None):
+    """Worker process entry point: claim and render jobs until stopped
+
+    The worker exits once stop_event is set and the queue is empty. With
+    config_path, video_fps, encoder_threads and the encoder profile are
+    re-read from the config file before a job whenever the file has changed.
+    """
+    _limit_memory(memory_limit_mb)
+
+    # Imported here so the supervisor process never loads MoviePy
+    from media_processor import MediaProcessor, select_encoder_profile
+    from cancellation import CancellationToken
+
+    config_manager = None
+    if config_path:
+        from config_manager import ConfigManager
+        config_manager = ConfigManager(config_path)
+
+    processor = MediaProcessor(video_fps=video_fps, threads=encoder_threads, encoder_profile=encoder_profile)
+    queue = RenderQueue(db_path)
+
+    try:
+        while True:
+            job = queue.claim(worker_id)
+            if job is None:
+                if stop_event.is_set():
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            # A stat() per job; the file is only parsed after it changed
+            if config_manager is not None and config_manager.reload_if_changed():
+                config = config_manager.get_config()
+                processor = MediaProcessor(
+                    video_fps=config.get("video_fps", video_fps),
+                    threads=config.get("render_farm", {}).get("encoder_threads", encoder_threads),
+                    encoder_profile=select_encoder_profile(config)
+                )
+
+            done_event = threading.Event()
+            cancel_token = CancellationToken()
+            heartbeat = threading.Thread(
+                target=_heartbeat_loop,
+                args=(db_path, job["job_id"], worker_id, heartbeat_interval, done_event, cancel_token),
+                daemon=True
+            )
+            heartbeat.start()
+
+            # Render into a private directory and publish only while still
+            # holding the job, so a requeued job never has two writers
+            output_dir = os.path.dirname(os.path.abspath(job["output_path"]))
+            part_dir = os.path.join(output_dir, f".{worker_id}.part")
+            try:
+                os.makedirs(part_dir, exist_ok=True)
+                # The cancel token also replaces MoviePy's console progress bar
+                processor.create_video_from_scenes(
+                    job["scenes"], os.path.join(part_dir, os.path.basename(job["output_path"])),
+                    cancel_token=cancel_token)
+                if queue.heartbeat(job["job_id"], worker_id):
+                    _publish_outputs(part_dir, output_dir)
+                    queue.complete(job["job_id"], worker_id)
+                else:
+                    print(f"Render worker {worker_id} lost job {job['job_id']}; discarding its output")
+            except Exception as e:
+                print(f"Error in render worker {worker_id}: {str(e)}")
+                queue.fail(job["job_id"], worker_id, e)
+            finally:
+                done_event.set()
+                heartbeat.join()
+                shutil.rmtree(part_dir, ignore_errors=True)
+    finally:
+        queue.close()
+
+
+class RenderFarm:
+    """Supervises a pool of render worker processes sharing one RenderQueue"""
+
+    def __init__(self, db_path, num_workers=None, encoder_threads=None, memory_limit_mb=None,
+                 video_fps=30, heartbeat_interval=5.0, stale_timeout=60.0, config_path=None,
+                 encoder_profile=None):
+        """Initialize the farm
+
+        Args:
+            db_path: Path to the render queue database
+            num_workers: Number of worker processes (defaults to CPU count)
+            encoder_threads: ffmpeg threads per worker
+            memory_limit_mb: Address-space limit per worker (POSIX only)
+            video_fps: Frames per second of rendered videos
+            heartbeat_interval: Seconds between worker heartbeats
+            stale_timeout: Requeue jobs whose heartbeat is older than this
+            config_path: Config file workers watch for encoder setting changes
+            encoder_profile: Calibrated x264 preset and crf for the workers;
+                encoder_threads still sets their thread count
+        """
+        self.db_path = db_path
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.encoder_threads = encoder_threads
+        self.memory_limit_mb = memory_limit_mb
+        self.video_fps = video_fps
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_timeout = stale_timeout
+        self.config_path = config_path
+        self.encoder_profile = encoder_profile
+
+        self.queue = RenderQueue(db_path)
+        self.stop_event = multiprocessing.Event()
+        self.workers = {}
+        self._generation = 0
+
+    @classmethod
+    def from_config(cls, config, db_path, config_path=None):
+        """Create a farm from the "render_farm" section of the app config"""
+        # media_processor loads MoviePy lazily, so this stays cheap
+        from media_processor import select_encoder_profile
+
+        farm_config = config.get("render_farm", {})
+        return cls(
+            db_path,
+            num_workers=farm_config.get("workers"),
+            encoder_threads=farm_config.get("encoder_threads"),
+            memory_limit_mb=farm_config.get("memory_limit_mb"),
+            video_fps=config.get("video_fps", 30),
+            heartbeat_interval=farm_config.get("heartbeat_interval", 5.0),
+            stale_timeout=farm_config.get("stale_timeout", 60.0),
+            config_path=config_path,
+            encoder_profile=select_encoder_profile(config),
+        )
+
+    def _spawn_worker(self, slot):
+        self._generation += 1
+        worker_id = f"worker-{slot}-{self._generation}"
+        process = multiprocessing.Process(
+            target=worker_main,
+            args=(self.db_path, worker_id, self.stop_event),
+            kwargs={
+                "video_fps": self.video_fps,
+                "encoder_threads": self.encoder_threads,
+                "memory_limit_mb": self.memory_limit_mb,
+                "heartbeat_interval": self.heartbeat_interval,
+                "config_path": self.config_path,
+                "encoder_profile": self.encoder_profile,
+            },
+            daemon=True
+        )
+        process.start()
+        self.workers[slot] = (worker_id, process)
+
+    def start(self):
+        """Start all worker processes"""
+        self.stop_event.clear()
+        for slot in range(self.num_workers):
+            self._spawn_worker(slot)
+
+    def supervise(self):
+        """Requeue jobs of dead or silent workers and replace dead workers
+
+        Returns:
+            Number of jobs requeued
+        """
+        requeued = self.queue.requeue_stale(self.stale_timeout)
+        for slot, (worker_id, process) in list(self.workers.items()):
+            if process.is_alive():
+                continue
+            requeued += self.queue.requeue_worker(worker_id)
+            if not self.stop_event.is_set():
+                print(f"Render worker {worker_id} exited with code {process.exitcode}, restarting")
+                self._spawn_worker(slot)
+        return requeued
+
+    def run_until_empty(self, poll_interval=0.5):
+        """Start the workers, wait for the queue to drain, then stop them
+
+        Returns:
+            Final job counts per status
+        """
+        self.start()
+        try:
+            while True:
+                self.supervise()
+                counts = self.queue.get_counts()
+                if counts[STATUS_QUEUED] == 0 and counts[STATUS_CLAIMED] == 0:
+                    break
+                time.sleep(poll_interval)
+        finally:
+            self.stop()
+        return self.queue.get_counts()
+
+    def stop(self, timeout=None):
+        """Ask workers to exit once the queue is empty and wait for them"""
+        self.stop_event.set()
+        for worker_id, process in self.workers.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+            self.queue.requeue_worker(worker_id)
+        self.workers = {}
+
+
+# Example usage
+if __name__ == "__main__":
+    import argparse
+    from config_manager import ConfigManager
+
+    config_manager = ConfigManager()
+    config_manager.ensure_directories_exist()
+    default_db = os.path.join(config_manager.get_full_path("jobs"), "render_queue.sqlite3")
+
+    parser = argparse.ArgumentParser(description="Render queued videos with a pool of worker processes")
+    parser.add_argument("--db", default=default_db, help="Render queue database")
+    parser.add_argument("--enqueue", nargs=2, metavar=("SCENES_JSON", "OUTPUT"),
+                        help="Add a job from a JSON list of scenes and exit")
+    parser.add_argument("--workers", type=int, help="Number of worker processes")
+    args = parser.parse_args()
+
+    if args.enqueue:
+        with open(args.enqueue[0], "r", encoding="utf-8") as f:
+            job_id = RenderQueue(args.db).enqueue(json.load(f), args.enqueue[1])
+        print(f"Queued render job {job_id}")
+    else:
+        farm = RenderFarm.from_config(config_manager.get_config(), args.db,
+                                      config_path=os.path.abspath(config_manager.config_file_path))
+        if args.workers:
+            farm.num_workers = args.workers
+        print(f"Render farm finished: {farm.run_until_empty()}")
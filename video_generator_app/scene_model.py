@@ -0,0 +1,68 @@
+"""
+Scene Model Module for Video Generator App
+Plain scene data shared by the GUI, the pipeline and saved jobs
+"""
+
+import re
+
+# Matches the script format produced by GeminiClient.generate_script
+SCENE_PATTERN = r"## ฉากที่ (\d+): (.+?)\n\*\*คำพูด\*\*: (.+?)\n\*\*ภาพ\*\*: (.+?)(?=\n\n|$)"
+
+
+class SceneModel:
+    """Data for a single scene, independent of any widget"""
+
+    __slots__ = ("scene_id", "title", "speech", "description", "image_prompt",
+                 "image_path", "audio_path", "audio_duration", "progress")
+
+    def __init__(self, scene_id, title="", speech="", description="", image_prompt="",
+                 image_path="", audio_path="", audio_duration=None, progress=0.0):
+        self.scene_id = scene_id
+        self.title = title
+        self.speech = speech
+        self.description = description
+        self.image_prompt = image_prompt
+        self.image_path = image_path
+        self.audio_path = audio_path
+        self.audio_duration = audio_duration
+        # Job progress for this scene (0.0 to 1.0); runtime state, not saved
+        self.progress = progress
+
+    def to_dict(self):
+        """Get scene data in the format of SceneFrame.get_scene_data"""
+        return {
+            "scene_id": self.scene_id,
+            "title": self.title,
+            "speech": self.speech,
+            "description": self.description,
+            "image_prompt": self.image_prompt,
+            "image_path": self.image_path,
+            "audio_path": self.audio_path,
+            "audio_duration": self.audio_duration,
+        }
+
+    def update(self, data):
+        """Update fields from a dictionary, ignoring unknown keys"""
+        for key, value in data.items():
+            if key in self.__slots__:
+                setattr(self, key, value)
+
+    @classmethod
+    def from_dict(cls, data, scene_id=None):
+        """Create a scene from a dictionary such as to_dict() output"""
+        scene = cls(data.get("scene_id", 0) if scene_id is None else scene_id)
+        scene.update({key: value for key, value in data.items() if key != "scene_id"})
+        return scene
+
+
+def parse_script_scenes(script_text):
+    """Split a generated script into scenes
+
+    Returns:
+        List of SceneModel, empty if the script does not match the format
+    """
+    matches = re.findall(SCENE_PATTERN, script_text, re.DOTALL)
+    return [
+        SceneModel(i, title=title.strip(), speech=speech.strip(), description=description.strip())
+        for i, (scene_num, title, speech, description) in enumerate(matches)
+    ]
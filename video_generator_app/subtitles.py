@@ -0,0 +1,130 @@
+"""
+Subtitles Module for Video Generator App
+Builds timed captions from scene narration and writes them as SRT or WebVTT
+"""
+
+import os
+
+# Longest caption line before text is split into another cue
+MAX_CUE_CHARS = 42
+
+
+def split_caption_text(text, max_chars=MAX_CUE_CHARS):
+    """Split narration into caption-sized chunks at whitespace
+
+    Thai puts spaces between phrases rather than words, so a phrase longer
+    than max_chars is kept whole rather than cut mid-word.
+    """
+    words = text.split()
+    chunks = []
+    current = ""
+    for word in words:
+        candidate = f"{current} {word}" if current else word
+        if current and len(candidate) > max_chars:
+            chunks.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_cues(scenes_data, durations, max_chars=MAX_CUE_CHARS):
+    """Time each scene's narration against the rendered timeline
+
+    A scene with "timepoints" (a list of {"time_seconds", "text"} from the
+    TTS service, relative to the scene start) uses them directly. Otherwise
+    the scene's speech is split into chunks and its duration shared out in
+    proportion to their length.
+
+    Args:
+        scenes_data: Scene dictionaries with "speech" (or "text") and
+            optionally "timepoints"
+        durations: Duration in seconds of each scene in the video
+        max_chars: Longest caption chunk
+
+    Returns:
+        List of {"start", "end", "text"} dictionaries, in seconds
+    """
+    cues = []
+    scene_start = 0.0
+    for scene, duration in zip(scenes_data, durations):
+        scene_end = scene_start + duration
+
+        timepoints = scene.get("timepoints")
+        if timepoints:
+            points = sorted(timepoints, key=lambda point: point["time_seconds"])
+            for i, point in enumerate(points):
+                start = scene_start + point["time_seconds"]
+                end = scene_start + points[i + 1]["time_seconds"] if i + 1 < len(points) else scene_end
+                if point["text"].strip() and start < scene_end:
+                    cues.append({"start": start, "end": min(end, scene_end), "text": point["text"].strip()})
+        else:
+            chunks = split_caption_text(scene.get("speech") or scene.get("text") or "", max_chars)
+            total_chars = sum(len(chunk) for chunk in chunks)
+            start = scene_start
+            for chunk in chunks:
+                end = start + duration * len(chunk) / total_chars
+                cues.append({"start": start, "end": end, "text": chunk})
+                start = end
+
+        scene_start = scene_end
+    return cues
+
+
+def _timestamp(seconds, separator):
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{milliseconds:03d}"
+
+
+def format_srt(cues):
+    """Format cues as SubRip (.srt) text"""
+    blocks = []
+    for index, cue in enumerate(cues, start=1):
+        blocks.append(f"{index}\n{_timestamp(cue['start'], ',')} --> {_timestamp(cue['end'], ',')}\n"
+                      f"{cue['text']}\n")
+    return "\n".join(blocks)
+
+
+def format_vtt(cues):
+    """Format cues as WebVTT (.vtt) text"""
+    blocks = ["WEBVTT\n"]
+    for cue in cues:
+        blocks.append(f"{_timestamp(cue['start'], '.')} --> {_timestamp(cue['end'], '.')}\n{cue['text']}\n")
+    return "\n".join(blocks)
+
+
+def write_subtitles(cues, output_path):
+    """Write cues as SRT or WebVTT, chosen by the file extension
+
+    Returns:
+        output_path
+    """
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension == ".srt":
+        text = format_srt(cues)
+    elif extension == ".vtt":
+        text = format_vtt(cues)
+    else:
+        raise ValueError(f"Unsupported subtitle format: {extension}")
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return output_path
+
+
+# Example usage
+if __name__ == "__main__":
+    scenes = [
+        {"speech": "สวัสดีครับ วันนี้เราจะมาเรียนภาษาอังกฤษด้วยตนเองกัน เริ่มจากคำศัพท์พื้นฐาน"},
+        {"speech": "Practice every day. Small steps add up.",
+         "timepoints": [{"time_seconds": 0.0, "text": "Practice every day."},
+                        {"time_seconds": 1.8, "text": "Small steps add up."}]},
+    ]
+    cues = build_cues(scenes, [5.0, 3.5])
+    print(format_srt(cues))
+    print(format_vtt(cues))
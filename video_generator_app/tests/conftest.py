@@ -0,0 +1,11 @@
+"""
+Test Configuration for Video Generator App
+Puts the app modules and the benchmark fixtures on the import path
+"""
+
+import os
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.join(APP_DIR, "benchmarks"))
@@ -0,0 +1,112 @@
+"""
+Tests for the content-addressed asset store and its garbage collection
+"""
+
+import os
+import time
+import multiprocessing
+
+import pytest
+
+from asset_store import AssetStore, hash_file
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AssetStore(str(tmp_path / "assets"), gc_grace_seconds=60)
+
+
+def write_file(path, data, age=0):
+    with open(path, "wb") as f:
+        f.write(data)
+    if age:
+        past = time.time() - age
+        os.utime(path, (past, past))
+    return str(path)
+
+
+def age_blob(store, key, seconds):
+    past = time.time() - seconds
+    os.utime(store.blob_path(key), (past, past))
+
+
+def test_put_file_deduplicates_by_content(tmp_path, store):
+    first = store.put_file(write_file(tmp_path / "a.png", b"same"))
+    second = store.put_file(write_file(tmp_path / "b.png", b"same"))
+
+    assert first == second == hash_file(str(tmp_path / "a.png")) + ".png"
+    assert store.get_usage()["blobs"] == 1
+
+
+def test_ingest_links_file_and_records_manifest(tmp_path, store):
+    path = write_file(tmp_path / "scene.wav", b"audio")
+    key = store.ingest(path, "demo", "audio:0")
+
+    assert os.path.samefile(path, store.blob_path(key))
+    assert store.get_manifest("demo") == {"audio:0": key}
+
+
+def test_gc_keeps_referenced_and_young_blobs(tmp_path, store):
+    live = store.ingest(write_file(tmp_path / "live.png", b"live"), "demo", "image:0")
+    young = store.put_file(write_file(tmp_path / "young.png", b"young"))
+    old = store.put_file(write_file(tmp_path / "old.png", b"old"))
+    for key in (live, old):
+        age_blob(store, key, 3600)
+
+    result = store.gc()
+
+    assert result["deleted_blobs"] == 1
+    assert store.has(live) and store.has(young) and not store.has(old)
+
+
+def test_gc_ages_moved_blobs_from_when_they_were_stored(tmp_path, store):
+    # A generated file moved into the store keeps its original mtime; it
+    # must not be collected before its manifest entry is written
+    path = write_file(tmp_path / "render.mp4", b"video", age=3600)
+    key = store.put_file(path, move=True)
+
+    assert store.gc()["deleted_blobs"] == 0
+    assert store.has(key)
+
+
+def test_storing_again_restarts_the_grace_period(tmp_path, store):
+    key = store.put_file(write_file(tmp_path / "a.png", b"data"))
+    age_blob(store, key, 3600)
+    store.put_file(write_file(tmp_path / "b.png", b"data"))
+
+    assert store.gc()["deleted_blobs"] == 0
+
+
+def test_gc_over_quota_deletes_oldest_unreferenced_first(tmp_path, store):
+    older = store.put_file(write_file(tmp_path / "a.png", b"a" * 100))
+    newer = store.put_file(write_file(tmp_path / "b.png", b"b" * 100))
+    age_blob(store, older, 30)
+    age_blob(store, newer, 10)
+
+    result = store.gc(quota_bytes=150)
+
+    assert result["deleted_blobs"] == 1
+    assert not store.has(older) and store.has(newer)
+
+
+@pytest.mark.parametrize("start_method", ["spawn", "fork"])
+def test_gc_in_another_process_waits_for_the_store_lock(tmp_path, store, start_method):
+    if start_method not in multiprocessing.get_all_start_methods():
+        pytest.skip(f"{start_method} is not available")
+    path = write_file(tmp_path / "render.mp4", b"video", age=3600)
+    key = store.put_file(path)
+    age_blob(store, key, 3600)
+
+    context = multiprocessing.get_context(start_method)
+    with store._lock:
+        process = context.Process(target=store.gc)
+        process.start()
+        process.join(1.0)
+        # Blocked while this process is between storing and recording the blob
+        assert process.is_alive()
+        assert store.has(key)
+        store.add_to_manifest("project", {"video": key})
+
+    process.join(30)
+    assert process.exitcode == 0
+    assert store.has(key)
@@ -0,0 +1,57 @@
+"""
+Tests for cancellation tokens and cancellable ffmpeg runs
+"""
+
+import threading
+
+import pytest
+from moviepy.config import get_setting
+
+from cancellation import CancellationToken, OperationCancelled
+from media_processor import MediaProcessor
+
+FFMPEG = get_setting("FFMPEG_BINARY")
+
+
+def test_unregistered_callback_does_not_run():
+    token = CancellationToken()
+    calls = []
+    unregister = token.on_cancel(lambda: calls.append("first"))
+    token.on_cancel(lambda: calls.append("second"))
+
+    unregister()
+    unregister()
+    token.cancel()
+
+    assert calls == ["second"]
+
+
+def test_callback_runs_at_once_on_a_cancelled_token():
+    token = CancellationToken()
+    token.cancel()
+    calls = []
+
+    token.on_cancel(lambda: calls.append("late"))()
+
+    assert calls == ["late"]
+
+
+def test_finished_ffmpeg_runs_leave_no_callbacks():
+    token = CancellationToken()
+    for _ in range(3):
+        MediaProcessor._run_ffmpeg([FFMPEG, "-hide_banner", "-version"], token)
+
+    assert token._callbacks == []
+
+
+def test_cancel_kills_a_running_ffmpeg():
+    token = CancellationToken()
+    cmd = [FFMPEG, "-hide_banner", "-re", "-f", "lavfi", "-i", "nullsrc=s=16x16:d=60", "-f", "null", "-"]
+    timer = threading.Timer(0.3, token.cancel)
+    timer.start()
+    try:
+        with pytest.raises(OperationCancelled):
+            MediaProcessor._run_ffmpeg(cmd, token)
+    finally:
+        timer.cancel()
+    assert token._callbacks == []
@@ -0,0 +1,93 @@
+"""
+Tests for transactional configuration updates
+"""
+
+import json
+
+import pytest
+
+from config_manager import ConfigManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return ConfigManager(str(tmp_path / "config.json"))
+
+
+def read_file(manager):
+    with open(manager.config_file_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_batch_applies_all_changes_with_one_write_and_one_notification(manager, monkeypatch):
+    notifications = []
+    manager.subscribe(notifications.append)
+    saves = []
+    save_config = manager.save_config
+    monkeypatch.setattr(manager, "save_config", lambda config=None: saves.append(1) or save_config(config))
+
+    with manager.batch_update() as batch:
+        batch["image_width"] = 720
+        batch["output_paths.videos"] = "out/videos"
+        batch["render_farm.workers"] = 2
+
+    assert len(saves) == 1
+    assert notifications == [{"image_width": 720, "output_paths.videos": "out/videos",
+                              "render_farm.workers": 2}]
+    assert read_file(manager)["output_paths"]["videos"] == "out/videos"
+    assert manager.get_config()["render_farm"]["workers"] == 2
+
+
+def test_invalid_value_rolls_back_the_whole_batch(manager):
+    notifications = []
+    manager.subscribe(notifications.append)
+
+    with pytest.raises(ValueError):
+        with manager.batch_update() as batch:
+            batch["image_width"] = 720
+            batch["qa_artifacts"] = "yes"
+
+    assert manager.get_config()["image_width"] == 1080
+    assert read_file(manager)["image_width"] == 1080
+    assert notifications == []
+
+
+def test_exception_in_block_applies_nothing(manager):
+    with pytest.raises(RuntimeError):
+        with manager.batch_update() as batch:
+            batch["image_width"] = 720
+            raise RuntimeError("cancelled")
+
+    assert manager.get_config()["image_width"] == 1080
+    # The manager is usable again after a failed batch
+    assert manager.update_config("image_width", 640)
+    assert read_file(manager)["image_width"] == 640
+
+
+def test_failed_write_leaves_config_unchanged(manager, monkeypatch):
+    monkeypatch.setattr(manager, "save_config", lambda config=None: False)
+
+    with pytest.raises(OSError):
+        with manager.batch_update() as batch:
+            batch["video_fps"] = 24
+
+    assert manager.get_config()["video_fps"] == 30
+    assert manager.update_config("video_fps", 24) is False
+
+
+def test_nested_batches_commit_with_the_outer_one(manager):
+    notifications = []
+    manager.subscribe(notifications.append)
+
+    with manager.batch_update() as outer:
+        outer["image_width"] = 720
+        with manager.batch_update() as inner:
+            inner["image_height"] = 1280
+        assert manager.get_config()["image_height"] == 1920
+
+    assert notifications == [{"image_width": 720, "image_height": 1280}]
+
+
+def test_unknown_section_key_is_rejected(manager):
+    assert manager.update_config("image_width.value", 1) is False
+    assert manager.get_config()["image_width"] == 1080
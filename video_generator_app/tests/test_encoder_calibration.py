@@ -0,0 +1,37 @@
+"""
+Tests for choosing encoder profiles from calibration trials
+"""
+
+from encoder_calibration import pick_profiles
+
+TIERS = {"standard": {"crfs": [20, 23, 26], "min_ssim": 0.965, "max_size_ratio": 1.25}}
+
+
+def trial(preset, crf, size, ssim, encode_fps):
+    return {"preset": preset, "crf": crf, "threads": 1, "segment_workers": 1, "bytes": size,
+            "ssim": ssim, "encode_fps": encode_fps, "bytes_per_second": size / 4}
+
+
+def test_picks_fastest_acceptable_crf_and_preset():
+    trials = [
+        trial("ultrafast", 26, 110, 0.953, 900.0),   # too low quality
+        trial("ultrafast", 20, 290, 0.976, 800.0),   # too large
+        trial("medium", 26, 50, 0.963, 300.0),       # too low quality
+        trial("medium", 23, 75, 0.973, 250.0),
+        trial("faster", 23, 90, 0.970, 500.0),       # within 1.25x of 75
+    ]
+    profile = pick_profiles(trials, TIERS)["standard"]
+
+    assert (profile["preset"], profile["crf"]) == ("faster", 23)
+    assert profile["encode_fps"] == 500.0
+    assert "fps" not in profile
+
+
+def test_falls_back_to_lowest_crf_when_nothing_reaches_min_ssim():
+    trials = [trial("medium", 20, 100, 0.95, 100.0), trial("medium", 26, 50, 0.90, 200.0)]
+
+    assert pick_profiles(trials, TIERS)["standard"]["crf"] == 20
+
+
+def test_ignores_trials_outside_the_tier_crfs():
+    assert pick_profiles([trial("medium", 18, 100, 0.99, 100.0)], TIERS) == {}
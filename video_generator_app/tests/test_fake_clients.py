@@ -0,0 +1,28 @@
+"""
+Tests for the benchmark stand-in clients
+"""
+
+from fake_clients import FakeGeminiClient, FakeImagenClient, FakeTTSClient, FakeServiceError
+
+
+def failure_indices(client, calls=200):
+    failed = []
+    for i in range(calls):
+        try:
+            client.simulate_call("call")
+        except FakeServiceError:
+            failed.append(i)
+    return failed
+
+
+def test_clients_with_one_seed_fail_independently():
+    clients = [cls(failure_rate=0.2, seed=7) for cls in (FakeGeminiClient, FakeImagenClient, FakeTTSClient)]
+    patterns = [failure_indices(client) for client in clients]
+
+    assert all(patterns)
+    assert len({tuple(pattern) for pattern in patterns}) == 3
+
+
+def test_same_seed_is_reproducible():
+    assert failure_indices(FakeImagenClient(failure_rate=0.2, seed=7)) == \
+        failure_indices(FakeImagenClient(failure_rate=0.2, seed=7))
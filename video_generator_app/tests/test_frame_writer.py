@@ -0,0 +1,99 @@
+"""
+Tests for the reusable frame buffers and the raw ffmpeg frame pipe
+"""
+
+import os
+import subprocess
+
+import numpy as np
+import pytest
+from moviepy.config import get_setting
+
+from frame_writer import FrameBufferPool, RawFrameWriter
+
+FFMPEG = get_setting("FFMPEG_BINARY")
+
+
+def filler(value, calls):
+    def fill(buffer):
+        calls.append(value)
+        buffer[:] = value
+    return fill
+
+
+def test_same_key_reuses_the_buffer_without_refilling():
+    pool = FrameBufferPool(4, 2, size=2)
+    calls = []
+
+    buffer, view = pool.get("scene:0", filler(7, calls))
+    again, again_view = pool.get("scene:0", filler(9, calls))
+
+    assert again is buffer and again_view is view
+    assert calls == [7]
+    assert (again == 7).all()
+    assert view.nbytes == 4 * 2 * 3 and view.format == "B"
+    assert (pool.fills, pool.hits) == (1, 1)
+
+
+def test_least_recently_used_buffer_is_evicted():
+    pool = FrameBufferPool(2, 2, size=2)
+    calls = []
+    first, _ = pool.get("a", filler(1, calls))
+    pool.get("b", filler(2, calls))
+    pool.get("a", filler(1, calls))
+
+    # "b" is least recently used, so "c" takes its buffer
+    third, _ = pool.get("c", filler(3, calls))
+    assert third is not first
+    assert calls == [1, 2, 3]
+    assert len(pool.buffers) == 2
+
+    pool.get("a", filler(1, calls))
+    pool.get("b", filler(2, calls))
+    assert calls == [1, 2, 3, 2]
+    assert (pool.fills, pool.hits) == (4, 2)
+
+
+def test_invalidate_forces_a_refill():
+    pool = FrameBufferPool(2, 2, size=1)
+    calls = []
+    pool.get("a", filler(1, calls))
+    pool.invalidate("a")
+    pool.get("a", filler(1, calls))
+
+    assert calls == [1, 1]
+
+
+def test_frames_are_encoded(tmp_path):
+    output_path = str(tmp_path / "out.mp4")
+    frames = np.zeros((3, 16, 16, 3), dtype=np.uint8)
+
+    with RawFrameWriter(FFMPEG, output_path, 16, 16, 10) as writer:
+        writer.write(frames)
+        writer.write(memoryview(frames[0]).cast("B"), repeat=2)
+
+    assert writer.frames_written == 5
+    assert os.path.getsize(output_path) > 0
+
+
+def test_encoder_failure_raises_with_ffmpeg_stderr(tmp_path):
+    writer = RawFrameWriter(FFMPEG, str(tmp_path / "out.mp4"), 16, 16, 10, codec="no_such_codec")
+
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        for _ in range(200):
+            writer.write(np.zeros((16, 16, 3), dtype=np.uint8))
+        writer.close()
+
+    assert error.value.returncode != 0
+    assert b"no_such_codec" in error.value.stderr
+
+
+def test_abort_removes_partial_output(tmp_path):
+    output_path = str(tmp_path / "out.mp4")
+
+    with pytest.raises(RuntimeError):
+        with RawFrameWriter(FFMPEG, output_path, 16, 16, 10) as writer:
+            writer.write(np.zeros((16, 16, 3), dtype=np.uint8))
+            raise RuntimeError("cancelled")
+
+    assert not os.path.exists(output_path)
@@ -0,0 +1,135 @@
+"""
+Tests for registering, refreshing and expiring Gemini instruction contexts
+"""
+
+import pytest
+
+from fake_clients import FakeModelFactory, FakeServiceError, FakeCacheMissing
+from gcp_clients.gemini_context import InstructionCache, estimate_tokens
+
+INSTRUCTION = "Write a short video script. " * 20
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def factory():
+    return FakeModelFactory()
+
+
+def make_cache(factory, clock, min_cache_tokens=0):
+    return InstructionCache(factory, ttl=100, min_cache_tokens=min_cache_tokens, refresh_margin=10,
+                            clock=clock)
+
+
+def test_block_is_registered_once_and_requests_send_only_the_call_text(factory, clock):
+    cache = make_cache(factory, clock)
+    for _ in range(3):
+        cache.generate("script", INSTRUCTION, "topic")
+
+    stats = factory.get_stats()
+    assert factory.caches_created == 1
+    assert cache.stats == {"registered": 1, "cached": 1, "refreshed": 0, "expired": 0}
+    assert stats["sent_tokens"] == 3 * estimate_tokens("topic")
+    assert stats["cached_tokens"] == 3 * estimate_tokens(INSTRUCTION)
+
+
+def test_small_block_uses_system_instruction(factory, clock):
+    cache = make_cache(factory, clock, min_cache_tokens=10 ** 6)
+    model = cache.model("script", INSTRUCTION)
+
+    assert factory.caches_created == 0
+    assert model.system_instruction == INSTRUCTION
+    assert cache.model("script", INSTRUCTION) is model
+
+
+def test_context_is_refreshed_only_near_expiry(factory, clock):
+    cache = make_cache(factory, clock)
+    model = cache.model("script", INSTRUCTION)
+
+    clock.now += 85
+    assert cache.model("script", INSTRUCTION) is model
+    assert cache.stats["refreshed"] == 0
+
+    clock.now += 10
+    assert cache.model("script", INSTRUCTION) is model
+    assert cache.stats["refreshed"] == 1
+
+    # The refresh moved expiry a full TTL ahead
+    clock.now += 85
+    cache.model("script", INSTRUCTION)
+    assert cache.stats["refreshed"] == 1
+    assert factory.caches_created == 1
+
+
+def test_expired_cache_is_registered_again_and_request_retried(factory, clock):
+    cache = make_cache(factory, clock)
+    cache.generate("script", INSTRUCTION, "topic")
+    factory.delete_cache(cache.model("script", INSTRUCTION).cached_content)
+
+    response = cache.generate("script", INSTRUCTION, "topic")
+
+    assert response.text == "ok"
+    assert factory.caches_created == 2
+    assert cache.stats["expired"] == 1
+
+
+def test_not_found_without_a_cached_context_is_not_retried(factory, clock, monkeypatch):
+    cache = make_cache(factory, clock, min_cache_tokens=10 ** 6)
+    model = cache.model("script", INSTRUCTION)
+    calls = []
+
+    def generate_content(text):
+        # e.g. a wrong model name: the same not-found error an expired cache gives
+        calls.append(text)
+        raise FakeCacheMissing("Model not found")
+    monkeypatch.setattr(model, "generate_content", generate_content)
+
+    with pytest.raises(FakeCacheMissing):
+        cache.generate("script", INSTRUCTION, "topic")
+
+    assert calls == ["topic"]
+    assert cache.stats == {"registered": 1, "cached": 0, "refreshed": 0, "expired": 0}
+    assert cache.model("script", INSTRUCTION) is model
+
+
+def test_failed_refresh_registers_the_block_again(factory, clock, monkeypatch):
+    cache = make_cache(factory, clock)
+    cache.model("script", INSTRUCTION)
+
+    def refresh_cache(handle, ttl):
+        raise FakeServiceError("not found")
+    monkeypatch.setattr(factory, "refresh_cache", refresh_cache)
+    clock.now += 95
+    cache.model("script", INSTRUCTION)
+
+    assert factory.caches_created == 2
+    assert cache.stats["registered"] == 2
+
+
+def test_changed_instruction_replaces_the_context(factory, clock):
+    cache = make_cache(factory, clock)
+    old_handle = cache.model("script", INSTRUCTION).cached_content
+    new_model = cache.model("script", INSTRUCTION + "Use Thai.")
+
+    assert new_model.cached_content is not old_handle
+    assert cache.stats["registered"] == 2
+
+
+def test_close_deletes_cached_contents(factory, clock):
+    cache = make_cache(factory, clock)
+    handle = cache.model("script", INSTRUCTION).cached_content
+    cache.close()
+
+    assert handle.deleted
@@ -0,0 +1,109 @@
+"""
+Tests for the SQLite checkpoint store and resuming pipeline jobs from it
+"""
+
+import pytest
+
+from job_store import JobStore, JOB_LEVEL_SCENE, hash_inputs, artifact_exists
+from pipeline_scheduler import PipelineScheduler, PipelineError
+
+
+@pytest.fixture
+def store(tmp_path):
+    job_store = JobStore(str(tmp_path / "jobs.db"))
+    yield job_store
+    job_store.close()
+
+
+def test_completed_stage_is_found_only_with_the_same_inputs(store):
+    inputs_hash = hash_inputs("image", "a red boat")
+    store.start_job("job")
+    store.mark_done("job", 0, "image", inputs_hash, {"path": "/tmp/0.png", "size": 3})
+
+    assert store.get_completed("job", 0, "image", inputs_hash) == {"path": "/tmp/0.png", "size": 3}
+    assert store.get_completed("job", 0, "image", hash_inputs("image", "a blue boat")) is None
+    assert store.get_completed("job", 1, "image", inputs_hash) is None
+    assert store.get_completed("other", 0, "image", inputs_hash) is None
+
+
+def test_running_and_failed_stages_are_not_completed(store):
+    inputs_hash = hash_inputs("audio", "hello")
+    store.mark_running("job", 0, "audio", inputs_hash)
+    assert store.get_completed("job", 0, "audio", inputs_hash) is None
+
+    store.mark_failed("job", 0, "audio", inputs_hash, RuntimeError("quota"))
+    assert store.get_completed("job", 0, "audio", inputs_hash) is None
+    stage, = store.get_job_stages("job")
+    assert (stage["status"], stage["error"]) == ("failed", "quota")
+
+
+def test_records_survive_closing_the_store(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    inputs_hash = hash_inputs("video")
+    store = JobStore(db_path, batch_size=100, flush_interval=3600)
+    store.start_job("job", "/tmp/out.mp4")
+    store.mark_done("job", JOB_LEVEL_SCENE, "video", inputs_hash, "/tmp/out.mp4")
+    store.finish_job("job")
+    store.close()
+
+    reopened = JobStore(db_path)
+    try:
+        assert reopened.get_job("job")["status"] == "done"
+        assert reopened.get_job("job")["output_path"] == "/tmp/out.mp4"
+        assert reopened.get_completed("job", JOB_LEVEL_SCENE, "video", inputs_hash) == "/tmp/out.mp4"
+    finally:
+        reopened.close()
+
+
+def test_artifact_exists_checks_recorded_paths(tmp_path):
+    path = tmp_path / "a.png"
+    path.write_bytes(b"png")
+
+    assert artifact_exists(str(path))
+    assert artifact_exists({"path": str(path)})
+    assert not artifact_exists(str(tmp_path / "missing.png"))
+    assert not artifact_exists({"path": str(tmp_path / "missing.png")})
+    assert artifact_exists({"prompt": "text"})
+
+
+def build_scheduler(store, path, calls, fail_write=False):
+    def make(text):
+        calls.append(("make", text))
+        return text.upper()
+
+    def write(path, text):
+        calls.append(("write", path))
+        if fail_write:
+            raise RuntimeError("disk full")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    scheduler = PipelineScheduler(io_workers=2, cpu_workers=1, job_store=store, job_id="job")
+    scheduler.add_task("make", make, args=("hello",), output_is_file=False,
+                       checkpoint=(0, "make", lambda: "hello"))
+    scheduler.add_task("write", write, args=(path,), deps=("make",),
+                       checkpoint=(0, "write", lambda text: text))
+    return scheduler
+
+
+def test_scheduler_resumes_finished_stages(tmp_path, store):
+    path = str(tmp_path / "out.txt")
+    calls = []
+    scheduler = build_scheduler(store, path, calls, fail_write=True)
+    with pytest.raises(PipelineError):
+        scheduler.run()
+    assert calls == [("make", "hello"), ("write", path)]
+
+    calls.clear()
+    scheduler = build_scheduler(store, path, calls)
+    results = scheduler.run()
+
+    # The finished stage is reused; only the failed one runs again
+    assert calls == [("write", path)]
+    assert results == {"make": "HELLO", "write": path}
+
+    calls.clear()
+    scheduler = build_scheduler(store, path, calls)
+    scheduler.run()
+    assert calls == []
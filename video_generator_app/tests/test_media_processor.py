@@ -0,0 +1,24 @@
+"""
+Tests for MediaProcessor scene handling
+"""
+
+import pytest
+
+from fixtures import create_scene_fixtures
+from media_processor import MediaProcessor
+from scene_model import SceneModel
+
+
+def test_scene_duration_reads_unknown_duration_from_audio(tmp_path):
+    data = create_scene_fixtures(str(tmp_path), 1, 64, 64, 0.5)[0]
+    scene = SceneModel(0)
+    scene.update({"image_path": data["image_path"], "audio_path": data["audio_path"]})
+
+    scene_data = scene.to_dict()
+    assert scene_data["audio_duration"] is None
+    assert MediaProcessor.scene_duration(scene_data) == pytest.approx(0.5, abs=0.01)
+
+
+def test_scene_duration_prefers_known_duration(tmp_path):
+    data = create_scene_fixtures(str(tmp_path), 1, 64, 64, 0.5)[0]
+    assert MediaProcessor.scene_duration(dict(data, audio_duration=2.0)) == 2.0
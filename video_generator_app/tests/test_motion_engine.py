@@ -0,0 +1,105 @@
+"""
+Tests for the motion renderer's frame timeline, crossfades and still frames
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from motion_engine import MotionRenderer, sample_indices
+
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+
+
+def solid_image(tmp_path, color):
+    path = str(tmp_path / f"{color}.png")
+    Image.new("RGB", (32, 32), color).save(path)
+    return path
+
+
+def render_all(renderer, scenes, durations):
+    return np.concatenate([frames.copy() for frames, _, _ in renderer.render(scenes, durations)])
+
+
+def test_frames_add_up_and_only_overlap_frames_are_blended(tmp_path):
+    renderer = MotionRenderer(8, 8, 10, transition_seconds=0.4, batch_size=3)
+    colors = [RED, GREEN, BLUE]
+    scenes = [{"image_path": solid_image(tmp_path, color), "motion": "none"} for color in colors]
+    durations = [1.0, 1.5, 0.8]
+
+    plans, total_frames = renderer.plan(scenes, durations)
+    frames = render_all(renderer, scenes, durations)
+
+    assert total_frames == len(frames) == 10 + 15 + 8
+    # Cuts at frames 10 and 25, each crossfade two frames either side
+    assert [(plan["first"], plan["end"]) for plan in plans] == [(0, 12), (8, 27), (23, 33)]
+    overlaps = set(range(8, 12)) | set(range(23, 27))
+    for index, frame in enumerate(frames):
+        pure = [color for color in colors if (frame == color).all()]
+        if index in overlaps:
+            assert not pure, f"frame {index} should be blended"
+        else:
+            assert len(pure) == 1, f"frame {index} should be a single image"
+    assert (frames[:8] == RED).all() and (frames[12:23] == GREEN).all() and (frames[27:] == BLUE).all()
+
+    # The crossfade moves steadily from the outgoing to the incoming scene
+    red_levels = [int(frame[0, 0, 0]) for frame in frames[8:12]]
+    assert red_levels == sorted(red_levels, reverse=True)
+
+
+def test_hard_cuts_have_no_blended_frames(tmp_path):
+    renderer = MotionRenderer(8, 8, 10, transition_seconds=0)
+    scenes = [{"image_path": solid_image(tmp_path, color), "motion": "none"} for color in (RED, GREEN)]
+    frames = render_all(renderer, scenes, [0.5, 0.5])
+
+    assert (frames[:5] == RED).all() and (frames[5:] == GREEN).all()
+
+
+@pytest.mark.parametrize("durations", [[1.0, 0.1, 1.0], [1.0, 0.0, 1.0], [0.0, 1.0], [1.0, 0.04]])
+def test_very_short_scenes_do_not_break_the_plan(tmp_path, durations):
+    renderer = MotionRenderer(8, 8, 10, transition_seconds=0.4, batch_size=4)
+    colors = [RED, GREEN, BLUE][:len(durations)]
+    scenes = [{"image_path": solid_image(tmp_path, color), "motion": "none"} for color in colors]
+
+    plans, total_frames = renderer.plan(scenes, durations)
+    frames = render_all(renderer, scenes, durations)
+
+    assert len(frames) == total_frames == sum(int(round(d * 10)) for d in durations)
+    for plan in plans:
+        assert plan["first"] <= plan["end"]
+    assert (frames[0] == (GREEN if durations[0] == 0 else RED)).all()
+
+
+def test_static_scene_reuses_its_first_frame(tmp_path):
+    renderer = MotionRenderer(8, 8, 10)
+    plans, _ = renderer.plan([{"image_path": solid_image(tmp_path, RED), "motion": "none"}], [1.0])
+    scene = renderer._load(plans[0])
+    out = np.empty((8, 8, 3), dtype=np.uint8)
+
+    renderer._draw(scene, 0, out)
+    assert scene["still"] is not None
+    scene["base"] = np.zeros_like(scene["base"])
+    renderer._draw(scene, 5, out)
+    assert (out == RED).all()
+
+
+def test_moving_scene_is_sampled_every_frame(tmp_path):
+    renderer = MotionRenderer(8, 8, 10)
+    plans, _ = renderer.plan([{"image_path": solid_image(tmp_path, RED), "motion": "zoom_in"}], [1.0])
+    scene = renderer._load(plans[0])
+    out = np.empty((8, 8, 3), dtype=np.uint8)
+
+    renderer._draw(scene, 0, out)
+    assert scene["still"] is None
+
+
+def test_sample_indices_zoom_into_the_centre():
+    rows, cols = sample_indices(20, 20, 10, 10, 5, 1.0, 2.0, (0.5, 0.5), (0.5, 0.5), 2.0)
+
+    assert rows.shape == (5, 10) and cols.shape == (5, 10)
+    # The first frame spans the whole base image, the last its middle half
+    assert (cols[0, 0], cols[0, -1]) == (1, 19)
+    assert (cols[-1, 0], cols[-1, -1]) == (5, 14)
+    assert rows.min() >= 0 and rows.max() <= 19
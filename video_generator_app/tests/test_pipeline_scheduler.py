@@ -0,0 +1,51 @@
+"""
+Tests for the scene pipeline built on the stage scheduler
+"""
+
+import os
+import subprocess
+
+import pytest
+
+from fake_clients import FakeGeminiClient, FakeImagenClient, FakeTTSClient
+from pipeline_scheduler import run_video_pipeline
+from moviepy.config import get_setting
+
+SCENES = [
+    {"title": "One", "speech": "สวัสดีครับ นี่คือฉากแรก", "description": "scene one"},
+    {"title": "Two", "speech": "และนี่คือฉากที่สอง", "description": "scene two"},
+]
+
+
+def run_pipeline(tmp_path, **config):
+    config = dict({"image_width": 64, "image_height": 64, "video_fps": 5, "qa_artifacts": False}, **config)
+    output_path = str(tmp_path / "video.mp4")
+    run_video_pipeline(SCENES, output_path, FakeGeminiClient(), FakeImagenClient(),
+                       FakeTTSClient(max_duration=0.6), config, str(tmp_path / "work"), cpu_workers=1)
+    return output_path
+
+
+def stream_types(video_path):
+    result = subprocess.run([get_setting("FFMPEG_BINARY"), "-hide_banner", "-i", video_path],
+                            capture_output=True, text=True)
+    return {kind for kind in ("Video", "Audio", "Subtitle") if f"{kind}:" in result.stderr}
+
+
+def test_soft_captions_are_muxed_and_written_beside_the_video(tmp_path):
+    output_path = run_pipeline(tmp_path)
+
+    assert stream_types(output_path) == {"Video", "Audio", "Subtitle"}
+    with open(str(tmp_path / "video.srt"), encoding="utf-8") as f:
+        assert "ฉากแรก" in f.read()
+
+
+def test_captions_none_skips_subtitles(tmp_path):
+    output_path = run_pipeline(tmp_path, captions="none")
+
+    assert stream_types(output_path) == {"Video", "Audio"}
+    assert not os.path.exists(str(tmp_path / "video.srt"))
+
+
+def test_burned_captions_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        run_pipeline(tmp_path, captions="burn")
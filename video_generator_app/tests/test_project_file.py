@@ -0,0 +1,85 @@
+"""
+Tests for the project file format and headless project rendering
+"""
+
+import os
+
+import pytest
+
+from asset_store import hash_file
+from config_manager import ConfigManager
+from fixtures import create_scene_fixtures, create_scene_image
+from project_file import Project, ProjectError, render_project
+from scene_model import SceneModel
+
+
+@pytest.fixture
+def config_manager(tmp_path):
+    manager = ConfigManager(str(tmp_path / "config.json"))
+    with manager.batch_update() as batch:
+        batch["output_paths.assets"] = str(tmp_path / "assets")
+        batch["video_fps"] = 5
+        batch["qa_artifacts"] = False
+    return manager
+
+
+def make_project(tmp_path, config_manager, audio_duration=True):
+    scenes = []
+    for i, data in enumerate(create_scene_fixtures(str(tmp_path / "media"), 2, 64, 64, 0.4)):
+        scene = SceneModel(i)
+        scene.update({"title": f"Scene {i + 1}", "image_path": data["image_path"],
+                      "audio_path": data["audio_path"],
+                      "audio_duration": data["audio_duration"] if audio_duration else None})
+        scenes.append(scene)
+    project = Project.from_config("demo", config_manager.get_asset_store(), config_manager.get_config(),
+                                  scenes=scenes)
+    return project.save(str(tmp_path / "demo.vgproj"))
+
+
+def test_save_and_open_round_trip(tmp_path, config_manager):
+    path = make_project(tmp_path, config_manager)
+    project = Project.open(path, config_manager.get_asset_store())
+
+    assert [scene.title for scene in project.scenes] == ["Scene 1", "Scene 2"]
+    assert project.missing_assets() == []
+    assert set(config_manager.get_asset_store().get_manifest("demo")) == {"image:0", "audio:0",
+                                                                            "image:1", "audio:1"}
+
+
+def test_render_twice_keeps_stored_video_intact(tmp_path, config_manager):
+    path = make_project(tmp_path, config_manager)
+    output_path = str(tmp_path / "videos" / "demo.mp4")
+    store = config_manager.get_asset_store()
+
+    render_project(path, config_manager, output_path)
+
+    # Change a scene so the second render differs from the stored video
+    project = Project.open(path, store)
+    first_key = project.video_key
+    project.scenes[0].image_path = create_scene_image(str(tmp_path / "changed.png"), 64, 64, 7)
+    project.save()
+    render_project(path, config_manager, output_path)
+
+    assert Project.open(path, store).video_key != first_key
+
+    assert hash_file(store.blob_path(first_key)) == os.path.splitext(first_key)[0]
+
+
+def test_render_scenes_without_known_durations(tmp_path, config_manager):
+    path = make_project(tmp_path, config_manager, audio_duration=False)
+    output_path = render_project(path, config_manager, str(tmp_path / "videos" / "demo.mp4"))
+
+    assert os.path.getsize(output_path) > 0
+
+
+def test_render_rejects_scenes_without_media(tmp_path, config_manager):
+    store = config_manager.get_asset_store()
+    path = make_project(tmp_path, config_manager)
+    project = Project.open(path, store)
+    project.scenes.append(SceneModel(2))
+    project.scenes[2].update({"title": "Scene 3", "speech": "not generated yet"})
+    project.save()
+
+    assert Project.open(path, store).missing_assets() == [(2, "image"), (2, "audio")]
+    with pytest.raises(ProjectError):
+        render_project(path, config_manager, str(tmp_path / "videos" / "demo.mp4"))
@@ -0,0 +1,91 @@
+"""
+Tests for poster thumbnails, contact sheets and keyframe extraction
+"""
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+from moviepy.config import get_setting
+
+from frame_writer import RawFrameWriter
+from qa_artifacts import (poster_size, load_fitted, create_contact_sheet, extract_keyframes,
+                          format_timestamp, scene_start_times, CONTACT_LABEL_HEIGHT)
+
+FFMPEG = get_setting("FFMPEG_BINARY")
+
+
+@pytest.fixture
+def wide_image(tmp_path):
+    path = str(tmp_path / "wide.png")
+    image = Image.new("RGB", (300, 100), "white")
+    image.paste((255, 0, 0), (0, 0, 150, 100))
+    image.save(path)
+    return path
+
+
+@pytest.mark.parametrize("size, expected", [
+    ((1080, 1920), (720, 1280)),
+    ((1921, 1081), (1280, 720)),
+    ((641, 361), (640, 360)),
+    ((320, 180), (320, 180)),
+])
+def test_poster_size_is_even_and_never_upscaled(size, expected):
+    width, height = poster_size(*size)
+
+    assert (width, height) == expected
+    assert width % 2 == 0 and height % 2 == 0
+    assert width <= size[0] and height <= size[1]
+
+
+@pytest.mark.parametrize("fit", ["crop", "pad"])
+@pytest.mark.parametrize("size", [(60, 60), (90, 30), (400, 100)])
+def test_load_fitted_returns_exactly_the_requested_size(wide_image, fit, size):
+    image = load_fitted(wide_image, size, fit)
+
+    assert image.size == size
+    assert image.mode == "RGB"
+
+
+def test_pad_letterboxes_and_crop_fills(wide_image):
+    padded = load_fitted(wide_image, (60, 60), "pad")
+    cropped = load_fitted(wide_image, (60, 60), "crop")
+
+    assert padded.getpixel((30, 0)) == (0, 0, 0)
+    assert cropped.getpixel((30, 0)) != (0, 0, 0)
+
+
+def test_load_fitted_rejects_unknown_fit(wide_image):
+    with pytest.raises(ValueError):
+        load_fitted(wide_image, (60, 60), "stretch")
+
+
+@pytest.mark.parametrize("count, columns, grid", [(5, 4, (4, 2)), (2, 4, (2, 1)), (8, 4, (4, 2))])
+def test_contact_sheet_grid_dimensions(tmp_path, wide_image, count, columns, grid):
+    tiles = [(wide_image, format_timestamp(i * 2.5)) for i in range(count)]
+    output_path = create_contact_sheet(tiles, str(tmp_path / "sheet.png"), (48, 27), columns)
+
+    with Image.open(output_path) as sheet:
+        assert sheet.size == (grid[0] * 48, grid[1] * (27 + CONTACT_LABEL_HEIGHT))
+
+
+def test_labels_and_start_times():
+    assert scene_start_times([1.5, 2.0, 0.5]) == [0.0, 1.5, 3.5]
+    assert format_timestamp(65.25) == "1:05.2"
+
+
+def test_extract_keyframes_decodes_one_frame_per_gop(tmp_path):
+    video_path = str(tmp_path / "video.mp4")
+    encoder_args = ["-g", "5", "-sc_threshold", "0"]
+    with RawFrameWriter(FFMPEG, video_path, 32, 32, 10, encoder_args=encoder_args) as writer:
+        for i in range(20):
+            writer.write(np.full((32, 32, 3), i * 10, dtype=np.uint8))
+
+    keyframes = extract_keyframes(FFMPEG, video_path, str(tmp_path / "keys"), width=16)
+
+    assert [round(t, 1) for _, t in keyframes] == [0.0, 0.5, 1.0, 1.5]
+    for path, _ in keyframes:
+        with Image.open(path) as image:
+            assert image.size == (16, 16)
+    assert len(os.listdir(str(tmp_path / "keys"))) == 4
@@ -0,0 +1,92 @@
+"""
+Tests for the render queue's claims, leases and stale-job handling
+"""
+
+import threading
+
+import pytest
+
+from cancellation import CancellationToken
+from render_farm import RenderQueue, STATUS_CLAIMED, STATUS_DONE, STATUS_FAILED, STATUS_QUEUED, _heartbeat_loop
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = RenderQueue(str(tmp_path / "queue.sqlite3"))
+    yield queue
+    queue.close()
+
+
+def test_claims_oldest_job_once(queue):
+    first = queue.enqueue([{"title": "a"}], "a.mp4")
+    second = queue.enqueue([{"title": "b"}], "b.mp4")
+
+    assert queue.claim("w1")["job_id"] == first
+    assert queue.claim("w2")["job_id"] == second
+    assert queue.claim("w3") is None
+    assert queue.get_counts()[STATUS_CLAIMED] == 2
+
+
+def test_claim_is_exclusive_across_connections(tmp_path):
+    db_path = str(tmp_path / "queue.sqlite3")
+    producer = RenderQueue(db_path)
+    for i in range(20):
+        producer.enqueue([], f"{i}.mp4")
+    producer.close()
+
+    claimed = []
+    lock = threading.Lock()
+
+    def worker(worker_id):
+        queue = RenderQueue(db_path)
+        while True:
+            job = queue.claim(worker_id)
+            if job is None:
+                break
+            with lock:
+                claimed.append(job["job_id"])
+        queue.close()
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == list(range(1, 21))
+
+
+def test_stale_job_is_requeued_and_old_worker_loses_it(queue):
+    job_id = queue.enqueue([], "a.mp4")
+    queue.claim("w1")
+
+    assert queue.requeue_stale(timeout=-1) == 1
+    assert queue.get_counts()[STATUS_QUEUED] == 1
+    assert queue.heartbeat(job_id, "w1") is False
+
+    queue.claim("w2")
+    assert queue.complete(job_id, "w1") is False
+    assert queue.complete(job_id, "w2") is True
+    assert queue.get_counts()[STATUS_DONE] == 1
+
+
+def test_failed_job_is_retried_until_out_of_attempts(queue):
+    job_id = queue.enqueue([], "a.mp4", max_attempts=2)
+    for _ in range(2):
+        queue.claim("w1")
+        queue.fail(job_id, "w1", RuntimeError("boom"))
+
+    assert queue.get_counts()[STATUS_FAILED] == 1
+    assert queue.claim("w1") is None
+
+
+def test_heartbeat_loop_cancels_render_after_losing_the_job(tmp_path, queue):
+    job_id = queue.enqueue([], "a.mp4")
+    queue.claim("w1")
+    queue.requeue_stale(timeout=-1)
+
+    token = CancellationToken()
+    done_event = threading.Event()
+    _heartbeat_loop(queue.db_path, job_id, "w1", 0.01, done_event, token)
+
+    assert token.cancelled
@@ -0,0 +1,54 @@
+"""
+Tests for caption timing and subtitle file output
+"""
+
+import pytest
+
+from subtitles import build_cues, split_caption_text, write_subtitles
+
+
+def test_long_text_is_split_at_whitespace():
+    assert split_caption_text("one two three four", max_chars=9) == ["one two", "three", "four"]
+    # A phrase longer than the limit stays whole
+    assert split_caption_text("สวัสดีครับทุกคน", max_chars=4) == ["สวัสดีครับทุกคน"]
+
+
+def test_speech_is_timed_in_proportion_to_chunk_length():
+    cues = build_cues([{"speech": "aaaa bb"}, {"speech": "cccccc"}], [3.0, 2.0], max_chars=4)
+
+    assert [cue["text"] for cue in cues] == ["aaaa", "bb", "cccccc"]
+    assert [(cue["start"], cue["end"]) for cue in cues] == pytest.approx([(0.0, 2.0), (2.0, 3.0), (3.0, 5.0)])
+
+
+def test_timepoints_are_offset_by_scene_start_and_clipped_to_the_scene():
+    scenes = [
+        {"speech": "intro"},
+        {"speech": "ignored", "timepoints": [
+            {"time_seconds": 1.5, "text": "second"},
+            {"time_seconds": 0.0, "text": "first"},
+            {"time_seconds": 2.5, "text": "too late"},
+        ]},
+    ]
+    cues = build_cues(scenes, [4.0, 2.0])
+
+    assert cues[1:] == [
+        {"start": 4.0, "end": 5.5, "text": "first"},
+        {"start": 5.5, "end": 6.0, "text": "second"},
+    ]
+
+
+def test_scene_without_speech_leaves_a_gap():
+    cues = build_cues([{"speech": ""}, {"speech": "hello"}], [2.0, 1.0])
+
+    assert cues == [{"start": 2.0, "end": 3.0, "text": "hello"}]
+
+
+def test_srt_and_vtt_output(tmp_path):
+    cues = [{"start": 0.0, "end": 61.25, "text": "สวัสดี"}]
+
+    with open(write_subtitles(cues, str(tmp_path / "a.srt")), encoding="utf-8") as f:
+        assert f.read() == "1\n00:00:00,000 --> 00:01:01,250\nสวัสดี\n"
+    with open(write_subtitles(cues, str(tmp_path / "a.vtt")), encoding="utf-8") as f:
+        assert f.read() == "WEBVTT\n\n00:00:00.000 --> 00:01:01.250\nสวัสดี\n"
+    with pytest.raises(ValueError):
+        write_subtitles(cues, str(tmp_path / "a.txt"))
@@ -0,0 +1,125 @@
+"""
+Tests for tracing spans, cross-process span merging and metric export
+"""
+
+import os
+import json
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from tracing import Tracer, NOOP_SPAN, tracer as process_tracer
+from pipeline_scheduler import _timed_call
+
+
+@pytest.fixture
+def tracer():
+    return Tracer(enabled=True)
+
+
+def test_disabled_tracer_returns_the_shared_noop_span():
+    tracer = Tracer(enabled=False)
+    with tracer.span("media.encode", frames=3) as span:
+        span.add("bytes_written", 10)
+        span.set("codec", "libx264")
+
+    assert span is NOOP_SPAN
+    assert tracer.span("other") is NOOP_SPAN
+    assert not tracer.spans and not tracer.metrics
+
+
+def test_nested_spans_record_timing_attributes_and_errors(tracer):
+    with tracer.span("render.video", scenes=2) as outer:
+        with tracer.span("render.scene") as inner:
+            time.sleep(0.01)
+            inner.add("bytes_written", 100)
+            inner.add("bytes_written", 50)
+        with pytest.raises(ValueError):
+            with tracer.span("render.scene"):
+                raise ValueError("bad frame")
+        outer.set("codec", "libx264")
+
+    scene, failed, video = tracer.spans
+    # Inner spans finish first and lie within the outer one
+    assert [span["name"] for span in tracer.spans] == ["render.scene", "render.scene", "render.video"]
+    assert video["start_ns"] <= scene["start_ns"] < scene["end_ns"] <= failed["start_ns"] <= video["end_ns"]
+    assert scene["end_ns"] - scene["start_ns"] >= 10_000_000
+    assert scene["attrs"] == {"bytes_written": 150}
+    assert video["attrs"] == {"scenes": 2, "codec": "libx264"}
+    assert (scene["error"], failed["error"]) == (None, "ValueError")
+
+    metric = tracer.metrics["render.scene"]
+    assert (metric["count"], metric["errors"], metric["attrs"]) == (2, 1, {"bytes_written": 150})
+    assert metric["max_seconds"] >= 0.01
+
+
+def test_drain_and_merge_shift_spans_through_wall_clock_time(tracer):
+    with tracer.span("pipeline.segment", task="segment:0"):
+        pass
+    local, = tracer.spans
+    drained = tracer.drain()
+
+    assert not tracer.spans and not tracer.metrics
+    # Drained spans are in wall-clock nanoseconds
+    assert abs(drained[0]["start_ns"] - time.time_ns()) < 10 ** 9
+
+    parent = Tracer(enabled=True)
+    parent._epoch_offset_ns = tracer._epoch_offset_ns + 5_000
+    parent.merge(drained)
+    merged, = parent.spans
+    assert merged["start_ns"] == local["start_ns"] - 5_000
+    assert merged["end_ns"] - merged["start_ns"] == local["end_ns"] - local["start_ns"]
+    assert parent.metrics["pipeline.segment"]["count"] == 1
+
+
+def test_prometheus_text_format(tracer):
+    with tracer.span("api.imagen") as span:
+        span.add("retries", 2)
+    with pytest.raises(RuntimeError):
+        with tracer.span("api.imagen"):
+            raise RuntimeError("quota")
+
+    lines = tracer.prometheus_text().splitlines()
+
+    assert "# TYPE video_generator_span_seconds summary" in lines
+    assert 'video_generator_span_seconds_count{span="api.imagen"} 2' in lines
+    assert 'video_generator_span_errors_total{span="api.imagen"} 1' in lines
+    assert 'video_generator_span_attribute_total{span="api.imagen",attribute="retries"} 2' in lines
+    sum_line = next(line for line in lines if line.startswith("video_generator_span_seconds_sum"))
+    assert float(sum_line.rsplit(" ", 1)[1]) >= 0
+    for line in lines:
+        assert line.startswith("#") or len(line.rsplit(" ", 1)) == 2
+
+
+def test_chrome_trace_export(tmp_path, tracer):
+    with tracer.span("media.encode", frames=30):
+        pass
+
+    with open(tracer.export_chrome_trace(str(tmp_path / "trace.json")), encoding="utf-8") as f:
+        event, = json.load(f)["traceEvents"]
+    assert (event["name"], event["cat"], event["ph"], event["args"]) == ("media.encode", "media", "X",
+                                                                         {"frames": 30})
+    assert event["pid"] == os.getpid()
+
+
+@pytest.mark.parametrize("start_method", ["spawn", "fork"])
+def test_worker_spans_reach_the_parent_under_any_start_method(start_method, monkeypatch):
+    if start_method not in multiprocessing.get_all_start_methods():
+        pytest.skip(f"{start_method} is not available")
+    monkeypatch.setattr(process_tracer, "enabled", True)
+    process_tracer.reset()
+
+    context = multiprocessing.get_context(start_method)
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        result, _, _, _, spans = pool.submit(_timed_call, "segment:0", sum, ([1, 2],),
+                                             trace_worker=True).result()
+
+    assert result == 3
+    span, = spans
+    assert (span["name"], span["attrs"]) == ("pipeline.segment", {"task": "segment:0"})
+    assert span["pid"] != os.getpid()
+    process_tracer.merge(spans)
+    assert process_tracer.metrics["pipeline.segment"]["count"] == 1
+    process_tracer.reset()
@@ -0,0 +1,165 @@
+"""
+Thumbnail Service Module for Video Generator App
+Decodes scene image previews off the Tk main thread with memory and disk caches
+"""
+
+import os
+import queue
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import customtkinter as ctk
+from lazy_imports import lazy_import
+
+Image = lazy_import("PIL.Image")
+
+
+class ThumbnailService:
+    """Loads thumbnails in a worker pool and delivers them on the Tk main thread
+
+    Decoding uses Pillow's draft mode (JPEG) and reduce() so a full-size
+    1080x1920 image is never fully resampled. Finished thumbnails are kept
+    in an in-memory LRU as CTkImage objects and on disk as small PNGs.
+    Results reach the main thread through one coalesced after() callback
+    per batch instead of one per image.
+    """
+
+    def __init__(self, root, cache_dir, size=(200, 200), max_workers=2,
+                 memory_items=128, flush_interval_ms=16):
+        """Initialize the service
+
+        Args:
+            root: Tk root used to schedule main-thread callbacks
+            cache_dir: Directory for the on-disk thumbnail cache
+            size: Default maximum (width, height) of thumbnails
+            max_workers: Decoder threads
+            memory_items: Thumbnails kept in the in-memory LRU
+            flush_interval_ms: Delay used to batch results for the main thread
+        """
+        self.root = root
+        self.cache_dir = cache_dir
+        self.size = tuple(size)
+        self.memory_items = memory_items
+        self.flush_interval_ms = flush_interval_ms
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="thumbnail")
+        self._images = OrderedDict()  # key -> CTkImage, touched only on the main thread
+        self._pending = {}  # key -> [callbacks], touched only on the main thread
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._drain_scheduled = False
+
+    @staticmethod
+    def _make_key(image_path, size):
+        try:
+            mtime_ns = os.stat(image_path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        return (os.path.abspath(image_path), mtime_ns, size)
+
+    def request(self, image_path, callback, size=None):
+        """Ask for a thumbnail; must be called on the main thread
+
+        callback(image) is called on the main thread with a CTkImage, or
+        with None if the image could not be loaded. Cached thumbnails are
+        delivered immediately.
+        """
+        key = self._make_key(image_path, tuple(size or self.size))
+
+        if key in self._images:
+            self._images.move_to_end(key)
+            callback(self._images[key])
+            return
+
+        if key in self._pending:
+            self._pending[key].append(callback)
+            return
+
+        self._pending[key] = [callback]
+        self._executor.submit(self._load, key)
+
+    def _cache_path(self, key):
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.png")
+
+    def _load(self, key):
+        """Decode a thumbnail (worker thread)"""
+        image_path, _, size = key
+        cache_path = self._cache_path(key)
+        try:
+            if os.path.exists(cache_path):
+                thumbnail = Image.open(cache_path)
+                thumbnail.load()
+            else:
+                thumbnail = self._decode(image_path, size)
+                self._save_to_disk(thumbnail, cache_path)
+            self._results.put((key, thumbnail))
+        except Exception as e:
+            print(f"Error loading thumbnail for {image_path}: {str(e)}")
+            self._results.put((key, None))
+
+        self._schedule_drain()
+
+    @staticmethod
+    def _decode(image_path, size):
+        """Decode image_path at roughly thumbnail resolution"""
+        image = Image.open(image_path)
+        # JPEG: let the decoder skip DCT detail we would throw away
+        image.draft("RGB", size)
+
+        # Cheap integer downscale before the final filtered resize
+        factor = min(image.width // size[0], image.height // size[1])
+        if factor > 1:
+            image = image.reduce(factor)
+
+        image = image.convert("RGB")
+        image.thumbnail(size, Image.BILINEAR)
+        return image
+
+    @staticmethod
+    def _save_to_disk(thumbnail, cache_path):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+        thumbnail.save(temp_path, format="PNG")
+        os.replace(temp_path, cache_path)
+
+    def _schedule_drain(self):
+        """Schedule one main-thread flush for all results queued so far"""
+        with self._lock:
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        self.root.after(self.flush_interval_ms, self._drain)
+
+    def _drain(self):
+        """Hand finished thumbnails to their callbacks (main thread)"""
+        with self._lock:
+            self._drain_scheduled = False
+
+        while True:
+            try:
+                key, thumbnail = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            image = None
+            if thumbnail is not None:
+                image = ctk.CTkImage(light_image=thumbnail, dark_image=thumbnail, size=thumbnail.size)
+                self._images[key] = image
+                self._images.move_to_end(key)
+                while len(self._images) > self.memory_items:
+                    self._images.popitem(last=False)
+
+            for callback in self._pending.pop(key, []):
+                try:
+                    callback(image)
+                except Exception as e:
+                    print(f"Error in thumbnail callback: {str(e)}")
+
+    def shutdown(self):
+        """Stop the decoder threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,278 @@
+"""
+Tracing Module for Video Generator App
+Records timing spans around API calls and render phases, exportable as
+Chrome trace JSON or Prometheus text metrics
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Span:
+    """A timed operation with attributes such as bytes_written or retries"""
+
+    __slots__ = ("tracer", "name", "attrs", "start_ns", "end_ns", "pid", "tid", "error")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start_ns = None
+        self.end_ns = None
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+        self.error = None
+
+    def set(self, key, value):
+        """Set an attribute"""
+        self.attrs[key] = value
+
+    def add(self, key, amount=1):
+        """Add to a numeric attribute"""
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        self.tracer._record(self)
+        return False
+
+    def to_dict(self):
+        """Get a picklable/JSON-able copy of the span"""
+        return {
+            "name": self.name,
+            "attrs": self.attrs,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "pid": self.pid,
+            "tid": self.tid,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Span returned while tracing is off; every method does nothing"""
+
+    __slots__ = ()
+
+    def set(self, key, value):
+        pass
+
+    def add(self, key, amount=1):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Collects spans and aggregate metrics for the whole process"""
+
+    def __init__(self, enabled=False, max_spans=100000):
+        """Initialize the tracer
+
+        Args:
+            enabled: Whether spans are recorded
+            max_spans: Spans kept for trace export (aggregates keep counting)
+        """
+        self.enabled = enabled
+        self.spans = deque(maxlen=max_spans)
+        self.metrics = {}
+        self._lock = threading.Lock()
+        self._server = None
+        # perf_counter has an arbitrary origin; anchor it to wall-clock time
+        # so spans from worker processes line up in the exported trace
+        self._epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+
+    def span(self, name, **attrs):
+        """Start a span; use as a context manager"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, attrs)
+
+    def _record(self, span):
+        self._add_span(span.to_dict())
+
+    def _add_span(self, data):
+        duration = (data["end_ns"] - data["start_ns"]) / 1e9
+        with self._lock:
+            self.spans.append(data)
+            metric = self.metrics.setdefault(data["name"], {
+                "count": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0, "attrs": {}
+            })
+            metric["count"] += 1
+            metric["seconds"] += duration
+            metric["max_seconds"] = max(metric["max_seconds"], duration)
+            if data["error"]:
+                metric["errors"] += 1
+            for key, value in data["attrs"].items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    metric["attrs"][key] = metric["attrs"].get(key, 0) + value
+
+    def drain(self):
+        """Remove and return recorded spans as dictionaries
+
+        Used by worker processes to hand their spans back to the parent.
+        """
+        with self._lock:
+            spans = [self._absolute(span) for span in self.spans]
+            self.spans.clear()
+            self.metrics = {}
+        return spans
+
+    def merge(self, spans):
+        """Add spans drained from another process"""
+        for span in spans:
+            data = dict(span)
+            data["start_ns"] -= self._epoch_offset_ns
+            data["end_ns"] -= self._epoch_offset_ns
+            self._add_span(data)
+
+    def _absolute(self, span):
+        data = dict(span)
+        data["start_ns"] += self._epoch_offset_ns
+        data["end_ns"] += self._epoch_offset_ns
+        return data
+
+    def reset(self):
+        """Discard all spans and metrics"""
+        with self._lock:
+            self.spans.clear()
+            self.metrics = {}
+
+    def export_chrome_trace(self, output_path):
+        """Write spans as Chrome trace JSON (chrome://tracing or Perfetto)"""
+        with self._lock:
+            spans = [self._absolute(span) for span in self.spans]
+
+        events = []
+        for span in spans:
+            args = dict(span["attrs"])
+            if span["error"]:
+                args["error"] = span["error"]
+            events.append({
+                "name": span["name"],
+                "cat": span["name"].split(".", 1)[0],
+                "ph": "X",
+                "ts": span["start_ns"] / 1000,
+                "dur": (span["end_ns"] - span["start_ns"]) / 1000,
+                "pid": span["pid"],
+                "tid": span["tid"],
+                "args": args,
+            })
+
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        return output_path
+
+    def prometheus_text(self):
+        """Render aggregate metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = {name: dict(metric, attrs=dict(metric["attrs"]))
+                       for name, metric in self.metrics.items()}
+
+        lines = [
+            "# HELP video_generator_span_seconds Time spent in traced operations",
+            "# TYPE video_generator_span_seconds summary",
+        ]
+        for name, metric in sorted(metrics.items()):
+            lines.append(f'video_generator_span_seconds_count{{span="{name}"}} {metric["count"]}')
+            lines.append(f'video_generator_span_seconds_sum{{span="{name}"}} {metric["seconds"]:.6f}')
+
+        lines += [
+            "# HELP video_generator_span_max_seconds Slowest traced operation",
+            "# TYPE video_generator_span_max_seconds gauge",
+        ]
+        for name, metric in sorted(metrics.items()):
+            lines.append(f'video_generator_span_max_seconds{{span="{name}"}} {metric["max_seconds"]:.6f}')
+
+        lines += [
+            "# HELP video_generator_span_errors_total Traced operations that raised",
+            "# TYPE video_generator_span_errors_total counter",
+        ]
+        for name, metric in sorted(metrics.items()):
+            lines.append(f'video_generator_span_errors_total{{span="{name}"}} {metric["errors"]}')
+
+        lines += [
+            "# HELP video_generator_span_attribute_total Sum of numeric span attributes (bytes_written, retries, ...)",
+            "# TYPE video_generator_span_attribute_total counter",
+        ]
+        for name, metric in sorted(metrics.items()):
+            for key, value in sorted(metric["attrs"].items()):
+                lines.append(f'video_generator_span_attribute_total{{span="{name}",attribute="{key}"}} {value}')
+
+        return "\n".join(lines) + "\n"
+
+    def start_metrics_server(self, port=9464, host="127.0.0.1"):
+        """Serve prometheus_text() at http://host:port/metrics on a daemon thread"""
+        if self._server is not None:
+            return self._server
+
+        tracer = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = tracer.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        return self._server
+
+    def stop_metrics_server(self):
+        """Stop the metrics server if it is running"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# Process-wide tracer; set VIDEO_GENERATOR_TRACE=1 to enable at import
+tracer = Tracer(enabled=os.environ.get("VIDEO_GENERATOR_TRACE") == "1")
+
+
+def configure_tracing(config):
+    """Enable tracing and the metrics endpoint from the "tracing" config section"""
+    tracing_config = config.get("tracing", {})
+    if tracing_config.get("enabled"):
+        tracer.enabled = True
+    if tracer.enabled and tracing_config.get("metrics_port"):
+        tracer.start_metrics_server(tracing_config["metrics_port"])
+    return tracer
+
+
+# Example usage
+if __name__ == "__main__":
+    tracer.enabled = True
+
+    with tracer.span("media.encode", frames=300) as span:
+        time.sleep(0.05)
+        span.add("bytes_written", 1024)
+
+    print(tracer.prometheus_text())
+    print(tracer.export_chrome_trace("trace.json"))
@@ -0,0 +1,61 @@
+"""
+UI Update Bus Module for Video Generator App
+Batches updates from background threads into one Tk repaint per frame interval
+"""
+
+import threading
+
+
+class UIUpdateBus:
+    """Thread-safe queue of UI updates flushed on the Tk main thread
+
+    post() coalesces by key, so only the latest status text or progress
+    value for each key is applied per flush. post_event() delivers every
+    call in order, for one-off updates such as dialogs.
+    """
+
+    def __init__(self, root, interval_ms=33):
+        """Initialize the bus
+
+        Args:
+            root: Tk root used to schedule the flush
+            interval_ms: Minimum time between flushes (33 ms is about 30 fps)
+        """
+        self.root = root
+        self.interval_ms = interval_ms
+        self._latest = {}
+        self._events = []
+        self._lock = threading.Lock()
+        self._flush_scheduled = False
+
+    def post(self, key, callback, *args):
+        """Queue callback(*args), replacing any pending update with the same key"""
+        with self._lock:
+            self._latest.pop(key, None)
+            self._latest[key] = (callback, args)
+            self._schedule_locked()
+
+    def post_event(self, callback, *args):
+        """Queue callback(*args) without coalescing"""
+        with self._lock:
+            self._events.append((callback, args))
+            self._schedule_locked()
+
+    def _schedule_locked(self):
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.root.after(self.interval_ms, self._flush)
+
+    def _flush(self):
+        """Apply all pending updates (main thread)"""
+        with self._lock:
+            updates = list(self._latest.values()) + self._events
+            self._latest = {}
+            self._events = []
+            self._flush_scheduled = False
+
+        for callback, args in updates:
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error applying UI update: {str(e)}")